@@ -1,32 +1,591 @@
-from utiles import LeclercScraper, DBManager
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Optional
 
-def pipeline(max_pages: int = 5):
+import metrics
+from utiles import LISTING_PAGE_PARAM, LeclercScraper, DBManager
+
+def prefetch_thumbnails(image_urls: List[str], max_workers: int = 8):
+    """Remplit le cache de vignettes servi par /img/<id> (front.py) après un scraping."""
+    from thumbs import ThumbnailCache  # Pillow n'est requis que si le préchargement est demandé
+
+    t0 = time.perf_counter()
+    fetched = ThumbnailCache().prefetch(image_urls, max_workers=max_workers)
+    print(f"[INFO] vignettes : {fetched} nouvelles en {time.perf_counter() - t0:.1f} s")
+
+
+def _start_run(collect_metrics: bool) -> str:
+    """Remet le registre à zéro (avant le démarrage du driver, chronométré lui aussi)."""
+    metrics.REGISTRY.enabled = collect_metrics
+    metrics.REGISTRY.reset()
+    return datetime.utcnow().isoformat()
+
+
+def _finish_run(db: DBManager, started_at: str, status: str, pages: int, saved: int):
+    if not metrics.REGISTRY.enabled:
+        return
+    snapshot = metrics.REGISTRY.snapshot()
+    run_id = db.record_run(started_at, status, pages, saved, snapshot)
+    print(f"[STATS] run {run_id} ({status}) :")
+    for line in metrics.summarize(snapshot):
+        print("[STATS]  ", line)
+    saved_s = metrics.counter_total(snapshot, "scrape_seconds_saved_total")
+    if saved_s:
+        print(f"[STATS]   attentes écourtées sur les fiches : {saved_s:.1f} s gagnées "
+              f"(vs délai fixe)")
+    counts = {stage: metrics.counter_total(snapshot, "scrape_items_total", stage=stage)
+              for stage in ("details_failed", "details_recovered", "details_given_up", "details_empty")}
+    if any(counts.values()):
+        print("[STATS]   fiches en échec : {details_failed:.0f} | récupérées après relance : "
+              "{details_recovered:.0f} | abandonnées : {details_given_up:.0f} "
+              "| vides (non relancées) : {details_empty:.0f}".format(**counts))
+
+
+def pipeline(max_pages: int = 5, detail_workers: int = 0, detail_backend: str = "selenium",
+             batch_cards: bool = False, incremental: bool = False, fresh_ttl_hours: float = 24,
+             prefetch_images: bool = False, collect_metrics: bool = True, lean: bool = False,
+             user_data_dir: Optional[str] = None, debugger_address: Optional[str] = None,
+             capture_api: bool = False, resume: bool = False, drain_chunk: int = 48,
+             max_detail_attempts: int = 4, retry_base_delay: float = 5.0):
+    """Crawl séquentiel avec point de reprise dans la base (tables crawl_runs / crawl_pending).
+
+    Chaque page listing est enregistrée avec ses cartes avant que leurs fiches ne
+    soient visitées ; une carte ne quitte la file qu'une fois écrite. Avec
+    `resume=True`, le dernier crawl interrompu reprend : file d'attente d'abord,
+    puis pages `last_page + 1` à `max_pages` (numéro de page absolu).
+
+    Une fiche en échec reste en file et est relancée entre deux pages après
+    `retry_base_delay` x 2^(tentative - 1) s ; au bout de `max_detail_attempts`
+    tentatives, la carte est écrite sans toucher aux détails déjà en base.
+    """
+    started_at = _start_run(collect_metrics)
     db = DBManager()
-    scraper = LeclercScraper(headless=False)
+    crawl = db.unfinished_crawl() if resume else None
+    if resume and crawl is None:
+        print("[INFO] aucun crawl interrompu : nouveau crawl")
+    if crawl is not None:
+        # fiches déjà écrites par ce crawl : lues en base au lieu d'être revisitées
+        elapsed_h = (datetime.utcnow() - datetime.fromisoformat(crawl["started_at"])).total_seconds() / 3600
+        fresh_ttl_hours = max(fresh_ttl_hours if incremental else 0, elapsed_h + 0.1)
+        incremental = True
+    scraper = LeclercScraper(headless=False, detail_workers=detail_workers,
+                             detail_backend=detail_backend, batch_cards=batch_cards,
+                             detail_cache=db if incremental else None,
+                             fresh_ttl_hours=fresh_ttl_hours, lean=lean,
+                             user_data_dir=user_data_dir, debugger_address=debugger_address,
+                             capture_api=capture_api)
+    image_urls: List[str] = []
+    page_count = total_saved = 0
+    status = "error"
+    run_id = None
+
+    def drain():
+        """Fiches des cartes dues en file, par paquets : les cartes écrites quittent la file,
+        les échecs y restent avec un délai de relance doublé à chaque tentative."""
+        nonlocal total_saved
+        pending = db.pending_cards(run_id, due_only=True)
+        for i in range(0, len(pending), drain_chunk):
+            chunk = pending[i:i + drain_chunk]
+            cards = scraper.complete_cards([card for _, card, _ in chunk])
+            done, ids, retries = [], [], []
+            for (pid, _, attempts), card in zip(chunk, cards):
+                if card.get("details_missing") and attempts + 1 < max_detail_attempts:
+                    retries.append((pid, attempts + 1, retry_base_delay * 2 ** attempts))
+                    continue
+                if card.get("details_missing"):
+                    metrics.REGISTRY.inc("scrape_items_total", stage="details_given_up")
+                    print(f"[WARN] fiche abandonnée après {attempts + 1} tentatives : {card.get('page_url')}")
+                elif attempts:
+                    metrics.REGISTRY.inc("scrape_items_total", stage="details_recovered")
+                done.append(card)
+                ids.append(pid)
+            total_saved += db.save_many(done)
+            if db.last_rejected:
+                print(f"[WARN] {db.last_rejected} lignes refusées par la base")
+            db.dequeue_pending(ids)
+            db.defer_pending(retries)
+            image_urls.extend(d["image_url"] for d in done if d.get("image_url"))
+
+    def drain_retries():
+        """Fin de crawl : attend les échéances de relance jusqu'à ce que la file soit vide."""
+        while True:
+            due = db.next_retry_at(run_id)
+            if due is None:
+                return
+            time.sleep(max(0.0, (due - datetime.utcnow()).total_seconds()))
+            drain()
 
     try:
         scraper.open_homepage()
         scraper.go_to_bons_plans()
 
-        page_count = 0
-        while page_count < max_pages:
-            deals = scraper.scrape_current_page()
-            db.save_many(deals)
-            print(f"[INFO] page {page_count+1}: {len(deals)} produits insérés")
+        if crawl is None:
+            run_id, page_no = db.start_crawl(scraper.driver.current_url), 1
+        else:
+            run_id, page_no = crawl["id"], crawl["last_page"] + 1
+            print(f"[INFO] reprise du crawl {run_id} : {crawl['pending']} fiches en attente, "
+                  f"pages {page_no}-{max_pages}")
+            drain()
+            if page_no <= max_pages and not _resume_listing(scraper, page_no, crawl["listing_signature"]):
+                page_no = max_pages + 1  # le listing s'arrête avant : plus rien à parcourir
 
+        while page_no <= max_pages:
+            cards = scraper.extract_current_page_cards()
+            db.checkpoint_page(run_id, page_no, cards, scraper.listing_signature(), scraper.driver.current_url)
+            before = total_saved
+            drain()
+            print(f"[INFO] page {page_no}: {total_saved - before} produits insérés")
             page_count += 1
-            moved = scraper.go_next_page()
-            if not moved:
+            if page_no == max_pages or not scraper.go_next_page():
                 break
+            page_no += 1
 
+        drain_retries()
+        db.finish_crawl(run_id, "done")
         print("[INFO] pipeline terminé normalement")
+        status = "ok"
 
     except Exception as e:
         print("[ERROR] pipeline interrompu:", repr(e))
+        if run_id is not None:
+            db.finish_crawl(run_id, "failed")
+            print("[INFO] relancer avec --resume pour reprendre là où le crawl s'est arrêté")
+
+    finally:
+        scraper.close()
+        _finish_run(db, started_at, status, page_count, total_saved)
+        db.close()
+        print("[DONE] Fin du scraping.")
+
+    if prefetch_images and image_urls:
+        prefetch_thumbnails(image_urls)
+
+
+def _jump_to_page(scraper: LeclercScraper, page_no: int, *seen: Optional[str]) -> Optional[str]:
+    """Accès direct à la page `page_no` par l'URL ; None si elle a bien été ouverte, sinon la raison.
+
+    Un site qui ignore le paramètre renvoie la page courante : la première carte est
+    alors celle de la page de départ, ou d'une autre page déjà vue (`seen`).
+    """
+    seen_signatures = {scraper.listing_signature(), *seen}
+    if not scraper.goto_page(page_no):
+        return f"page {page_no} sans cartes après accès direct (délai dépassé)"
+    if scraper.listing_signature() in seen_signatures:
+        return f"page {page_no} identique à une page déjà vue : le site ignore ?{LISTING_PAGE_PARAM}="
+    return None
+
+
+def _resume_listing(scraper: LeclercScraper, page_no: int, last_signature: Optional[str]) -> bool:
+    """Place le navigateur sur la page `page_no` du listing (le scraper est sur la page 1).
+
+    Accès direct par l'URL d'abord ; si le site ignore le paramètre (même première
+    carte qu'en page 1 ou qu'à la dernière page traitée), on clique « suivant ».
+    False si le listing compte moins de `page_no` pages.
+    """
+    reason = _jump_to_page(scraper, page_no, last_signature)
+    if reason is None:
+        return True
+    print(f"[WARN] {reason} : pagination depuis la page 1")
+    scraper.goto_page(1)
+    for _ in range(page_no - 1):
+        if not scraper.go_next_page():
+            return False
+    return True
+
+
+# ---------- PIPELINE PAR ÉTAGES ----------
+_END = object()  # fin de flux, propagée d'un étage à l'autre
+
+
+class StageStats:
+    """Temps passé à travailler / à attendre (file vide ou pleine) pour un étage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.busy = 0.0
+        self.wait = 0.0
+        self.items = 0
+        self._lock = threading.Lock()
+
+    def add(self, busy: float = 0.0, wait: float = 0.0, items: int = 0):
+        with self._lock:
+            self.busy += busy
+            self.wait += wait
+            self.items += items
+
+    def __str__(self):
+        return f"{self.name:<8} occupé {self.busy:7.2f} s | en attente {self.wait:7.2f} s | {self.items} éléments"
+
+
+def _put(q: queue.Queue, item, abort: threading.Event, stats: StageStats):
+    """put bloquant (contre-pression) mais interruptible si un autre étage a échoué."""
+    t0 = time.perf_counter()
+    try:
+        while True:
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                if abort.is_set():
+                    return False
+    finally:
+        stats.add(wait=time.perf_counter() - t0)
+
+
+def staged_pipeline(max_pages: int = 5, detail_workers: int = 4, detail_backend: str = "selenium",
+                    batch_cards: bool = False, incremental: bool = False, fresh_ttl_hours: float = 24,
+                    queue_size: int = 200, batch_size: int = 200, flush_interval: float = 5.0,
+                    prefetch_images: bool = False, collect_metrics: bool = True, lean: bool = False,
+                    user_data_dir: Optional[str] = None, debugger_address: Optional[str] = None,
+                    capture_api: bool = False):
+    """Pipeline producteur/consommateur :
+
+    listing (navigateur principal) -> N workers fiches produit -> 1 writer DB.
+
+    Les files sont bornées (contre-pression). Quand la pagination s'arrête, normalement
+    ou sur erreur, tout ce qui a déjà été émis est enrichi puis écrit avant la sortie.
+    """
+    # les fiches ne doivent jamais passer par le navigateur du listing
+    detail_workers = max(1, detail_workers)
+    started_at = _start_run(collect_metrics)
+    db = DBManager()
+    scraper = LeclercScraper(headless=False, detail_workers=detail_workers,
+                             detail_backend=detail_backend, batch_cards=batch_cards,
+                             detail_cache=db if incremental else None,
+                             fresh_ttl_hours=fresh_ttl_hours, lean=lean,
+                             user_data_dir=user_data_dir, debugger_address=debugger_address,
+                             capture_api=capture_api)
+
+    detail_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    write_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    abort = threading.Event()
+    errors: List[str] = []
+    image_urls: List[str] = []
+    pages_done = 0
+    listing_stats, detail_stats, writer_stats = StageStats("listing"), StageStats("fiches"), StageStats("writer")
+
+    def producer():
+        nonlocal pages_done
+        try:
+            scraper.open_homepage()
+            scraper.go_to_bons_plans()
+            for page_no in range(1, max_pages + 1):
+                t0 = time.perf_counter()
+                cards = scraper.extract_current_page_cards()
+                fresh = scraper.lookup_cached_details([c.get("page_url") for c in cards])
+                listing_stats.add(busy=time.perf_counter() - t0, items=len(cards))
+                for card in cards:
+                    det = fresh.get(card.get("page_url")) if card.get("page_url") else None
+                    if det is not None:
+                        card.update(det)
+                        card["scraped_at"] = datetime.utcnow().isoformat()
+                        ok = _put(write_q, card, abort, listing_stats)
+                    else:
+                        ok = _put(detail_q, card, abort, listing_stats)
+                    if not ok:
+                        return
+                print(f"[INFO] page {page_no}: {len(cards)} cartes émises")
+                pages_done = page_no
+                if page_no == max_pages:
+                    break
+                t0 = time.perf_counter()
+                moved = scraper.go_next_page()
+                listing_stats.add(busy=time.perf_counter() - t0)
+                if not moved:
+                    break
+        except Exception as e:
+            errors.append(f"listing: {e!r}")
+        finally:
+            # fin de flux : un marqueur par worker, même après une erreur
+            for _ in range(detail_workers):
+                _put(detail_q, _END, abort, listing_stats)
+
+    def detail_worker():
+        while True:
+            t0 = time.perf_counter()
+            try:
+                card = detail_q.get(timeout=0.5)
+            except queue.Empty:
+                card = None
+            detail_stats.add(wait=time.perf_counter() - t0)
+            if card is None:
+                if abort.is_set():
+                    return
+                continue
+            if card is _END:
+                _put(write_q, _END, abort, detail_stats)
+                return
+            t0 = time.perf_counter()
+            try:
+                det = scraper.fetch_remote_details([card.get("page_url")])[0]
+            except Exception as e:
+                errors.append(f"fiche {card.get('page_url')}: {e!r}")
+                det = None
+            if det is None:
+                card["details_missing"] = True  # détails déjà en base conservés
+            else:
+                card.update(det)
+            card["scraped_at"] = datetime.utcnow().isoformat()
+            detail_stats.add(busy=time.perf_counter() - t0, items=1)
+            if not _put(write_q, card, abort, detail_stats):
+                return
+
+    def writer():
+        pending: List[Dict] = []
+        ended = 0
+        last_flush = time.monotonic()
 
+        def flush():
+            nonlocal pending, last_flush
+            if pending:
+                t0 = time.perf_counter()
+                saved = db.save_many(pending)
+                writer_stats.add(busy=time.perf_counter() - t0, items=saved)
+                if db.last_rejected:
+                    print(f"[WARN] {db.last_rejected} lignes refusées par la base")
+                pending = []
+            last_flush = time.monotonic()
+
+        try:
+            while ended < detail_workers:
+                timeout = max(0.0, flush_interval - (time.monotonic() - last_flush))
+                t0 = time.perf_counter()
+                try:
+                    item = write_q.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                writer_stats.add(wait=time.perf_counter() - t0)
+                if item is _END:
+                    ended += 1
+                elif item is not None:
+                    pending.append(item)
+                    if item.get("image_url"):
+                        image_urls.append(item["image_url"])
+                if len(pending) >= batch_size or time.monotonic() - last_flush >= flush_interval:
+                    flush()
+            flush()
+        except Exception as e:
+            errors.append(f"writer: {e!r}")
+            abort.set()
+
+    threads = [threading.Thread(target=producer, name="listing")]
+    threads += [threading.Thread(target=detail_worker, name=f"detail-{i}") for i in range(detail_workers)]
+    threads.append(threading.Thread(target=writer, name="writer"))
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            for err in errors:
+                print("[ERROR]", err)
+        else:
+            print("[INFO] pipeline terminé normalement")
+        for stats in (listing_stats, detail_stats, writer_stats):
+            print("[STATS]", stats)
     finally:
         scraper.close()
+        _finish_run(db, started_at, "error" if errors else "ok", pages_done, writer_stats.items)
+        db.close()
+        print("[DONE] Fin du scraping.")
+
+    if prefetch_images and image_urls:
+        prefetch_thumbnails(image_urls)
+
+
+# ---------- CRAWL PARTITIONNÉ (multi-processus) ----------
+class Shard:
+    """Plage de pages [start, end] du listing ; `next_page` avance à chaque page écrite."""
+
+    def __init__(self, shard_id: int, start: int, end: int):
+        self.id = shard_id
+        self.start = start
+        self.end = end
+        self.next_page = start
+        self.attempts = 0
+        self.status = "pending"  # pending | running | done | failed
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        return f"Shard({self.id}, pages {self.start}-{self.end}, {self.status})"
+
+
+def split_pages(first_page: int, last_page: int, shards: int) -> List[Shard]:
+    """Découpe [first_page, last_page] en plages contiguës de tailles égales à une page près."""
+    total = last_page - first_page + 1
+    shards = max(1, min(shards, total))
+    size, extra = divmod(total, shards)
+    plan, start = [], first_page
+    for i in range(shards):
+        end = start + size - 1 + (1 if i < extra else 0)
+        plan.append(Shard(i, start, end))
+        start = end + 1
+    return plan
+
+
+def _shard_worker(shard_id: int, start: int, end: int, scraper_kwargs: Dict, db_path: Optional[str],
+                  incremental: bool, out_q, collect_metrics: bool = False):
+    """Processus fils : un navigateur pour les pages start..end, deals envoyés au writer du parent.
+
+    Chaque message se termine par les mesures du fils depuis le message précédent (REGISTRY
+    est propre au processus) : le parent les fusionne dans le sien.
+    """
+    metrics.REGISTRY.enabled = collect_metrics
+    metrics.REGISTRY.reset()  # fork : pas les mesures héritées du parent
+
+    def send(*msg):
+        snapshot = metrics.REGISTRY.snapshot() if collect_metrics else {}
+        metrics.REGISTRY.reset()
+        out_q.put(msg + (snapshot,))
+
+    db = DBManager(db_path) if incremental else None  # lecture des fiches fraîches seulement
+    scraper = None
+    try:
+        scraper = LeclercScraper(detail_cache=db, **scraper_kwargs)
+        scraper.open_homepage()
+        scraper.go_to_bons_plans()
+        # accès direct non vérifiable (délai, paramètre ignoré) : échec, jamais un doublon de la page 1
+        reason = _jump_to_page(scraper, start) if start > 1 else None
+        if reason is not None:
+            send("failed", shard_id, reason)
+            return
+        for page_no in range(start, end + 1):
+            send("page", shard_id, page_no, scraper.scrape_current_page())
+            if page_no == end:
+                break
+            if not scraper.go_next_page():
+                send("done", shard_id, f"fin du listing après la page {page_no}")
+                return
+        send("done", shard_id, None)
+    except Exception as e:
+        send("failed", shard_id, repr(e))
+    finally:
+        if scraper is not None:
+            scraper.close()
+        if db is not None:
+            db.close()
+
+
+def sharded_pipeline(last_page: int = 20, first_page: int = 1, processes: int = 4,
+                     shards: Optional[int] = None, max_retries: int = 2, headless: bool = True,
+                     detail_backend: str = "http", batch_cards: bool = True, incremental: bool = False,
+                     collect_metrics: bool = True, db_path: Optional[str] = None,
+                     start_method: str = "spawn", **scraper_kwargs) -> Dict:
+    """Crawl des pages first_page..last_page par N processus, un navigateur chacun.
+
+    Chaque worker ouvre directement sa première page (`goto_page`, contrôlée par la
+    signature du listing) ; le processus parent est le seul writer. Un shard en échec (exception, navigateur tué) est
+    relancé au plus `max_retries` fois à partir de sa première page non écrite :
+    les shards terminés ne sont jamais recrawlés.
+    """
+    started_at = _start_run(collect_metrics)
+    db = DBManager(db_path)
+    # plus de shards que de processus : les plages courtes équilibrent la fin du run
+    plan = split_pages(first_page, last_page, shards or processes * 2)
+    by_id = {s.id: s for s in plan}
+    pending = deque(plan)
+    ctx = multiprocessing.get_context(start_method)
+    out_q = ctx.Queue()
+    running: Dict[int, multiprocessing.Process] = {}
+    kwargs = dict(headless=headless, detail_backend=detail_backend, batch_cards=batch_cards, **scraper_kwargs)
+    pages_done = total_saved = 0
+    t_start = time.perf_counter()
+
+    exited = set()  # fils vus terminés, leurs derniers messages peuvent encore être en file
+
+    def finish(shard: Shard, error: Optional[str] = None):
+        exited.discard(shard.id)
+        proc = running.pop(shard.id, None)
+        if proc is not None:
+            proc.join()
+        if error is None:
+            shard.status = "done"
+            return
+        shard.error = error
+        if shard.attempts <= max_retries and shard.next_page <= shard.end:
+            shard.status = "pending"
+            pending.append(shard)
+            print(f"[WARN] shard {shard.id} en échec ({error}), reprise page {shard.next_page}")
+        else:
+            shard.status = "failed"
+            print(f"[ERROR] shard {shard.id} abandonné après {shard.attempts} essais : {error}")
+
+    try:
+        while pending or running:
+            while pending and len(running) < processes:
+                shard = pending.popleft()
+                shard.attempts += 1
+                shard.status = "running"
+                proc = ctx.Process(target=_shard_worker, name=f"shard-{shard.id}",
+                                   args=(shard.id, shard.next_page, shard.end, kwargs, db_path, incremental,
+                                         out_q, collect_metrics))
+                proc.start()
+                running[shard.id] = proc
+            try:
+                msg = out_q.get(timeout=1.0)
+            except queue.Empty:
+                # un fils terminé (même avec le code 0) a pu poster juste après l'expiration du get :
+                # il n'est déclaré planté (navigateur tué, OOM...) qu'après un second get vide,
+                # quand tout ce qu'il a écrit avant de mourir a été lu
+                for shard_id, proc in list(running.items()):
+                    if proc.is_alive():
+                        continue
+                    if shard_id in exited:
+                        finish(by_id[shard_id], f"processus terminé sans message (code {proc.exitcode})")
+                    else:
+                        exited.add(shard_id)
+                continue
+
+            metrics.REGISTRY.merge(msg[-1])  # mesures du fils (étapes, fiches...)
+            kind, shard = msg[0], by_id[msg[1]]
+            if kind == "page":
+                page_no, deals = msg[2], msg[3]
+                saved = db.save_many(deals)
+                shard.next_page = page_no + 1
+                pages_done += 1
+                total_saved += saved
+                print(f"[INFO] shard {shard.id} page {page_no}: {saved} produits insérés")
+                if db.last_rejected:
+                    print(f"[WARN] page {page_no}: {db.last_rejected} lignes refusées par la base")
+            elif kind == "done":
+                if msg[2]:
+                    print(f"[INFO] shard {shard.id} : {msg[2]}")
+                finish(shard)
+            elif shard.status == "running":
+                finish(shard, msg[2])
+    finally:
+        for proc in running.values():
+            proc.terminate()
+            proc.join()
+        failed = [s for s in plan if s.status != "done"]
+        elapsed = time.perf_counter() - t_start
+        print(f"[INFO] {pages_done} pages, {total_saved} produits en {elapsed:.1f} s "
+              f"({pages_done / elapsed if elapsed else 0:.2f} pages/s, {processes} processus)")
+        for s in failed:
+            print(f"[ERROR] pages {s.next_page}-{s.end} non crawlées ({s.error})")
+        _finish_run(db, started_at, "partial" if failed else "ok", pages_done, total_saved)
+        db.close()
         print("[DONE] Fin du scraping.")
+    return {"pages": pages_done, "saved": total_saved, "seconds": elapsed,
+            "failed": [(s.next_page, s.end) for s in failed]}
+
 
 if __name__ == "__main__":
-    pipeline(max_pages=5)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scraper des bons plans Leclerc")
+    parser.add_argument("--max-pages", type=int, default=5, help="dernière page listing (numéro absolu)")
+    parser.add_argument("--resume", action="store_true", help="reprendre le dernier crawl interrompu")
+    parser.add_argument("--detail-workers", type=int, default=0)
+    parser.add_argument("--detail-backend", choices=("selenium", "http"), default="selenium")
+    parser.add_argument("--batch-cards", action="store_true")
+    parser.add_argument("--incremental", action="store_true", help="ne pas revisiter les fiches fraîches")
+    parser.add_argument("--lean", action="store_true")
+    args = parser.parse_args()
+    pipeline(max_pages=args.max_pages, resume=args.resume, detail_workers=args.detail_workers,
+             detail_backend=args.detail_backend, batch_cards=args.batch_cards,
+             incremental=args.incremental, lean=args.lean)
@@ -0,0 +1,642 @@
+"""Micro-benchmarks hors-ligne du projet.
+
+Usage :
+    python bench.py db [--rows 100000]
+    python bench.py api [--rows 50000]
+    python bench.py payload [--rows 50000]   (liste complète vs compacte : octets et parsing)
+    python bench.py serve [--rows 50000 --clients 16 --rate 30 --seconds 10]
+                                             (front.py en serveur, latence pendant l'écriture)
+    python bench.py grid [--cards 20000]     (Chrome headless)
+    python bench.py e2e [--pages 5 --cards 48 --latency 0.05 --modes dom,batch,http,pool,api]
+                                             (Chrome headless + fixture_site.py)
+    python bench.py lean [--pages 5 --cards 48 --latency 0.05]   (profil complet vs lean)
+    python bench.py startup [--runs 3]       (temps jusqu'à la première carte, fixture)
+    python bench.py shards [--pages 24 --processes 1,2,4]       (crawl multi-processus, fixture)
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict
+
+from utiles import DBManager
+
+
+# ---------- données synthétiques ----------
+SELLERS = ["E.Leclerc", "Boulanger Pro", "Darty Marketplace", "Électro Dépôt", "Cdiscount Vendeur"]
+CATEGORIES = ["Téléviseurs", "Électroménager", "Informatique", "Jardin", "Jouets", "Cuisine", None]
+PROMOS = ["20%", "15 %", "10€", "50 €", "Offre spéciale", None]
+
+
+def synthetic_deals(n: int, seed: int = 42) -> List[Dict]:
+    rnd = random.Random(seed)
+    now = datetime.utcnow().isoformat()
+    deals = []
+    for i in range(n):
+        deals.append({
+            "sold_by": rnd.choice(SELLERS),
+            "product_name": f"Produit synthétique n°{i} — modèle {rnd.randint(100, 999)}",
+            "discount_text": rnd.choice(PROMOS),
+            "price_eur": round(rnd.uniform(1, 1500), 2),
+            "page_url": f"https://www.e.leclerc/fp/produit-{i}",
+            "image_url": f"https://static.e.leclerc/img/{i}.jpg",
+            "description": "Description détaillée du produit. " * rnd.randint(2, 20),
+            "features": " | ".join(f"Caractéristique {k}: valeur {rnd.randint(1, 99)}" for k in range(14)),
+            "category": rnd.choice(CATEGORIES),
+            "scraped_at": now,
+        })
+    return deals
+
+
+# ---------- DB ----------
+def _legacy_save_many(db_path: str, deals: List[Dict]):
+    """Copie de l'ancien DBManager.save_many : connexion par appel, un INSERT par deal."""
+    con = sqlite3.connect(db_path)
+    cur = con.cursor()
+    for d in deals:
+        try:
+            cur.execute("""
+                INSERT INTO leclerc_deals
+                (sold_by, product_name, discount_text, price_eur, page_url, image_url,
+                 description, features, category, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, tuple(d.get(c) for c in ("sold_by", "product_name", "discount_text", "price_eur",
+                                          "page_url", "image_url", "description", "features",
+                                          "category", "scraped_at")))
+        except sqlite3.DatabaseError:
+            continue
+    con.commit()
+    con.close()
+
+
+def _legacy_init(db_path: str):
+    con = sqlite3.connect(db_path)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS leclerc_deals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sold_by TEXT, product_name TEXT, discount_text TEXT, price_eur REAL,
+            page_url TEXT, image_url TEXT, description TEXT, features TEXT,
+            category TEXT, scraped_at TEXT
+        );
+    """)
+    con.commit()
+    con.close()
+
+
+def bench_db(rows: int, page_size: int):
+    deals = synthetic_deals(rows)
+    pages = [deals[i:i + page_size] for i in range(0, len(deals), page_size)]
+    print(f"[BENCH] {rows} deals, save_many par lots de {page_size} (une page listing)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "legacy.db")
+        _legacy_init(path)
+        t0 = time.perf_counter()
+        for page in pages:
+            _legacy_save_many(path, page)
+        legacy = time.perf_counter() - t0
+        print(f"  ancien writer : {legacy:7.2f} s  {rows / legacy:10.0f} lignes/s")
+
+        # même schéma, un deal par transaction : ce que les upserts par lots doivent battre
+        path = os.path.join(tmp, "per_row.db")
+        db = DBManager(path)
+        t0 = time.perf_counter()
+        for d in deals:
+            db.save_many([d])
+        per_row = time.perf_counter() - t0
+        db.close()
+        print(f"  1 deal / tx   : {per_row:7.2f} s  {rows / per_row:10.0f} lignes/s  (schéma actuel)")
+
+        path = os.path.join(tmp, "new.db")
+        db = DBManager(path)
+        t0 = time.perf_counter()
+        for page in pages:
+            db.save_many(page)
+        new = time.perf_counter() - t0
+        print(f"  DBManager     : {new:7.2f} s  {rows / new:10.0f} lignes/s  (x{legacy / new:.1f} vs ancien, "
+              f"x{per_row / new:.1f} vs 1 deal / tx)")
+        print("                  (index de tri, FTS5, facettes et historique des prix maintenus en plus)")
+        if new >= per_row:
+            print("  [ALERTE] les lots ne sont plus plus rapides qu'une transaction par deal")
+
+        t0 = time.perf_counter()
+        DBManager(path).close()
+        print(f"  réouverture   : {(time.perf_counter() - t0) * 1000:7.1f} ms  (schéma à jour : ni DDL ni verrou)")
+
+        # second passage : mêmes URLs -> upserts, la table ne grossit pas
+        t0 = time.perf_counter()
+        db.save_many(deals)
+        upsert = time.perf_counter() - t0
+        count = db.con.execute("SELECT COUNT(*) FROM leclerc_deals").fetchone()[0]
+        print(f"  re-upsert     : {upsert:7.2f} s  {rows / upsert:10.0f} lignes/s  ({count} lignes en base)")
+        db.close()
+
+
+# ---------- API ----------
+API_URLS = [
+    "/api/deals",
+    "/api/deals?sort=recent",
+    "/api/deals?promo=percent&sort=price_desc",
+    "/api/deals?q=produit+modele",
+    "/api/categories",
+]
+
+
+def build_db(path: str, rows: int):
+    db = DBManager(path)
+    db.save_many(synthetic_deals(rows))
+    db.close()
+
+
+def bench_api(rows: int, seconds: float):
+    import front
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "api.db")
+        build_db(path, rows)
+        app = front.create_app(path)
+        client = app.test_client()
+        print(f"[BENCH] {rows} deals, {len(API_URLS)} URLs en boucle pendant {seconds:.0f} s par mode")
+
+        for label, cache_size, headers in (
+            ("sans cache", 0, {}),
+            ("cache", 256, {}),
+            ("cache + gzip", 256, {"Accept-Encoding": "gzip"}),
+        ):
+            app.config["RESPONSE_CACHE_SIZE"] = cache_size
+            n, t0 = 0, time.perf_counter()
+            while time.perf_counter() - t0 < seconds:
+                client.get(API_URLS[n % len(API_URLS)], headers=headers)
+                n += 1
+            elapsed = time.perf_counter() - t0
+            print(f"  {label:<14}: {n / elapsed:8.0f} req/s")
+
+        # revalidation : le client renvoie l'ETag reçu -> 304 sans corps
+        etags = {u: client.get(u).headers.get("ETag") for u in API_URLS}
+        n, t0 = 0, time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            u = API_URLS[n % len(API_URLS)]
+            client.get(u, headers={"If-None-Match": etags[u]})
+            n += 1
+        print(f"  {'304 (ETag)':<14}: {n / (time.perf_counter() - t0):8.0f} req/s")
+
+
+PAYLOAD_MODES = (
+    # libellé, route, paramètres en plus, lignes -> objets comme les consomme la grille
+    ("/api/deals", "/api/deals", {}, lambda body: body["items"]),
+    ("/api/cards rows", "/api/cards", {}, lambda body: body["items"]),
+    ("/api/cards columns", "/api/cards", {"layout": "columns"},
+     lambda body: [dict(zip(body["cols"], row)) for row in zip(*body["cols"].values())]),
+)
+
+
+def bench_payload(rows: int):
+    """Toute la liste parcourue par curseur (pages de MAX_PAGE_SIZE) : taille brute / gzip,
+    temps de json.loads + reconstruction des objets, et coût d'une fiche ouverte."""
+    import front
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "payload.db")
+        build_db(path, rows)
+        client = front.create_app(path, RESPONSE_CACHE_SIZE=0).test_client()
+        print(f"[BENCH] {rows} deals, pages de {front.MAX_PAGE_SIZE}")
+        for label, route, extra, decode in PAYLOAD_MODES:
+            bodies, cursor = [], None
+            while True:
+                params = {"limit": front.MAX_PAGE_SIZE, **extra, **({"cursor": cursor} if cursor else {})}
+                body = client.get(route, query_string=params).get_data()
+                bodies.append(body)
+                cursor = json.loads(body)["next_cursor"]
+                if cursor is None:
+                    break
+            raw = sum(len(b) for b in bodies)
+            zipped = sum(len(gzip.compress(b, 6)) for b in bodies)
+            t0 = time.perf_counter()
+            n = sum(len(decode(json.loads(b))) for b in bodies)
+            parse_ms = (time.perf_counter() - t0) * 1000
+            print(f"  {label:<20}: {raw / 1e6:7.2f} Mo | gzip {zipped / 1e6:6.2f} Mo "
+                  f"| parsing {parse_ms:7.1f} ms ({n} objets)")
+        detail = client.get("/api/deals/1").get_data()
+        print(f"  {'/api/deals/<id>':<20}: {len(detail)} o par fiche ouverte")
+
+
+SERVE_URLS = [
+    "/api/deals?sort=price&limit=60",
+    "/api/deals?sort=recent&limit=60",
+    "/api/deals?sort=discount&limit=60",
+    "/api/deals?promo=percent&sort=price_desc&limit=60",
+    "/api/deals?q=modèle&limit=60",
+    "/api/deals?seller=Darty&limit=60",
+]
+
+
+def _synthetic_writer(db_path: str, stop, written, batch: int = 200, pause: float = 0.02):
+    """Processus écrivain : lots de nouveaux deals (et prix mis à jour) en continu, comme le scraper."""
+    db = DBManager(db_path)
+    k = 0
+    try:
+        while not stop.is_set():
+            deals = synthetic_deals(batch, seed=k)
+            for i, d in enumerate(deals):
+                if i % 2:  # moitié nouveaux produits, moitié observations de prix
+                    d["page_url"] += f"-w{k}"
+            written.value += db.save_many(deals)
+            k += 1
+            time.sleep(pause)
+    finally:
+        db.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _load(base: str, clients: int, seconds: float, rate: float = 0) -> Dict:
+    """`clients` threads sur SERVE_URLS pendant `seconds` : latences (ms) et erreurs.
+
+    rate > 0 : charge ouverte à `rate` requêtes/s au total (la latence mesure alors le
+    service et les attentes de verrou, pas la file d'attente d'un serveur saturé).
+    """
+    import requests
+
+    samples: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(n: int):
+        session = requests.Session()
+        local, bad = [], 0
+        interval = clients / rate if rate > 0 else 0
+        next_at = time.perf_counter() + interval * n / clients
+        while time.perf_counter() < deadline:
+            if interval:
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+                next_at += interval
+            t0 = time.perf_counter()
+            try:
+                ok = session.get(base + SERVE_URLS[n % len(SERVE_URLS)], timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            local.append((time.perf_counter() - t0) * 1000)
+            bad += not ok
+            n += 1
+        with lock:
+            samples.extend(local)
+            errors[0] += bad
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    p50, p95, p99 = _percentiles(samples, 50, 95, 99)
+    return {"n": len(samples), "rps": len(samples) / seconds, "p50": p50, "p95": p95, "p99": p99,
+            "max": max(samples), "errors": errors[0]}
+
+
+def bench_serve(rows: int, clients: int, seconds: float, threads: int, rate: float):
+    """front.py lancé comme en production (processus séparé, cache de réponses coupé) :
+    latence de /api/deals sans puis avec un écrivain qui insère en continu, pour une
+    connexion par requête (pool 0) et pour le pool de connexions en lecture seule."""
+    import requests
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.db")
+        build_db(source, rows)
+        load = f"{rate:.0f} req/s" if rate > 0 else "en boucle"
+        print(f"[BENCH] {rows} deals, {clients} clients ({load}), {threads} threads serveur, "
+              f"{seconds:.0f} s par mesure, {os.cpu_count()} CPU")
+        for label, pool_size in (("connexion/requête", 0), (f"pool ro x{threads}", threads)):
+            # même base de départ pour chaque mode (l'écrivain du mode précédent l'a fait grossir)
+            path = os.path.join(tmp, f"serve-{pool_size}.db")
+            shutil.copyfile(source, path)
+            port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "front.py"),
+                 "--db", path, "--port", str(port), "--threads", str(threads),
+                 "--pool-size", str(pool_size), "--cache-size", "0"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            base = f"http://127.0.0.1:{port}"
+            try:
+                for _ in range(100):
+                    try:
+                        requests.get(base + "/api/categories", timeout=1)
+                        break
+                    except requests.RequestException:
+                        time.sleep(0.1)
+                _load(base, clients, 1)  # échauffement (cache de pages SQLite, connexions)
+                for phase in ("lecture seule", "avec écrivain"):
+                    stop, written = ctx.Event(), ctx.Value("i", 0)
+                    writer = None
+                    if phase == "avec écrivain":
+                        writer = ctx.Process(target=_synthetic_writer, args=(path, stop, written))
+                        writer.start()
+                        time.sleep(0.5)
+                    r = _load(base, clients, seconds, rate)
+                    if writer is not None:
+                        stop.set()
+                        writer.join()
+                    extra = f" | écrivain {written.value / seconds:6.0f} lignes/s" if writer is not None else ""
+                    print(f"  {label:<18} {phase:<14}: {r['rps']:6.0f} req/s | p50 {r['p50']:6.1f} ms "
+                          f"| p95 {r['p95']:6.1f} ms | p99 {r['p99']:6.1f} ms | max {r['max']:7.1f} ms "
+                          f"| erreurs {r['errors']}{extra}")
+            finally:
+                server.terminate()
+                server.wait()
+
+
+# ---------- GRILLE (navigateur) ----------
+def bench_grid(cards: int):
+    """Ouvre /bench/grid dans Chrome headless et lit window.BENCH_RESULT."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from werkzeug.serving import make_server
+    from utiles import resolve_driver_path
+    import front
+
+    server = make_server("127.0.0.1", 0, front.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    opts = Options()
+    opts.add_argument("--headless=new")
+    opts.add_argument("--window-size=1400,900")
+    driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=opts)
+    try:
+        driver.get(f"http://127.0.0.1:{server.server_port}/bench/grid?n={cards}")
+        result = WebDriverWait(driver, 60).until(lambda d: d.execute_script("return window.BENCH_RESULT"))
+        print(f"[BENCH] grille virtuelle, {result['cards']} cartes, {result['keystrokes']} frappes")
+        print(f"  p50 {result['p50_ms']:.2f} ms | max {result['max_ms']:.2f} ms "
+              f"| objectif < {result['target_ms']} ms : {'OK' if result['ok'] else 'ÉCHEC'}")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+# ---------- BOUT EN BOUT (site de fixture) ----------
+E2E_MODES = {
+    # nom -> options de LeclercScraper
+    "dom": {},
+    "batch": {"batch_cards": True},
+    "http": {"batch_cards": True, "detail_backend": "http"},
+    "pool": {"batch_cards": True, "detail_workers": 4},
+    "api": {"batch_cards": True, "capture_api": True, "detail_backend": "http"},
+}
+
+
+def _percentiles(samples: List[float], *qs: float) -> List[float]:
+    ordered = sorted(samples)
+    return [ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] for q in qs]
+
+
+def bench_e2e(pages: int, cards: int, latency: float, modes: List[str], api_requests: int):
+    """Scraper complet contre fixture_site.py : listing, fiches, écriture DB, puis /api/deals."""
+    from fixture_site import FixtureSite
+    from utiles import LeclercScraper
+    import front
+
+    print(f"[BENCH] site de fixture : {pages} pages x {cards} cartes, latence {latency * 1000:.0f} ms/page")
+    # listing rendu côté client depuis /api/bons-plans, comme l'application Angular
+    with FixtureSite(pages, cards, latency, spa=True) as site, tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            path = os.path.join(tmp, f"{mode}.db")
+            db = DBManager(path)
+            scraper = LeclercScraper(headless=True, base_url=site.base_url, **E2E_MODES[mode])
+            t_cards = t_details = t_db = t_nav = 0.0
+            n_cards = n_rows = 0
+            mismatches = None
+            try:
+                t0 = time.perf_counter()
+                scraper.open_homepage()
+                scraper.go_to_bons_plans()
+                t_nav += time.perf_counter() - t0
+                for page_no in range(1, pages + 1):
+                    if mismatches is None and not scraper.capture_api:
+                        mismatches = scraper.compare_card_extractors()
+                    t0 = time.perf_counter()
+                    deals = scraper.extract_current_page_cards()
+                    t_cards += time.perf_counter() - t0
+                    n_cards += len(deals)
+                    if mismatches is None:
+                        # capture JSON vs DOM sur la première page
+                        dom = scraper._extract_cards_batch()
+                        mismatches = [i for i in range(max(len(dom), len(deals)))
+                                      if i >= len(dom) or i >= len(deals) or dom[i] != deals[i]]
+
+                    t0 = time.perf_counter()
+                    scraper.complete_cards(deals)
+                    t_details += time.perf_counter() - t0
+
+                    t0 = time.perf_counter()
+                    n_rows += db.save_many(deals)
+                    t_db += time.perf_counter() - t0
+
+                    if page_no == pages:
+                        break
+                    t0 = time.perf_counter()
+                    moved = scraper.go_next_page()
+                    t_nav += time.perf_counter() - t0
+                    if not moved:
+                        break
+            finally:
+                scraper.close()
+                db.close()
+
+            print(f"  {mode:<6}: cartes {n_cards / t_cards:8.0f}/s | fiches {n_cards / t_details:7.1f}/s "
+                  f"| DB {n_rows / t_db:8.0f} lignes/s | navigation {t_nav:5.1f} s "
+                  f"| extracteurs divergents : {len(mismatches or [])}")
+
+        # latence de l'API sur la dernière base remplie, cache de réponses coupé
+        client = front.create_app(path, RESPONSE_CACHE_SIZE=0).test_client()
+        samples = []
+        for i in range(api_requests):
+            t0 = time.perf_counter()
+            client.get(API_URLS[i % len(API_URLS)])
+            samples.append((time.perf_counter() - t0) * 1000)
+        p50, p95, p99 = _percentiles(samples, 50, 95, 99)
+        print(f"  /api/*  : p50 {p50:.2f} ms | p95 {p95:.2f} ms | p99 {p99:.2f} ms ({api_requests} requêtes)")
+        print(f"  requêtes servies par la fixture : {site.hits}")
+
+
+def bench_lean(pages: int, cards: int, latency: float, details: int):
+    """Même parcours avec le profil Chrome complet puis le mode lean, sur le site de fixture."""
+    from fixture_site import FixtureSite
+    from utiles import LeclercScraper
+
+    print(f"[BENCH] profil complet vs lean : {pages} pages x {cards} cartes, "
+          f"{details} fiches/page, latence {latency * 1000:.0f} ms/page")
+    with FixtureSite(pages, cards, latency) as site:
+        for lean in (False, True):
+            site.reset_counters()
+            t_start = time.perf_counter()
+            scraper = LeclercScraper(headless=True, base_url=site.base_url, batch_cards=True, lean=lean)
+            page_loads = []
+            try:
+                t0 = time.perf_counter()
+                scraper.open_homepage()
+                scraper.go_to_bons_plans()
+                t_entry = time.perf_counter() - t0
+                for page_no in range(1, pages + 1):
+                    deals = scraper.extract_current_page_cards()
+                    scraper.fetch_remote_details([d.get("page_url") for d in deals[:details]])
+                    if page_no == pages:
+                        break
+                    t0 = time.perf_counter()
+                    moved = scraper.go_next_page()
+                    page_loads.append(time.perf_counter() - t0)
+                    if not moved:
+                        break
+            finally:
+                scraper.close()
+            total = time.perf_counter() - t_start
+            per_page = sum(page_loads) / len(page_loads) * 1000 if page_loads else 0.0
+            kb = sum(site.bytes_sent.values()) / 1024
+            assets = site.hits["img"] + site.hits["static"]
+            print(f"  {'lean' if lean else 'complet':<8}: accueil+bons plans {t_entry:5.2f} s "
+                  f"| page suivante {per_page:7.1f} ms | {kb:9.0f} Ko servis ({assets} ressources) "
+                  f"| run total {total:6.2f} s")
+
+
+def bench_startup(runs: int, latency: float):
+    """Temps jusqu'à la première carte : driver re-résolu + profil neuf, driver en cache,
+    driver en cache + profil persistant (bannière cookies déjà acceptée)."""
+    from fixture_site import FixtureSite
+    from utiles import LeclercScraper, resolve_driver_path
+
+    def first_card(**kwargs) -> float:
+        t0 = time.perf_counter()
+        scraper = LeclercScraper(headless=True, base_url=site.base_url, batch_cards=True, **kwargs)
+        try:
+            scraper.open_homepage()
+            scraper.go_to_bons_plans()
+            scraper.extract_current_page_cards()
+            return time.perf_counter() - t0
+        finally:
+            scraper.close()
+
+    print(f"[BENCH] temps jusqu'à la première carte, {runs} runs par mode (site de fixture)")
+    with FixtureSite(2, 48, latency) as site, tempfile.TemporaryDirectory() as tmp:
+        profile = os.path.join(tmp, "profil")
+        first_card(user_data_dir=profile)  # consentement enregistré dans le profil
+        for label, prepare, kwargs in (
+            ("froid", lambda: resolve_driver_path(refresh=True), {}),
+            ("driver en cache", lambda: None, {}),
+            ("cache + profil", lambda: None, {"user_data_dir": profile}),
+        ):
+            samples = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                prepare()
+                samples.append(time.perf_counter() - t0 + first_card(**kwargs))
+            print(f"  {label:<16}: médiane {sorted(samples)[len(samples) // 2]:5.2f} s "
+                  f"| min {min(samples):5.2f} s | max {max(samples):5.2f} s")
+
+
+def bench_shards(pages: int, cards: int, latency: float, processes: List[int]):
+    """Débit de app.sharded_pipeline selon le nombre de processus, sur le site de fixture."""
+    import app
+    from fixture_site import FixtureSite
+
+    print(f"[BENCH] crawl partitionné : {pages} pages x {cards} cartes, latence {latency * 1000:.0f} ms/page, "
+          f"fiches en HTTP")
+    with FixtureSite(pages, cards, latency) as site, tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for n in processes:
+            res = app.sharded_pipeline(last_page=pages, processes=n, db_path=os.path.join(tmp, f"p{n}.db"),
+                                       collect_metrics=False, base_url=site.base_url)
+            rate = res["pages"] / res["seconds"]
+            baseline = baseline or rate
+            print(f"  {n:2d} processus : {res['seconds']:6.1f} s | {rate:5.2f} pages/s "
+                  f"| {res['saved']} produits | x{rate / baseline:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("db", help="ancien writer vs DBManager (WAL + upserts par lots)")
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--page-size", type=int, default=48)
+
+    p = sub.add_parser("api", help="/api/deals avec et sans cache de réponses")
+    p.add_argument("--rows", type=int, default=50_000)
+    p.add_argument("--seconds", type=float, default=3)
+
+    p = sub.add_parser("payload", help="/api/deals vs liste compacte /api/cards (taille, parsing)")
+    p.add_argument("--rows", type=int, default=50_000)
+
+    p = sub.add_parser("serve", help="front.py en serveur : p99 de /api/deals pendant une écriture continue")
+    p.add_argument("--rows", type=int, default=50_000)
+    p.add_argument("--clients", type=int, default=16)
+    p.add_argument("--seconds", type=float, default=10)
+    p.add_argument("--threads", type=int, default=8, help="threads (et connexions) du serveur")
+    p.add_argument("--rate", type=float, default=30, help="requêtes/s au total (0 = clients en boucle)")
+
+    p = sub.add_parser("grid", help="filtrage par frappe de la grille virtuelle (Chrome headless)")
+    p.add_argument("--cards", type=int, default=20_000)
+
+    p = sub.add_parser("e2e", help="scraper complet contre le site de fixture local (Chrome headless)")
+    p.add_argument("--pages", type=int, default=5)
+    p.add_argument("--cards", type=int, default=48)
+    p.add_argument("--latency", type=float, default=0.05, help="secondes ajoutées par page HTML")
+    p.add_argument("--modes", default=",".join(E2E_MODES), help=f"parmi {','.join(E2E_MODES)}")
+    p.add_argument("--api-requests", type=int, default=500)
+
+    p = sub.add_parser("lean", help="profil Chrome complet vs mode lean (site de fixture, Chrome headless)")
+    p.add_argument("--pages", type=int, default=5)
+    p.add_argument("--cards", type=int, default=48)
+    p.add_argument("--latency", type=float, default=0.05)
+    p.add_argument("--details", type=int, default=5, help="fiches produit visitées par page")
+
+    p = sub.add_parser("startup", help="démarrage à froid vs driver en cache / profil persistant")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--latency", type=float, default=0.05)
+
+    p = sub.add_parser("shards", help="crawl multi-processus : débit selon le nombre de processus")
+    p.add_argument("--pages", type=int, default=24)
+    p.add_argument("--cards", type=int, default=48)
+    p.add_argument("--latency", type=float, default=0.2)
+    p.add_argument("--processes", default="1,2,4")
+
+    args = parser.parse_args()
+    if args.cmd == "db":
+        bench_db(args.rows, args.page_size)
+    elif args.cmd == "api":
+        bench_api(args.rows, args.seconds)
+    elif args.cmd == "payload":
+        bench_payload(args.rows)
+    elif args.cmd == "serve":
+        bench_serve(args.rows, args.clients, args.seconds, args.threads, args.rate)
+    elif args.cmd == "grid":
+        bench_grid(args.cards)
+    elif args.cmd == "e2e":
+        modes = [m for m in args.modes.split(",") if m]
+        unknown = [m for m in modes if m not in E2E_MODES]
+        if unknown or not modes:
+            parser.error(f"modes inconnus : {', '.join(unknown) or '(aucun)'}")
+        bench_e2e(args.pages, args.cards, args.latency, modes, args.api_requests)
+    elif args.cmd == "lean":
+        bench_lean(args.pages, args.cards, args.latency, args.details)
+    elif args.cmd == "startup":
+        bench_startup(args.runs, args.latency)
+    elif args.cmd == "shards":
+        bench_shards(args.pages, args.cards, args.latency, [int(n) for n in args.processes.split(",") if n])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Chemins partagés par le scraper, front.py, export.py et thumbs.py.
+
+Module sans dépendance : front.py et export.py l'importent sans charger utiles.py
+(selenium, webdriver_manager, lxml) ni thumbs.py (Pillow).
+"""
+import os
+from typing import Optional
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# base partagée : argument, sinon $LECLERC_DB, sinon leclerc_deals.db à côté des modules
+# (jamais relatif au répertoire courant)
+DB_PATH_ENV = "LECLERC_DB"
+DEFAULT_DB_PATH = os.path.join(_HERE, "leclerc_deals.db")
+
+# PRAGMA user_version de la base : à incrémenter à chaque changement de utiles.SCHEMA / migration.
+# front.py le compare à la base ouverte avant de servir.
+SCHEMA_VERSION = 5
+
+# vignettes à côté de la base : front.py et app.py partagent le cache
+DEFAULT_THUMB_DIR = os.path.join(_HERE, "thumbs")
+
+
+def resolve_db_path(db_path: Optional[str] = None) -> str:
+    return db_path or os.environ.get(DB_PATH_ENV) or DEFAULT_DB_PATH
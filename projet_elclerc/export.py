@@ -0,0 +1,93 @@
+"""Export en flux de la table leclerc_deals (NDJSON ou tableau JSON).
+
+Le curseur est parcouru par `fetchmany` : la mémoire reste constante quel que
+soit le nombre de lignes. Utilisé par les routes /api/deals.ndjson et
+/api/deals.json de front.py, et en ligne de commande :
+
+    python export.py --format ndjson -o deals.ndjson
+    python export.py --format json > deals.json
+"""
+import argparse
+import json
+import sqlite3
+import sys
+from typing import Iterator, List, Sequence
+
+from config import resolve_db_path  # même base par défaut que le scraper et front.py
+
+EXPORT_COLUMNS = ("id", "sold_by", "product_name", "discount_text", "price_eur", "page_url",
+                  "image_url", "description", "features", "category", "scraped_at",
+                  "promo_kind", "discount_pct", "discount_eur", "original_price_eur")
+
+
+def select_rows(con: sqlite3.Connection, where: Sequence[str] = (), params: Sequence = ()) -> sqlite3.Cursor:
+    """Curseur sur les lignes dans l'ordre des id (parcours de la clé primaire, aucun tri à
+    matérialiser). La requête est exécutée tout de suite : une erreur SQL remonte ici, avant
+    que front.py n'envoie les en-têtes de la réponse."""
+    sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM leclerc_deals"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return con.execute(sql + " ORDER BY id", tuple(params))
+
+
+def iter_rows(cur: sqlite3.Cursor, batch_size: int = 500) -> Iterator[tuple]:
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _encode(row: tuple) -> str:
+    return json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False)
+
+
+def iter_ndjson(cur: sqlite3.Cursor, batch_size: int = 500) -> Iterator[bytes]:
+    """Un objet JSON par ligne ; un morceau émis par lot de `batch_size` lignes."""
+    chunk: List[str] = []
+    for row in iter_rows(cur, batch_size):
+        chunk.append(_encode(row))
+        if len(chunk) >= batch_size:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+def iter_json_array(cur: sqlite3.Cursor, batch_size: int = 500) -> Iterator[bytes]:
+    """Même flux sous forme d'un tableau JSON valide : `[` ... `]`."""
+    yield b"["
+    first = True
+    chunk: List[str] = []
+    for row in iter_rows(cur, batch_size):
+        chunk.append(_encode(row))
+        if len(chunk) >= batch_size:
+            yield (("" if first else ",") + ",".join(chunk)).encode()
+            first, chunk = False, []
+    if chunk:
+        yield (("" if first else ",") + ",".join(chunk)).encode()
+    yield b"]\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="base SQLite (défaut : $LECLERC_DB, sinon celle du scraper)")
+    parser.add_argument("--format", choices=("ndjson", "json"), default="ndjson")
+    parser.add_argument("-o", "--output", help="fichier de sortie (défaut : stdout)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    con = sqlite3.connect(f"file:{resolve_db_path(args.db)}?mode=ro", uri=True)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        chunks = iter_ndjson if args.format == "ndjson" else iter_json_array
+        for chunk in chunks(select_rows(con), batch_size=args.batch_size):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
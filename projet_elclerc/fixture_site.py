@@ -0,0 +1,331 @@
+"""Site de substitution hors-ligne pour mesurer `LeclercScraper` sans réseau.
+
+Sert une page d'accueil (bannière cookies, bouton menu, lien Bons Plans), des
+pages listing `/bons-plans?page=N` et des fiches produit `/fp/<slug>-<id>`.
+Le DOM est construit à partir des XPaths absolus de utiles.py : si un XPath
+change, la fixture suit. Données déterministes, latence injectable.
+
+Avec `spa=True`, le listing se comporte comme l'application Angular : la page
+arrive vide et un script remplit les cartes (même balisage) depuis le JSON de
+`/api/bons-plans?page=N` (mode capture_api du scraper).
+
+    python fixture_site.py --port 8000 --pages 10 --cards 48 --latency 0.2 [--spa]
+
+puis `LeclercScraper(base_url="http://127.0.0.1:8000/")`.
+"""
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from utiles import (XPATH_ALL_PRODUCT_LIST, XPATH_BONS_PLANS_BUTTON, XPATH_FEATURES_TBODY,
+                    XPATH_MENU_BUTTON, XPATH_PRODUCT_DESCRIPTION)
+
+SELLERS = ["E.Leclerc", "Boulanger Pro", "Darty Marketplace", "Électro Dépôt"]
+CATEGORIES = ["Téléviseurs", "Électroménager", "Informatique", "Jardin", "Jouets", "Cuisine"]
+# espaces insécables comme sur le vrai site (« -15 % », « 1 064 ») : les deux extracteurs
+# de cartes doivent les normaliser pareil
+PROMOS = ["-20%", "-15\u00a0%", "-10€", "-50\u00a0€", "Offre spéciale", None]
+FEATURE_LABELS = ["Marque", "Référence", "Couleur", "Poids", "Largeur", "Hauteur", "Profondeur",
+                  "Garantie", "Puissance", "Consommation", "Matière", "Origine", "Pièces détachées"]
+
+# GIF 1x1 transparent : les <img> des cartes pointent sur /img/<id>.gif?w=300
+PIXEL_GIF = (b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00"
+             b",\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;")
+
+
+# ---------- DOM à partir des XPaths ----------
+class _Node:
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.attrs: Dict[str, str] = {}
+        self.children: List["_Node"] = []
+        self.inner = ""
+
+    def child(self, step: str) -> "_Node":
+        """`tag` ou `tag[n]` : crée les frères vides nécessaires pour que l'index tombe juste."""
+        m = re.fullmatch(r"([\w-]+)(?:\[(\d+)\])?", step)
+        tag, n = m.group(1), int(m.group(2) or 1)
+        same = [c for c in self.children if c.tag == tag]
+        while len(same) < n:
+            node = _Node(tag)
+            self.children.append(node)
+            same.append(node)
+        return same[n - 1]
+
+    def at(self, xpath: str) -> "_Node":
+        """Noeud désigné par un XPath absolu /html/body/... (créé au besoin)."""
+        node = self
+        for step in xpath.split("/")[3:]:
+            node = node.child(step)
+        return node
+
+    def render(self) -> str:
+        attrs = "".join(f' {k}="{html.escape(v)}"' for k, v in self.attrs.items())
+        body = "".join(c.render() for c in self.children) + self.inner
+        return f"<{self.tag}{attrs}>{body}</{self.tag}>"
+
+
+# ressources annexes référencées par chaque page, comme sur le vrai site (CSS + police + traceur),
+# avec leurs paramètres de version / taille : le blocage lean doit couvrir les query strings
+IMAGE_QUERY = "?w=300"
+ASSETS_HEAD = ('<link rel="stylesheet" href="/static/app.css?v=3">'
+               '<script async src="/static/gtm.js?id=GTM-FIXTURE"></script>')
+APP_CSS = (b"@font-face{font-family:Site;src:url(/static/site.woff2?v=3) format('woff2')}"
+           b"body{font-family:Site,sans-serif}")
+TRACKER_JS = b"/* traceur factice */" + b" " * 40_000
+
+
+def _document(body: _Node, title: str) -> bytes:
+    return (f'<!doctype html><html lang="fr"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f"{ASSETS_HEAD}</head>{body.render()}</html>").encode()
+
+
+# ---------- données ----------
+def fixture_product(product_id: int, seed: int = 42) -> Dict:
+    rnd = random.Random(product_id * 7919 + seed)
+    price = round(rnd.uniform(2, 1500), 2)
+    features = [(label, f"{label} {rnd.randint(1, 99)}") for label in FEATURE_LABELS]
+    features.insert(13, ("Catégorie", rnd.choice(CATEGORIES)))  # /tr[14]/td
+    return {
+        "id": product_id,
+        "slug": f"produit-fixture-{product_id}",
+        "name": f"Produit fixture n°\u00a0{product_id} modèle {rnd.randint(100, 999)}",
+        "seller": rnd.choice(SELLERS),
+        "promo": rnd.choice(PROMOS),
+        "euros": int(price),
+        "cents": f"{round(price % 1 * 100):02d}",
+        "description": [f"Paragraphe {k} de description du produit {product_id}." for k in range(rnd.randint(1, 4))],
+        "features": features,
+    }
+
+
+def _api_item(p: Dict) -> Dict:
+    """Forme « API du site » d'un produit (clés volontairement différentes des deals)."""
+    return {
+        "id": p["id"],
+        "label": p["name"],
+        "url": f"/fp/{p['slug']}-{p['id']}",
+        "seller": {"name": p["seller"]},
+        "price": {"value": float(f"{p['euros']}.{p['cents']}"), "currency": "EUR"},
+        "promotion": {"label": p["promo"]} if p["promo"] else None,
+        "images": [{"url": f"/img/{p['id']}.gif{IMAGE_QUERY}"}],
+    }
+
+
+# rendu client des cartes : même balisage que _card_html, à partir de _api_item
+SPA_SCRIPT = """
+<script>
+const esc = s => String(s).replace(/[&<>"']/g, c => ({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#x27;'}[c]));
+function card(p){
+  const total = Math.round(p.price.value * 100);
+  const promo = p.promotion ? `<app-product-promo><div><div>${esc(p.promotion.label)}</div></div></app-product-promo>` : '';
+  const euros = String(Math.floor(total / 100)).replace(/\\B(?=(\\d{3})+$)/g, '\\u202f');
+  return `<li><app-product-card><app-lazy-image><img src="${esc(p.images[0].url)}" alt=""></app-lazy-image>`
+    + `<app-product-card-label><div><a href="${esc(p.url)}">${esc(p.label)}</a></div></app-product-card-label>`
+    + `<app-product-card-seller><p>Vendu par <span>${esc(p.seller.name)}</span></p></app-product-card-seller>`
+    + promo
+    + `<app-product-price><div id="price"><div class="price-unit">${euros}</div>`
+    + `<span class="price-cents">,${String(total % 100).padStart(2, '0')} €</span></div></app-product-price>`
+    + `</app-product-card></li>`;
+}
+fetch('/api/bons-plans?page=__PAGE__').then(r => r.json()).then(data => {
+  document.getElementById('result-list').innerHTML = data.results.items.map(card).join('');
+});
+</script>
+"""
+
+
+def _card_html(p: Dict) -> str:
+    promo = (f"<app-product-promo><div><div>{html.escape(p['promo'])}</div></div></app-product-promo>"
+             if p["promo"] else "")
+    euros = f"{p['euros']:,}".replace(",", "\u202f")  # séparateur de milliers insécable fin
+    return (
+        "<li><app-product-card>"
+        f'<app-lazy-image><img src="/img/{p["id"]}.gif{IMAGE_QUERY}" alt=""></app-lazy-image>'
+        f'<app-product-card-label><div><a href="/fp/{p["slug"]}-{p["id"]}">{html.escape(p["name"])}</a>'
+        "</div></app-product-card-label>"
+        f"<app-product-card-seller><p>Vendu par <span>{html.escape(p['seller'])}</span></p></app-product-card-seller>"
+        f"{promo}"
+        '<app-product-price><div id="price">'
+        f'<div class="price-unit">{euros}</div><span class="price-cents">,{p["cents"]} €</span>'
+        "</div></app-product-price>"
+        "</app-product-card></li>"
+    )
+
+
+class FixtureSite:
+    """Serveur HTTP local (un thread par requête) ; `latency` en secondes par page HTML."""
+
+    def __init__(self, pages: int = 5, cards_per_page: int = 48, latency: float = 0.0,
+                 detail_latency: Optional[float] = None, seed: int = 42, image_bytes: int = 30_000,
+                 spa: bool = False, host: str = "127.0.0.1", port: int = 0):
+        self.pages = pages
+        self.cards_per_page = cards_per_page
+        self.latency = latency
+        self.detail_latency = latency if detail_latency is None else detail_latency
+        self.seed = seed
+        self.spa = spa
+        # GIF valide suivi de remplissage (ignoré par le décodeur) : poids réaliste d'une photo produit
+        self.image = PIXEL_GIF + b"\0" * max(0, image_bytes - len(PIXEL_GIF))
+        self.hits = {"home": 0, "listing": 0, "api": 0, "detail": 0, "img": 0, "static": 0}
+        self.bytes_sent = dict.fromkeys(self.hits, 0)
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FixtureSite":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fixture-site", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            for kind in self.hits:
+                self.hits[kind] = self.bytes_sent[kind] = 0
+
+    # --- pages ---
+    def homepage(self, listing_page: Optional[int] = None) -> bytes:
+        body = _Node("body")
+        cookies = body.child("div")
+        cookies.attrs["id"] = "cookie-banner"
+        cookies.inner = '<button onclick="this.parentNode.remove()">Accepter</button>'
+
+        menu = body.at(XPATH_MENU_BUTTON)
+        menu.attrs["onclick"] = "document.querySelector('ng-sidebar').style.display='block'"
+        menu.inner = "Menu"
+        body.at("/html/body/app-root/ng-sidebar-container/ng-sidebar").attrs["style"] = "display:none"
+        link = body.at(XPATH_BONS_PLANS_BUTTON)
+        link.attrs["href"] = "/bons-plans"
+        link.inner = "Bons plans"
+
+        if listing_page is None:
+            return _document(body, "Accueil")
+        result_list = body.at(XPATH_ALL_PRODUCT_LIST)
+        if self.spa:
+            result_list.attrs["id"] = "result-list"
+            body.inner = SPA_SCRIPT.replace("__PAGE__", str(listing_page))
+        else:
+            result_list.inner = "".join(_card_html(p) for p in self.listing_products(listing_page))
+        last = listing_page >= self.pages
+        nav = body.child("nav")
+        nav.inner = (f'<ul class="pagination"><li class="pagination-next{" disabled" if last else ""}">'
+                     f'<a href="/bons-plans?page={listing_page + 1}">Suivant</a></li></ul>')
+        return _document(body, f"Bons plans page {listing_page}")
+
+    def listing_products(self, page: int) -> List[Dict]:
+        first = (page - 1) * self.cards_per_page + 1
+        return [fixture_product(i, self.seed) for i in range(first, first + self.cards_per_page)]
+
+    def listing_api(self, page: int) -> bytes:
+        items = [_api_item(p) for p in self.listing_products(page)]
+        payload = {"page": page, "pages": self.pages,
+                   "results": {"total": self.pages * self.cards_per_page, "items": items}}
+        return json.dumps(payload, ensure_ascii=False).encode()
+
+    def product_page(self, product_id: int) -> bytes:
+        p = fixture_product(product_id, self.seed)
+        body = _Node("body")
+        body.at("/html/body/main/div/div/div[1]").inner = f"<h1>{html.escape(p['name'])}</h1>"
+        body.at(XPATH_PRODUCT_DESCRIPTION).inner = "".join(f"<p>{html.escape(t)}</p>" for t in p["description"])
+        body.at(XPATH_FEATURES_TBODY).inner = "".join(
+            f"<tr><th>{html.escape(k)}</th><td>{html.escape(v)}</td></tr>" for k, v in p["features"])
+        return _document(body, p["name"])
+
+    # --- routage ---
+    def _handle(self, req: BaseHTTPRequestHandler):
+        url = urlsplit(req.path)
+        status, ctype, data, kind, delay = 404, "text/plain; charset=utf-8", b"introuvable", None, 0.0
+        m = re.fullmatch(r"/fp/[\w-]*?-(\d+)", url.path)
+        if url.path == "/":
+            status, ctype, data, kind, delay = 200, "text/html; charset=utf-8", self.homepage(), "home", self.latency
+        elif url.path == "/bons-plans":
+            page = int(parse_qs(url.query).get("page", ["1"])[0] or 1)
+            if 1 <= page <= self.pages:
+                status, ctype, data = 200, "text/html; charset=utf-8", self.homepage(listing_page=page)
+                kind, delay = "listing", self.latency
+        elif url.path == "/api/bons-plans":
+            page = int(parse_qs(url.query).get("page", ["1"])[0] or 1)
+            if 1 <= page <= self.pages:
+                status, ctype, data = 200, "application/json; charset=utf-8", self.listing_api(page)
+                kind, delay = "api", self.latency
+        elif m and 1 <= int(m.group(1)) <= self.pages * self.cards_per_page:
+            status, ctype, data = 200, "text/html; charset=utf-8", self.product_page(int(m.group(1)))
+            kind, delay = "detail", self.detail_latency
+        elif url.path.startswith("/img/"):
+            status, ctype, data, kind = 200, "image/gif", self.image, "img"
+        elif url.path == "/static/app.css":
+            status, ctype, data, kind = 200, "text/css", APP_CSS, "static"
+        elif url.path == "/static/gtm.js":
+            status, ctype, data, kind = 200, "application/javascript", TRACKER_JS, "static"
+        elif url.path == "/static/site.woff2":
+            status, ctype, data, kind = 200, "font/woff2", b"\0" * 60_000, "static"
+
+        if kind:
+            with self._lock:
+                self.hits[kind] += 1
+                self.bytes_sent[kind] += len(data)
+        if delay:
+            time.sleep(delay)
+        req.send_response(status)
+        req.send_header("Content-Type", ctype)
+        req.send_header("Content-Length", str(len(data)))
+        req.end_headers()
+        req.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=48)
+    parser.add_argument("--latency", type=float, default=0.0, help="secondes ajoutées par page HTML")
+    parser.add_argument("--detail-latency", type=float, help="latence des fiches (défaut : --latency)")
+    parser.add_argument("--spa", action="store_true", help="cartes rendues en JS depuis /api/bons-plans")
+    args = parser.parse_args()
+
+    site = FixtureSite(args.pages, args.cards, args.latency, args.detail_latency, spa=args.spa,
+                       host=args.host, port=args.port)
+    print(f"[INFO] site de fixture sur {site.base_url}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,132 @@
+import base64
+import functools
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import queue
+import re
 import sqlite3
-from flask import Flask, jsonify, render_template_string
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-DB_PATH = "leclerc_deals.db"
-app = Flask(__name__)
+from flask import (Blueprint, Flask, Response, current_app, g, jsonify, redirect, render_template_string,
+                   request, send_file)
+from werkzeug.http import quote_etag
+
+from export import iter_json_array, iter_ndjson, select_rows
+from config import DB_PATH_ENV, DEFAULT_DB_PATH, DEFAULT_THUMB_DIR, SCHEMA_VERSION, resolve_db_path
+from metrics import Registry, render_prometheus
+
+if TYPE_CHECKING:  # thumbs (Pillow) n'est importé qu'à la première vignette servie
+    from thumbs import ThumbnailCache
+
+DEFAULT_CONFIG = {
+    "DB_POOL_SIZE": 8,                       # connexions en lecture ; 0 = une par requête
+    "DB_POOL_TIMEOUT": 5.0,                  # attente max d'une connexion libre (sinon 503)
+    "RESPONSE_CACHE_SIZE": 256,              # 0 = cache désactivé
+    "THUMB_DIR": DEFAULT_THUMB_DIR,
+    "THUMB_MAX_BYTES": 200 * 1024 * 1024,
+}
+
+bp = Blueprint("front", __name__)
+
+
+# ---------- CONNEXIONS EN LECTURE ----------
+def connect_readonly(path: str) -> sqlite3.Connection:
+    """Connexion en lecture seule (URI mode=ro) : en WAL, elle lit le dernier état commité
+    sans jamais prendre de verrou d'écriture ni bloquer le scraper."""
+    con = sqlite3.connect(pathlib.Path(path).resolve().as_uri() + "?mode=ro", uri=True,
+                          check_same_thread=False)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA busy_timeout=5000;")
+    con.execute("PRAGMA query_only=ON;")
+    con.execute("PRAGMA cache_size=-8000;")  # ~8 Mo par connexion
+    return con
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ReadPool:
+    """Jusqu'à `size` connexions en lecture seule réutilisées d'une requête à l'autre.
+
+    Ouvertes à la demande ; une requête en attend une libre au plus `timeout` s.
+    `size=0` : une connexion par requête, fermée au retour (ancien fonctionnement).
+    """
+
+    def __init__(self, path: str, size: int = 8, timeout: float = 5.0):
+        self.path, self.size, self.timeout = path, size, timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        if self.size <= 0:
+            return connect_readonly(self.path)
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return connect_readonly(self.path)
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"aucune connexion libre après {self.timeout} s") from None
+
+    def release(self, con: sqlite3.Connection):
+        if self.size <= 0:
+            con.close()
+        else:
+            self._idle.put(con)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+
+
+def _read_pool() -> ReadPool:
+    return current_app.extensions["leclerc_read_pool"]
+
+
+def get_db() -> sqlite3.Connection:
+    """Connexion du pool pour la requête courante, rendue en fin de requête."""
+    if "db" not in g:
+        g.db = _read_pool().acquire()
+    return g.db
+
+
+def _release_db(exc=None):
+    con = g.pop("db", None)
+    if con is not None:
+        _read_pool().release(con)
+
+
+@bp.app_errorhandler(PoolTimeout)
+def _pool_exhausted(e):
+    resp = jsonify({"error": f"serveur saturé: {e}"})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = "1"
+    return resp
 
 HTML = """
 <!doctype html>
@@ -29,7 +153,9 @@ HTML = """
     }
     .brand{font-weight:700; letter-spacing:.2px}
 
-    .grid{display:grid; grid-template-columns:repeat(auto-fill,minmax(280px,1fr)); gap:20px}
+    /* Grille virtuelle : cartes positionnées en absolu, hauteur fixe (ROW_H côté JS) */
+    .grid{position:relative}
+    .vcard{position:absolute; top:0; left:0; overflow:auto; will-change:transform}
 
     /* Cartes avec vraies bordures */
     .card{
@@ -110,9 +236,9 @@ HTML = """
 
 <div class="container">
   <div class="row g-2 mb-3">
-    <div class="col-md-4"><input id="q" class="search w-100" placeholder="Recherche (nom, texte)…"></div>
-    <div class="col-md-3"><input id="seller" class="search w-100" placeholder="Vendeur"></div>
-    <div class="col-md-3">
+    <div class="col-md-3"><input id="q" class="search w-100" placeholder="Recherche (nom, texte)…"></div>
+    <div class="col-md-2"><input id="seller" class="search w-100" placeholder="Vendeur"></div>
+    <div class="col-md-2">
       <select id="promo" class="search w-100">
         <option value="">Promo : toutes</option>
         <option value="percent">Seulement %</option>
@@ -120,11 +246,19 @@ HTML = """
         <option value="none">Sans promo</option>
       </select>
     </div>
-    <div class="col-md-2">
+    <div class="col-md-3">
       <select id="cat" class="search w-100">
         <option value="">Catégorie : toutes</option>
       </select>
     </div>
+    <div class="col-md-2">
+      <select id="sort" class="search w-100">
+        <option value="price">Prix croissant</option>
+        <option value="price_desc">Prix décroissant</option>
+        <option value="recent">Plus récents</option>
+        <option value="discount">Meilleures remises</option>
+      </select>
+    </div>
   </div>
 
   <div id="grid" class="grid"></div>
@@ -132,7 +266,16 @@ HTML = """
 </div>
 
 <script>
-let RAW = [];
+const PAGE_SIZE = 60;
+const BENCH_N = {{ bench_n|tojson }};   // > 0 : page /bench/grid, données synthétiques
+const CARD_W = 280, GAP = 20, ROW_H = 480, OVERSCAN = 2;
+
+let ITEMS = [];        // deals chargés depuis le serveur (préparés une fois, voir prepare)
+let VIEW = [];         // indices dans ITEMS qui passent les filtres courants
+let CURSOR = null;     // curseur de la page suivante (null = fin)
+let LOADING = false;
+let QUERY_ID = 0;      // ignore les réponses d'une recherche périmée
+let COLS = 1;
 
 function isPercent(txt){ return txt && /%/.test(txt); }
 function isEuro(txt){ return txt && /€/.test(txt); }
@@ -147,111 +290,954 @@ function formatPromo(txt){
   return s;
 }
 
-function badgePromo(txt){
-  const f = formatPromo(txt);
+// d préparé par prepare() : type de promo déjà connu, aucune regex au rendu
+function badgePromo(d){
+  const f = formatPromo(d.discount_text);
   if(!f) return '<span class="badge badge-muted">—</span>';
-  if(isPercent(f)) return '<span class="badge badge-success">'+f+'</span>';
-  if(isEuro(f)) return '<span class="badge badge-info">'+f+'</span>';
-  return '<span class="badge badge-muted">'+f+'</span>';
+  const cls = d._pct ? 'badge-success' : d._eur ? 'badge-info' : 'badge-muted';
+  const title = d.original_price_eur!=null ? ' title="Prix d’origine estimé : '+d.original_price_eur.toFixed(2)+' €"' : '';
+  return '<span class="badge '+cls+'"'+title+'>'+f+'</span>';
+}
+
+function fold(txt){ return txt.toLowerCase().normalize('NFD').replace(/[\\u0300-\\u036f]/g, ''); }
+
+// clés courtes de /api/cards (CARD_FIELDS côté serveur) -> champs de /api/deals
+const CARD_KEYS = {i: 'id', n: 'product_name', s: 'sold_by', d: 'discount_text', p: 'price_eur',
+                   u: 'page_url', m: 'image_url', c: 'category', t: 'scraped_at', k: 'promo_kind',
+                   o: 'original_price_eur', hd: '_hd', hf: '_hf'};
+
+// layout=columns : un tableau par clé -> un objet par deal (sans description ni caractéristiques)
+function fromColumns(cols){
+  const keys = Object.keys(cols);
+  const n = keys.length ? cols[keys[0]].length : 0;
+  const out = new Array(n);
+  for(let r = 0; r < n; r++){
+    const d = {};
+    for(const k of keys) d[CARD_KEYS[k]] = cols[k][r];
+    out[r] = d;
+  }
+  return out;
 }
 
-function fillCategoryFilter(){
+// champs de filtrage calculés une seule fois par deal, au chargement ; la liste compacte
+// n'a pas le texte des fiches : le filtre local porte alors sur le nom, sauf pour les mots
+// déjà trouvés par la FTS serveur (_q, voir matches)
+function prepare(d){
+  if(d._hd === undefined){ d._hd = !!d.description; d._hf = !!d.features; }
+  d._blob = fold((d.product_name||'') + ' ' + (d.description||'') + ' ' + (d.features||''));
+  d._seller = (d.sold_by||'').toLowerCase();
+  // promo_kind est calculé à l'écriture côté serveur ; regex seulement en secours
+  d._pct = d.promo_kind ? d.promo_kind === 'percent' : !!isPercent(d.discount_text);
+  d._eur = d.promo_kind ? d.promo_kind === 'euro' : !!isEuro(d.discount_text);
+  d._cat = d.category || 'Autre';
+  return d;
+}
+
+async function fillCategoryFilter(){
   const select = document.getElementById('cat');
-  const uniq = Array.from(new Set(RAW.map(d => d.category || 'Autre'))).sort();
-  uniq.forEach(c => {
+  const res = await fetch('/api/facets?top_features=0');
+  const facets = await res.json();
+  facets.category.forEach(c => {
     const opt = document.createElement('option');
-    opt.value = c; opt.textContent = c;
+    opt.value = c.value; opt.textContent = `${c.value} (${c.count})`;
     select.appendChild(opt);
   });
 }
 
-function render(){
-  const q = document.getElementById('q').value.trim().toLowerCase();
-  const seller = document.getElementById('seller').value.trim().toLowerCase();
+function readFilters(){
+  return {
+    q: fold(document.getElementById('q').value.trim()).split(/\s+/).filter(Boolean),
+    seller: document.getElementById('seller').value.trim().toLowerCase(),
+    promo: document.getElementById('promo').value,
+    cat: document.getElementById('cat').value,
+  };
+}
+
+function currentParams(){
+  const p = new URLSearchParams();
+  const q = document.getElementById('q').value.trim();
+  const seller = document.getElementById('seller').value.trim();
   const promo = document.getElementById('promo').value;
   const cat = document.getElementById('cat').value;
+  if(q) p.set('q', q);
+  if(seller) p.set('seller', seller);
+  if(promo) p.set('promo', promo);
+  if(cat) p.set('category', cat);
+  p.set('sort', document.getElementById('sort').value);
+  p.set('limit', PAGE_SIZE);
+  return p;
+}
 
-  const grid = document.getElementById('grid');
-  grid.innerHTML = '';
-
-  const items = RAW.filter(d=>{
-    const t = (d.product_name||'') + ' ' + (d.description||'') + ' ' + (d.features||'');
-    const matchQ = !q || t.toLowerCase().includes(q);
-    const matchSeller = !seller || (d.sold_by||'').toLowerCase().includes(seller);
-    let matchPromo = true;
-    if(promo==='percent') matchPromo = isPercent(d.discount_text);
-    if(promo==='euro') matchPromo = isEuro(d.discount_text);
-    if(promo==='none') matchPromo = !d.discount_text;
-    const matchCat = !cat || (d.category||'Autre')===cat;
-    return matchQ && matchSeller && matchPromo && matchCat;
-  });
+// filtre local immédiat sur les deals déjà chargés (le serveur fait foi ensuite)
+function matches(d, f){
+  // mot couvert par la requête qui a renvoyé ce deal (préfixe FTS "w*" : un mot serveur
+  // qui commence par w suffit) ; sinon le nom seul risquerait d'écarter un résultat serveur
+  for(const w of f.q){
+    if(!d._blob.includes(w) && !(d._q && d._q.some(s => s.startsWith(w)))) return false;
+  }
+  if(f.seller && !d._seller.includes(f.seller)) return false;
+  if(f.promo==='percent' && !d._pct) return false;
+  if(f.promo==='euro' && !d._eur) return false;
+  if(f.promo==='none' && d.discount_text) return false;
+  if(f.cat && d._cat!==f.cat) return false;
+  return true;
+}
+
+let LAST = null;   // filtres ayant produit VIEW
 
-  items.forEach(d=>{
-    const img = d.image_url ? `<img src="${d.image_url}" alt="" />` : '';
-    const feat = d.features ? d.features.split('|').map(x=>x.trim()).filter(Boolean).map(x=>`<li>${x}</li>`).join('') : '';
-    const link = d.page_url ? `<a class="btn btn-sm btn-outline-primary" href="${d.page_url}" target="_blank" rel="noopener">Voir le produit</a>` : '';
-    const price = d.price_eur!=null ? (d.price_eur.toFixed(2)+' €') : '—';
-
-    const card = document.createElement('div');
-    card.className = 'card p-3';
-    card.innerHTML = `
-      <div class="imgbox mb-2">${img}</div>
-      <div class="d-flex justify-content-between align-items-start">
-        <h6 class="m-0" title="${d.product_name||''}">${d.product_name||'Produit'}</h6>
-        <span class="badge-cat">${d.category || 'Autre'}</span>
-      </div>
-      <div class="d-flex justify-content-between align-items-center mb-2">
-        <div class="price">${price}</div>
-        <span>${badgePromo(d.discount_text)}</span>
-      </div>
-      <details class="mb-1"><summary>Description</summary><div class="mt-2">${d.description || '—'}</div></details>
-      ${feat ? `<details class="mb-2"><summary>Caractéristiques</summary><ul class="mt-2">${feat}</ul></details>` : ''}
-      <div class="d-flex justify-content-between align-items-center">
-        <small class="text-muted">${(d.scraped_at||'').replace('T',' ').slice(0,19)}</small>
-        ${link}
-      </div>
-    `;
-    grid.appendChild(card);
+// nouvelle frappe qui ne fait que restreindre la précédente : on filtre VIEW, pas ITEMS
+function refines(f, prev){
+  if(!prev || f.promo!==prev.promo || f.cat!==prev.cat || !f.seller.includes(prev.seller)) return false;
+  return prev.q.every((w, i) => i < f.q.length && f.q[i].includes(w));
+}
+
+function applyFilter(){
+  const f = readFilters();
+  const out = [];
+  if(refines(f, LAST)){
+    for(const i of VIEW){ if(matches(ITEMS[i], f)) out.push(i); }
+  } else {
+    for(let i = 0; i < ITEMS.length; i++){ if(matches(ITEMS[i], f)) out.push(i); }
+  }
+  VIEW = out;
+  LAST = f;
+  layout();
+  paint();
+  document.getElementById('count').textContent = `${VIEW.length}${CURSOR ? '+' : ''} produit(s)`;
+}
+
+// ---- grille virtuelle : seules les cartes visibles existent, les noeuds sont recyclés ----
+const ACTIVE = new Map();   // position dans VIEW -> carte affichée
+const FREE = [];            // cartes hors écran, réutilisables
+
+function newCard(){
+  const card = document.createElement('div');
+  card.className = 'card vcard p-3';
+  card.innerHTML = `
+    <div class="imgbox mb-2"><img alt="" loading="lazy" /></div>
+    <div class="d-flex justify-content-between align-items-start">
+      <h6 class="m-0"></h6>
+      <span class="badge-cat"></span>
+    </div>
+    <div class="d-flex justify-content-between align-items-center mb-2">
+      <div class="price"></div>
+      <span class="promo"></span>
+    </div>
+    <details class="mb-1 desc"><summary>Description</summary><div class="mt-2"></div></details>
+    <details class="mb-2 feat"><summary>Caractéristiques</summary><ul class="mt-2"></ul></details>
+    <div class="d-flex justify-content-between align-items-center">
+      <small class="text-muted"></small>
+      <a class="btn btn-sm btn-outline-primary" target="_blank" rel="noopener">Voir le produit</a>
+    </div>
+  `;
+  card._r = {
+    img: card.querySelector('img'), name: card.querySelector('h6'), cat: card.querySelector('.badge-cat'),
+    price: card.querySelector('.price'), promo: card.querySelector('.promo'),
+    desc: card.querySelector('.desc'), descBody: card.querySelector('.desc div'),
+    feat: card.querySelector('.feat'), featList: card.querySelector('.feat ul'),
+    date: card.querySelector('small'), link: card.querySelector('a'),
+  };
+  const onToggle = e => { if(e.target.open) loadDetail(card); };
+  card._r.desc.addEventListener('toggle', onToggle);
+  card._r.feat.addEventListener('toggle', onToggle);
+  card.style.height = (ROW_H - GAP) + 'px';
+  document.getElementById('grid').appendChild(card);
+  return card;
+}
+
+// vignette servie par /img/<id> (cache long) ; ?v= change si l'image d'origine change
+function thumbUrl(d){
+  if(d.id == null) return d.image_url;
+  let h = 5381;
+  for(let i = 0; i < d.image_url.length; i++) h = (h * 33 + d.image_url.charCodeAt(i)) >>> 0;
+  return '/img/' + d.id + '?v=' + h.toString(36);
+}
+
+function fill(card, d){
+  const r = card._r;
+  card._item = d;
+  if(d.image_url){ r.img.src = thumbUrl(d); r.img.style.display = ''; }
+  else { r.img.removeAttribute('src'); r.img.style.display = 'none'; }
+  r.name.textContent = d.product_name || 'Produit';
+  r.name.title = d.product_name || '';
+  r.cat.textContent = d._cat;
+  r.price.textContent = d.price_eur!=null ? (d.price_eur.toFixed(2)+' €') : '—';
+  r.promo.innerHTML = badgePromo(d);
+  r.desc.open = false;
+  r.feat.open = false;
+  r.feat.style.display = d._hf ? '' : 'none';
+  fillDetail(r, d);
+  r.date.textContent = (d.scraped_at||'').replace('T',' ').slice(0,19);
+  if(d.page_url){ r.link.href = d.page_url; r.link.style.display = ''; }
+  else { r.link.style.display = 'none'; }
+}
+
+function fillDetail(r, d){
+  r.descBody.textContent = d.description === undefined ? 'Chargement…' : (d.description || '—');
+  r.featList.innerHTML = d.features ? d.features.split('|').map(x=>x.trim()).filter(Boolean).map(x=>`<li>${x}</li>`).join('') : '';
+}
+
+// fiche complète chargée à la première ouverture d'une section, une requête par produit :
+// la promesse reste en cache (rechargements de liste, cartes recyclées)
+const DETAILS = new Map();   // id -> Promise<deal | null>
+function loadDetail(card){
+  const d = card._item;
+  if(d.description !== undefined || d.id == null) return;
+  let p = DETAILS.get(d.id);
+  if(!p){
+    p = fetch('/api/deals/' + d.id)
+      .then(res => res.ok ? res.json() : {description: null, features: null})
+      .catch(() => { DETAILS.delete(d.id); return null; });   // erreur réseau : on réessaiera
+    DETAILS.set(d.id, p);
+  }
+  p.then(full => {
+    if(!full) return;
+    d.description = full.description;
+    d.features = full.features;
+    if(card._item === d) fillDetail(card._r, d);
   });
+}
 
-  document.getElementById('count').textContent = `${items.length} produit(s)`;
+function layout(){
+  const grid = document.getElementById('grid');
+  const width = grid.clientWidth;
+  COLS = Math.max(1, Math.floor((width + GAP) / (CARD_W + GAP)));
+  grid._colW = (width - GAP * (COLS - 1)) / COLS;
+  grid.style.height = (Math.ceil(VIEW.length / COLS) * ROW_H) + 'px';
 }
 
-async function load(){
-  const res = await fetch('/api/deals');
-  RAW = await res.json();
-  fillCategoryFilter();
-  render();
+function paint(){
+  const grid = document.getElementById('grid');
+  const top = -grid.getBoundingClientRect().top;
+  const firstRow = Math.max(0, Math.floor(top / ROW_H) - OVERSCAN);
+  const lastRow = Math.floor((top + window.innerHeight) / ROW_H) + OVERSCAN;
+  const start = firstRow * COLS;
+  const end = Math.min(VIEW.length, (lastRow + 1) * COLS);
+
+  for(const [pos, card] of ACTIVE){
+    if(pos < start || pos >= end){ ACTIVE.delete(pos); card.style.display = 'none'; FREE.push(card); }
+  }
+  for(let pos = start; pos < end; pos++){
+    let card = ACTIVE.get(pos);
+    if(!card){ card = FREE.pop() || newCard(); card.style.display = ''; ACTIVE.set(pos, card); }
+    const d = ITEMS[VIEW[pos]];
+    if(card._item !== d) fill(card, d);
+    const row = Math.floor(pos / COLS), col = pos % COLS;
+    card.style.width = grid._colW + 'px';
+    card.style.transform = `translate(${col * (grid._colW + GAP)}px, ${row * ROW_H}px)`;
+  }
+  // fin de la liste en vue : page suivante
+  if(!BENCH_N && CURSOR !== null && end >= VIEW.length - COLS * OVERSCAN) loadPage(false);
+}
+
+// reset=true : nouveaux filtres, on repart de la première page
+async function loadPage(reset){
+  if(!reset && (LOADING || CURSOR === null)) return;
+  const id = ++QUERY_ID;
+  LOADING = true;
+  const p = currentParams();
+  if(!reset) p.set('cursor', CURSOR);
+  try{
+    p.set('layout', 'columns');
+    const res = await fetch('/api/cards?' + p.toString());
+    const data = await res.json();
+    if(id !== QUERY_ID) return;
+    const served = fold(p.get('q') || '').split(/\s+/).filter(Boolean);
+    const items = fromColumns(data.cols).map(d => { d._q = served; return prepare(d); });
+    ITEMS = reset ? items : ITEMS.concat(items);
+    CURSOR = data.next_cursor;
+    LAST = null;
+  } finally {
+    if(id === QUERY_ID) LOADING = false;
+  }
+  applyFilter();
+}
+
+let debounce = null;
+let pending = false;
+function onFilterInput(){
+  // filtre local au plus une fois par frame, rechargement serveur après 250 ms de calme
+  if(!pending){ pending = true; requestAnimationFrame(() => { pending = false; applyFilter(); }); }
+  if(BENCH_N) return;
+  clearTimeout(debounce);
+  debounce = setTimeout(() => loadPage(true), 250);
+}
+
+let scrolling = false;
+function onScroll(){
+  if(scrolling) return;
+  scrolling = true;
+  requestAnimationFrame(() => { scrolling = false; paint(); });
 }
 
-['q','seller','promo','cat'].forEach(id=>{
-  document.addEventListener('input', e => { if(e.target.id===id) render(); });
-  document.addEventListener('change', e => { if(e.target.id===id) render(); });
-});
+['q','seller'].forEach(id => document.getElementById(id).addEventListener('input', onFilterInput));
+['promo','cat','sort'].forEach(id => document.getElementById(id).addEventListener('change', () => {
+  if(id === 'sort') loadPage(true); else onFilterInput();
+}));
+window.addEventListener('scroll', onScroll, {passive: true});
+window.addEventListener('resize', () => { layout(); paint(); });
 
-load();
+// ---- benchmark headless : temps de filtrage par frappe sur BENCH_N cartes ----
+function syntheticItems(n){
+  const sellers = ['E.Leclerc', 'Boulanger Pro', 'Darty Marketplace', 'Électro Dépôt'];
+  const promos = ['20%', '15 %', '10€', null];
+  const cats = ['Téléviseurs', 'Jardin', 'Cuisine', null];
+  const out = [];
+  for(let i = 0; i < n; i++){
+    out.push({
+      id: i, product_name: `Produit synthétique n°${i} modèle ${i % 997}`,
+      sold_by: sellers[i % sellers.length], discount_text: promos[i % promos.length],
+      price_eur: (i * 7919 % 150000) / 100, page_url: null, image_url: null,
+      description: 'Description détaillée du produit, très complète. '.repeat(1 + i % 5),
+      features: 'Marque: X | Couleur: noir | Puissance: ' + (i % 3000) + ' W',
+      category: cats[i % cats.length], scraped_at: '2024-01-01T00:00:00',
+    });
+  }
+  return out;
+}
+
+function runBench(){
+  ITEMS = syntheticItems(BENCH_N).map(prepare);
+  applyFilter();
+  const input = document.getElementById('q');
+  const typed = 'produit modele 12';
+  const times = [];
+  const step = txt => {
+    input.value = txt;
+    const t0 = performance.now();
+    applyFilter();
+    void document.getElementById('grid').offsetHeight;  // force le layout dans la mesure
+    times.push(performance.now() - t0);
+  };
+  const sequence = () => {
+    for(let i = 1; i <= typed.length; i++) step(typed.slice(0, i));
+    for(let i = typed.length - 1; i >= 0; i--) step(typed.slice(0, i));
+  };
+  sequence();            // échauffement (JIT), non compté
+  times.length = 0;
+  sequence();
+  times.sort((a, b) => a - b);
+  window.BENCH_RESULT = {
+    cards: BENCH_N, keystrokes: times.length,
+    p50_ms: times[Math.floor(times.length / 2)], max_ms: times[times.length - 1],
+    target_ms: 16, ok: times[times.length - 1] < 16,
+  };
+  document.getElementById('count').textContent = JSON.stringify(window.BENCH_RESULT);
+}
+
+if(BENCH_N){
+  runBench();
+} else {
+  fillCategoryFilter();
+  loadPage(true);
+}
 </script>
 </body>
 </html>
 """
 
-@app.route("/")
+@bp.route("/")
 def index():
-    return render_template_string(HTML)
+    return render_template_string(HTML, bench_n=0)
+
+
+@bp.route("/bench/grid")
+def bench_grid():
+    """Même page avec `n` cartes synthétiques : mesure du filtrage par frappe (voir bench.py grid)."""
+    n = min(max(request.args.get("n", 20000, type=int), 1), 200_000)
+    return render_template_string(HTML, bench_n=n)
+
+
+# ---------- MÉTRIQUES ----------
+HTTP_METRICS = Registry(enabled=True)  # temps de réponse de ce processus (le scraper a le sien)
+
+
+@bp.before_app_request
+def _start_timer():
+    g.t0 = time.perf_counter()
+
+
+@bp.after_app_request
+def _record_timing(resp):
+    t0 = g.pop("t0", None)
+    if t0 is not None:
+        # réponses en flux (export) : temps jusqu'au premier octet seulement
+        endpoint = request.url_rule.rule if request.url_rule else "<inconnu>"
+        HTTP_METRICS.observe("http_request_seconds", time.perf_counter() - t0,
+                             endpoint=endpoint, method=request.method, status=str(resp.status_code))
+    return resp
+
+
+def _last_scrape_run() -> str:
+    """Dernier run enregistré par app.pipeline (table scrape_runs), au format Prometheus."""
+    try:
+        row = get_db().execute("""
+            SELECT id, started_at, finished_at, status, pages, saved, rejected, metrics
+            FROM scrape_runs ORDER BY id DESC LIMIT 1
+        """).fetchone()
+    except sqlite3.OperationalError:  # base antérieure à scrape_runs
+        row = None
+    if row is None:
+        return ""
+    run_id, started_at, finished_at, status, pages, saved, rejected, snapshot = row
+    lines = [
+        "# TYPE leclerc_scrape_run_info gauge",
+        f'leclerc_scrape_run_info{{run="{run_id}",status="{status}",started_at="{started_at}"}} 1',
+        "# TYPE leclerc_scrape_run_pages gauge", f"leclerc_scrape_run_pages {pages or 0}",
+        "# TYPE leclerc_scrape_run_saved gauge", f"leclerc_scrape_run_saved {saved or 0}",
+        "# TYPE leclerc_scrape_run_rejected gauge", f"leclerc_scrape_run_rejected {rejected or 0}",
+    ]
+    return "\n".join(lines) + "\n" + render_prometheus(json.loads(snapshot or "{}"))
+
+
+@bp.route("/metrics")
+def prometheus_metrics():
+    """Temps de réponse de ce serveur + histogrammes par étape du dernier run du scraper."""
+    body = render_prometheus(HTTP_METRICS.snapshot()) + _last_scrape_run()
+    return Response(body, mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ---------- CACHE DES RÉPONSES ----------
+class DataVersion:
+    """Jeton de version bon marché de la base : `PRAGMA data_version`.
+
+    La valeur ne change, pour une connexion donnée, que si une *autre* connexion
+    (le scraper) a commité entre-temps : on garde donc une connexion ouverte.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._con = None
+        self._path = None
+        self.value = None
+
+    def current(self):
+        with self._lock:
+            path = current_app.config["DB_PATH"]
+            if self._con is None or self._path != path:
+                if self._con is not None:
+                    self._con.close()
+                self._con = connect_readonly(path)
+                self._path = path
+                self.value = None
+            value = (self._path, self._con.execute("PRAGMA data_version;").fetchone()[0])
+            self.value = value
+            return self.value
+
 
-@app.route("/api/deals")
+class CachedBody:
+    __slots__ = ("version", "body", "gz", "etag")
+
+    def __init__(self, version, body: bytes):
+        self.version = version
+        self.body = body
+        self.gz = gzip.compress(body, compresslevel=6)
+        self.etag = hashlib.sha1(body).hexdigest()[:20]  # dérivé du contenu, sans guillemets
+
+
+class ResponseCache:
+    """LRU borné des corps JSON déjà encodés (brut + gzip), clé = route + paramètres."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, CachedBody]" = OrderedDict()
+
+    def get(self, key, version) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry: CachedBody, max_entries: int):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+
+DATA_VERSION = DataVersion()
+RESPONSE_CACHE = ResponseCache()
+
+
+def _not_modified(entry: CachedBody) -> bool:
+    # ETag seul : la base n'a pas de date de modification fiable (data_version n'est qu'un
+    # compteur), un Last-Modified pourrait valider un corps périmé. Comparaison faible (RFC 9110)
+    return request.if_none_match.contains_weak(entry.etag)
+
+
+def cached_json(view):
+    """Met en cache la réponse JSON d'une route tant que la base n'a pas changé.
+
+    Réponses 200 uniquement ; sert le corps gzip si le client l'accepte (q > 0) et
+    répond 304 sur If-None-Match.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        max_entries = current_app.config["RESPONSE_CACHE_SIZE"]
+        if max_entries <= 0:
+            return view(*args, **kwargs)
+
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        version = DATA_VERSION.current()
+        entry = RESPONSE_CACHE.get(key, version)
+        HTTP_METRICS.inc("response_cache_total", result="hit" if entry is not None else "miss")
+        if entry is None:
+            resp = current_app.make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+            entry = CachedBody(version, resp.get_data())
+            RESPONSE_CACHE.put(key, entry, max_entries)
+
+        headers = {
+            "ETag": quote_etag(entry.etag),
+            "Cache-Control": "no-cache",  # toujours revalider, mais à coût quasi nul
+            "Vary": "Accept-Encoding",
+        }
+        if _not_modified(entry):
+            return Response(status=304, headers=headers)
+        if request.accept_encodings["gzip"] > 0:  # « gzip;q=0 » : refusé
+            headers["Content-Encoding"] = "gzip"
+            return Response(entry.gz, mimetype="application/json", headers=headers)
+        return Response(entry.body, mimetype="application/json", headers=headers)
+
+    return wrapper
+
+
+# ---------- API ----------
+DEFAULT_PAGE_SIZE = 60
+MAX_PAGE_SIZE = 500
+
+# tri -> (expression SQL, sens) ; chaque expression a son index (voir DBManager._init_db)
+SORTS = {
+    "price": ("COALESCE(price_eur, 999999)", "ASC"),
+    "price_desc": ("COALESCE(price_eur, 999999)", "DESC"),
+    "recent": ("COALESCE(scraped_at, '')", "DESC"),
+    "discount": ("COALESCE(discount_pct, -1)", "DESC"),
+}
+
+DEAL_FIELDS = """id, sold_by, product_name, discount_text, price_eur,
+                 page_url, image_url, description, features, scraped_at, category,
+                 promo_kind, discount_pct, discount_eur, original_price_eur"""
+
+# /api/cards : clé courte -> expression SQL, seulement ce que la carte affiche fermée ;
+# description et caractéristiques sont chargées à l'ouverture via /api/deals/<id>
+CARD_FIELDS = {
+    "i": "id", "n": "product_name", "s": "sold_by", "d": "discount_text", "p": "price_eur",
+    "u": "page_url", "m": "image_url", "c": "category", "t": "scraped_at",
+    "k": "promo_kind", "o": "original_price_eur",
+    "hd": "description IS NOT NULL", "hf": "features IS NOT NULL",
+}
+CARD_COLUMNS = ", ".join(f"{expr} AS {key}" for key, expr in CARD_FIELDS.items())
+
+
+def _like_escape(txt: str) -> str:
+    return txt.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_query(q: str) -> Optional[str]:
+    """Requête FTS5 : chaque mot est requis et sert de préfixe ("velo elec" -> vélo électrique)."""
+    tokens = ['"' + t.replace('"', '""') + '"*' for t in q.split()]
+    return " ".join(tokens) or None
+
+
+def _encode_cursor(key, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([key, row_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    key, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(row_id, int) or not isinstance(key, (int, float, str)):
+        raise ValueError("curseur invalide")
+    return key, row_id
+
+
+def _deal_filters(args):
+    """Clauses WHERE (et paramètres) pour q / seller / promo / min_discount / feature / category."""
+    where, params = [], []
+    match = _fts_query(args.get("q", ""))
+    if match:
+        where.append("id IN (SELECT rowid FROM deals_fts WHERE deals_fts MATCH ?)")
+        params.append(match)
+    seller = args.get("seller", "").strip()
+    if seller:
+        # sous-chaîne insensible à la casse (ASCII pour LIKE), comme le filtre d'origine côté
+        # client : « darty » trouve « Darty Marketplace » et « pro » trouve « Boulanger Pro ».
+        # Le joker en tête empêche l'usage de idx_products_sold_by : balayage des lignes déjà
+        # restreintes par les autres filtres, acceptable à la taille d'un catalogue de bons plans.
+        where.append("sold_by LIKE ? ESCAPE '\\'")
+        params.append(f"%{_like_escape(seller)}%")
+    promo = args.get("promo", "")
+    if promo in ("percent", "euro", "none"):
+        # colonne calculée à l'écriture (utiles.parse_discount) : index idx_products_promo_discount
+        where.append("promo_kind = ?")
+        params.append(promo)
+    elif promo:
+        raise ValueError(f"promo inconnue: {promo}")
+    min_discount = args.get("min_discount", "")
+    if min_discount:
+        # remise en %, estimée aussi pour les promos en euros
+        where.append("discount_pct >= ?")
+        params.append(float(min_discount))
+    for feature in args.getlist("feature"):
+        # feature=Libellé:valeur. product_features n'a pas d'index (key, value) (coût d'écriture,
+        # cf. utiles.SCHEMA) : deals_fts donne les fiches dont le texte contient « libellé valeur »,
+        # la clé primaire (product_id, key) vérifie ensuite la paire exacte
+        key, sep, value = feature.partition(":")
+        if not sep or not key:
+            raise ValueError(f"feature attendu sous la forme libellé:valeur: {feature}")
+        phrase = f"{key} {value}"
+        if re.search(r"\w", phrase):
+            where.append("id IN (SELECT product_id FROM product_features WHERE key = ? AND value = ? AND "
+                         "product_id IN (SELECT rowid FROM deals_fts WHERE deals_fts MATCH ?))")
+            params += [key, value, 'features : "' + phrase.replace('"', '""') + '"']
+        else:
+            where.append("id IN (SELECT product_id FROM product_features WHERE key = ? AND value = ?)")
+            params += [key, value]
+    category = args.get("category", "")
+    if category == "Autre":
+        where.append("category IS NULL")
+    elif category:
+        where.append("category = ?")
+        params.append(category)
+    return where, params
+
+
+def _query_deals(args, columns: str) -> Tuple[List[Dict], Optional[str]]:
+    """Une page de deals filtrés et triés, paginée par curseur (keyset) : (lignes, next_cursor).
+
+    KeyError / ValueError / TypeError sur un paramètre invalide.
+    """
+    sort_expr, direction = SORTS[args.get("sort", "price")]
+    limit = min(max(int(args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    where, params = _deal_filters(args)
+    if args.get("cursor"):
+        key, row_id = _decode_cursor(args["cursor"])
+        op = ">" if direction == "ASC" else "<"
+        # forme "a >= k AND (a > k OR id > i)" : SQLite en fait une recherche dans l'index
+        where.append(f"{sort_expr} {op}= ? AND ({sort_expr} {op} ? OR id {op} ?)")
+        params += [key, key, row_id]
+
+    con = get_db()
+    rows = con.execute(f"""
+        SELECT {columns}, {sort_expr} AS sort_key, id AS row_id
+        FROM leclerc_deals
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY {sort_expr} {direction}, id {direction}
+        LIMIT ?;
+    """, (*params, limit + 1)).fetchall()
+
+    items = [dict(r) for r in rows[:limit]]
+    next_cursor = _encode_cursor(items[-1]["sort_key"], items[-1]["row_id"]) if len(rows) > limit else None
+    for it in items:
+        del it["sort_key"], it["row_id"]
+    return items, next_cursor
+
+
+@bp.route("/api/deals")
+@cached_json
 def api_deals():
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row
+    """Deals complets filtrés côté serveur, paginés par curseur : {items, next_cursor}."""
+    try:
+        items, next_cursor = _query_deals(request.args, DEAL_FIELDS)
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"error": f"paramètre invalide: {e}"}), 400
+    return jsonify({"items": items, "next_cursor": next_cursor})
+
+
+@bp.route("/api/cards")
+@cached_json
+def api_cards():
+    """Liste compacte pour la grille : mêmes filtres / tri / curseur que /api/deals,
+    clés courtes de CARD_FIELDS.
+
+    layout=rows (défaut) : {items: [{i, n, ...}], next_cursor}, valeurs nulles omises ;
+    layout=columns : {cols: {i: [...], n: [...], ...}, next_cursor}, un tableau par clé.
+    """
+    layout = request.args.get("layout", "rows")
+    try:
+        if layout not in ("rows", "columns"):
+            raise ValueError(f"layout inconnu: {layout}")
+        items, next_cursor = _query_deals(request.args, CARD_COLUMNS)
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"error": f"paramètre invalide: {e}"}), 400
+    if layout == "columns":
+        return jsonify({"cols": {k: [it[k] for it in items] for k in CARD_FIELDS}, "next_cursor": next_cursor})
+    return jsonify({"items": [{k: v for k, v in it.items() if v is not None} for it in items],
+                    "next_cursor": next_cursor})
+
+
+@bp.route("/api/deals/<int:deal_id>")
+@cached_json
+def api_deal(deal_id: int):
+    """Deal complet (description, caractéristiques) : chargé par la grille à l'ouverture d'une carte."""
+    con = get_db()
+    row = con.execute(f"SELECT {DEAL_FIELDS} FROM leclerc_deals WHERE id = ?", (deal_id,)).fetchone()
+    if row is None:
+        return jsonify({"error": "produit inconnu"}), 404
+    return jsonify(dict(row))
+
+
+def _stream_export(chunks, mimetype: str):
+    """Export complet (sans LIMIT) en flux : mêmes filtres que /api/deals, mémoire constante.
+
+    Connexion et requête sont obtenues avant la réponse : pool saturé (503) ou erreur SQL (500)
+    ont leur propre statut au lieu d'un 200 au corps tronqué. Le générateur ne fait que
+    parcourir le curseur.
+    """
+    try:
+        where, params = _deal_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"paramètre invalide: {e}"}), 400
+
+    pool = _read_pool()
+    con = pool.acquire()  # PoolTimeout -> 503 (_pool_exhausted)
+    try:
+        cur = select_rows(con, where, params)
+    except sqlite3.Error as e:
+        pool.release(con)
+        return jsonify({"error": f"export impossible: {e}"}), 500
+
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            cur.close()
+            pool.release(con)
+
+    def generate():
+        # connexion tenue le temps du flux, rendue au pool même si le client coupe
+        try:
+            yield from chunks(cur)
+        finally:
+            release()
+
+    resp = Response(generate(), mimetype=mimetype)
+    resp.call_on_close(release)  # réponse fermée sans être parcourue (HEAD, client parti)
+    return resp
+
+
+@bp.route("/api/deals.ndjson")
+def api_deals_ndjson():
+    return _stream_export(iter_ndjson, "application/x-ndjson")
+
+
+@bp.route("/api/deals.json")
+def api_deals_json_stream():
+    return _stream_export(iter_json_array, "application/json")
+
+
+@bp.route("/api/search")
+@cached_json
+def api_search():
+    """Recherche plein texte classée (bm25, le nom pèse le plus) avec extraits surlignés."""
+    match = _fts_query(request.args.get("q", ""))
+    if not match:
+        return jsonify([])
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError as e:
+        return jsonify({"error": f"paramètre invalide: {e}"}), 400
+
+    con = get_db()
     rows = con.execute("""
-        SELECT sold_by, product_name, discount_text, price_eur,
-               page_url, image_url, description, features, scraped_at, category
-        FROM leclerc_deals
-        ORDER BY COALESCE(price_eur, 999999) ASC
-        LIMIT 5000;
-    """).fetchall()
-    con.close()
+        SELECT d.id, d.product_name, d.sold_by, d.discount_text, d.price_eur,
+               d.page_url, d.image_url, d.category,
+               snippet(deals_fts, -1, '<mark>', '</mark>', '…', 12) AS snippet,
+               bm25(deals_fts, 10.0, 1.0, 2.0) AS score
+        FROM deals_fts
+        JOIN leclerc_deals d ON d.id = deals_fts.rowid
+        WHERE deals_fts MATCH ?
+        ORDER BY score
+        LIMIT ? OFFSET ?;
+    """, (match, limit, offset)).fetchall()
+    return jsonify([dict(r) for r in rows])
+
+
+@bp.route("/api/deals/<int:deal_id>/history")
+@cached_json
+def api_deal_history(deal_id: int):
+    """Historique des prix d'un produit (index price_observations(product_id, observed_at))."""
+    con = get_db()
+    exists = con.execute("SELECT 1 FROM products WHERE id = ?", (deal_id,)).fetchone()
+    rows = con.execute("""
+        SELECT observed_at, price_eur, discount_text
+        FROM price_observations
+        WHERE product_id = ?
+        ORDER BY observed_at;
+    """, (deal_id,)).fetchall()
+    if not exists:
+        return jsonify({"error": "produit inconnu"}), 404
     return jsonify([dict(r) for r in rows])
 
+
+# ---------- VIGNETTES ----------
+_thumbs: Optional["ThumbnailCache"] = None
+_thumbs_lock = threading.Lock()
+
+
+def thumbnail_cache() -> "ThumbnailCache":
+    from thumbs import ThumbnailCache
+
+    global _thumbs
+    with _thumbs_lock:
+        if _thumbs is None or _thumbs.cache_dir != os.path.abspath(current_app.config["THUMB_DIR"]):
+            _thumbs = ThumbnailCache(current_app.config["THUMB_DIR"], current_app.config["THUMB_MAX_BYTES"])
+        return _thumbs
+
+
+@bp.route("/img/<int:deal_id>")
+def deal_image(deal_id: int):
+    """Vignette locale du produit. Absente du cache (préchargement raté ou désactivé) : le
+    navigateur est renvoyé vers l'original et la vignette est préparée en arrière-plan, aucune
+    requête n'attend le téléchargement."""
+    row = get_db().execute("SELECT image_url FROM products WHERE id = ?", (deal_id,)).fetchone()
+    _release_db()
+    if not row or not row[0]:
+        return jsonify({"error": "image inconnue"}), 404
+    cache = thumbnail_cache()
+    path = cache.get(row[0])
+    if path is None:
+        cache.fetch_in_background(row[0])
+        # pas de cache navigateur : la prochaine visite recevra la vignette
+        resp = redirect(row[0])
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+    from thumbs import THUMB_MIMETYPE
+
+    resp = send_file(path, mimetype=THUMB_MIMETYPE, max_age=31536000, conditional=True)
+    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return resp
+
+
+@bp.route("/api/facets")
+@cached_json
+def api_facets():
+    """Comptes par catégorie, vendeur, type de promo et top libellés de caractéristiques.
+
+    Lus dans facet_counts, tenue à jour par DBManager à chaque écriture.
+    """
+    try:
+        top = min(max(int(request.args.get("top_features", 30)), 0), 500)
+    except ValueError as e:
+        return jsonify({"error": f"paramètre invalide: {e}"}), 400
+
+    con = get_db()
+    facets = {}
+    for facet in ("category", "seller", "promo"):
+        rows = con.execute("""
+            SELECT value, n FROM facet_counts
+            WHERE facet = ? AND n > 0 AND value != ''
+            ORDER BY value;
+        """, (facet,)).fetchall()
+        facets[facet] = [{"value": v, "count": n} for v, n in rows]
+    rows = con.execute("""
+        SELECT value, n FROM facet_counts
+        WHERE facet = 'feature_key' AND n > 0
+        ORDER BY n DESC, value
+        LIMIT ?;
+    """, (top,)).fetchall()
+    facets["feature_key"] = [{"value": v, "count": n} for v, n in rows]
+    return jsonify(facets)
+
+
+@bp.route("/api/categories")
+@cached_json
+def api_categories():
+    con = get_db()
+    rows = con.execute("""
+        SELECT value FROM facet_counts WHERE facet = 'category' AND n > 0 ORDER BY value;
+    """).fetchall()
+    return jsonify([r[0] for r in rows])
+
+# ---------- APPLICATION ----------
+def ensure_schema(path: str):
+    """Migre une seule fois une base restée à un ancien schéma (table plate leclerc_deals,
+    user_version < SCHEMA_VERSION) : les routes lisent products, facet_counts et deals_fts.
+
+    La migration passe par DBManager (connexion en écriture) ; sans les dépendances du
+    scraper, le front refuse de démarrer plutôt que de répondre en 500.
+    """
+    if not os.path.exists(path):
+        return  # pas encore de base : le scraper la créera au bon schéma
+    con = sqlite3.connect(pathlib.Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        version = con.execute("PRAGMA user_version;").fetchone()[0]
+    finally:
+        con.close()
+    if version >= SCHEMA_VERSION:
+        return
+    try:
+        from utiles import DBManager
+    except ImportError as e:
+        raise RuntimeError(
+            f"{path} est au schéma {version} (attendu : {SCHEMA_VERSION}) et la migration a besoin "
+            f"des dépendances du scraper ({e}) : lancez une fois `python app.py` ou installez-les"
+        ) from e
+    print(f"[INFO] migration de {path} : schéma {version} -> {SCHEMA_VERSION}")
+    DBManager(path).close()
+
+
+def create_app(db_path: Optional[str] = None, **config) -> Flask:
+    """Application Flask servant `db_path` (voir DB_PATH_ENV) ; `config` surcharge DEFAULT_CONFIG.
+
+    Pour plusieurs processus : gunicorn -w 4 --threads 8 "front:create_app()"
+    """
+    app = Flask(__name__)
+    app.config.update(DEFAULT_CONFIG)
+    app.config["DB_PATH"] = os.path.abspath(resolve_db_path(db_path))
+    app.config.update(config)
+    ensure_schema(app.config["DB_PATH"])
+    app.extensions["leclerc_read_pool"] = ReadPool(app.config["DB_PATH"], app.config["DB_POOL_SIZE"],
+                                                   app.config["DB_POOL_TIMEOUT"])
+    app.register_blueprint(bp)
+    app.teardown_appcontext(_release_db)
+    return app
+
+
+app = create_app()  # python front.py, flask --app front run, imports existants
+
+
+def serve(app: Flask, host: str = "127.0.0.1", port: int = 5000, threads: int = 8, processes: int = 1):
+    """Serveur multi-requêtes : waitress (threads) s'il est installé, sinon le serveur werkzeug,
+    threadé ou en `processes` processus (fork, un pool de connexions par processus)."""
+    if processes <= 1:
+        try:
+            from waitress import serve as waitress_serve
+        except ImportError:
+            pass
+        else:
+            print(f"[INFO] waitress sur http://{host}:{port} ({threads} threads)")
+            waitress_serve(app, host=host, port=port, threads=threads)
+            return
+    from werkzeug.serving import run_simple
+    print(f"[INFO] werkzeug sur http://{host}:{port} "
+          f"({f'{processes} processus' if processes > 1 else 'threadé'})")
+    run_simple(host, port, app, threaded=processes <= 1, processes=max(1, processes))
+
+
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Front des bons plans Leclerc")
+    parser.add_argument("--db", help=f"base SQLite (défaut : ${DB_PATH_ENV} ou {DEFAULT_DB_PATH})")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, help="connexions en lecture par processus (défaut : --threads)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CONFIG["RESPONSE_CACHE_SIZE"],
+                        help="réponses JSON gardées en mémoire (0 = désactivé)")
+    parser.add_argument("--debug", action="store_true", help="serveur de développement Flask (rechargement auto)")
+    args = parser.parse_args()
+    pool_size = args.pool_size if args.pool_size is not None else args.threads
+    app = create_app(args.db, DB_POOL_SIZE=pool_size, RESPONSE_CACHE_SIZE=args.cache_size)
+    if args.debug:
+        app.run(debug=True, host=args.host, port=args.port)
+    else:
+        serve(app, args.host, args.port, args.threads, args.processes)
@@ -0,0 +1,181 @@
+"""Compteurs et histogrammes de latence en mémoire, exportables au format Prometheus.
+
+Le scraper chronomètre ses étapes dans `REGISTRY` (désactivé par défaut :
+`timer()` renvoie alors un contexte vide partagé, sans horloge ni verrou).
+`app.pipeline` l'active, enregistre un instantané par run dans `scrape_runs`,
+et `front.py` l'expose sur /metrics avec ses propres temps de réponse.
+
+    with REGISTRY.timer("scrape_stage_seconds", stage="open_homepage"):
+        ...
+    REGISTRY.inc("scrape_items_total", 48, stage="cards")
+"""
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# secondes : d'une requête SQL (ms) à un chargement de page lent
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "family", "labels", "t0")
+
+    def __init__(self, registry: "Registry", family: str, labels: LabelKey):
+        self.registry, self.family, self.labels = registry, family, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry._observe(self.family, self.labels, time.perf_counter() - self.t0)
+        return False
+
+
+class Registry:
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, List]] = {}  # [compte par seau..., somme, total]
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    def timer(self, family: str, **labels: str):
+        """Contexte qui observe sa durée dans l'histogramme `family` ; no-op si désactivé."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, family, tuple(sorted(labels.items())))
+
+    def observe(self, family: str, seconds: float, **labels: str):
+        if self.enabled:
+            self._observe(family, tuple(sorted(labels.items())), seconds)
+
+    def inc(self, family: str, n: float = 1, **labels: str):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(family, {})
+            series[key] = series.get(key, 0) + n
+
+    def _observe(self, family: str, key: LabelKey, seconds: float):
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.setdefault(family, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            h[idx] += 1
+            h[-2] += seconds
+            h[-1] += 1
+
+    def merge(self, snapshot: Dict):
+        """Ajoute un `snapshot()` venu d'un autre processus (shards de app.sharded_pipeline)."""
+        if not self.enabled or not snapshot:
+            return
+        with self._lock:
+            for family, metric in snapshot.items():
+                if metric["type"] == "counter":
+                    series = self._counters.setdefault(family, {})
+                    for s in metric["series"]:
+                        key = tuple(sorted(s["labels"].items()))
+                        series[key] = series.get(key, 0) + s["value"]
+                    continue
+                if tuple(metric["buckets"]) != self.buckets:
+                    raise ValueError(f"{family} : seaux différents, fusion impossible")
+                series = self._histograms.setdefault(family, {})
+                for s in metric["series"]:
+                    key = tuple(sorted(s["labels"].items()))
+                    h = series.get(key)
+                    if h is None:
+                        h = series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+                    for i, count in enumerate(s["counts"]):
+                        h[i] += count
+                    h[-2] += s["sum"]
+                    h[-1] += s["count"]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict:
+        """Copie sérialisable en JSON (stockée dans scrape_runs.metrics)."""
+        with self._lock:
+            out = {}
+            for family, series in self._histograms.items():
+                out[family] = {"type": "histogram", "buckets": list(self.buckets), "series": [
+                    {"labels": dict(key), "counts": h[:-2], "sum": h[-2], "count": h[-1]}
+                    for key, h in series.items()]}
+            for family, series in self._counters.items():
+                out[family] = {"type": "counter", "series": [
+                    {"labels": dict(key), "value": v} for key, v in series.items()]}
+            return out
+
+
+# registre du processus courant (scraper) ; activé par app.pipeline
+REGISTRY = Registry(enabled=False)
+
+
+def _labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, esc)) + "}"
+
+
+def render_prometheus(snapshot: Dict, prefix: str = "leclerc_") -> str:
+    """Format texte d'exposition Prometheus (0.0.4) à partir d'un `snapshot()`."""
+    lines = []
+    for family in sorted(snapshot):
+        metric = snapshot[family]
+        name = prefix + family
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for s in metric["series"]:
+            if metric["type"] == "counter":
+                lines.append(f"{name}{_labels(s['labels'])} {s['value']}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric["buckets"], s["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(s['labels'], ('le', repr(float(bound))))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(s['labels'], ('le', '+Inf'))} {s['count']}")
+            lines.append(f"{name}_sum{_labels(s['labels'])} {s['sum']}")
+            lines.append(f"{name}_count{_labels(s['labels'])} {s['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def counter_total(snapshot: Dict, family: str, **labels: str) -> float:
+    """Somme des séries d'un compteur dont les libellés contiennent `labels`."""
+    metric = snapshot.get(family)
+    if not metric or metric["type"] != "counter":
+        return 0
+    return sum(s["value"] for s in metric["series"]
+               if all(s["labels"].get(k) == v for k, v in labels.items()))
+
+
+def summarize(snapshot: Dict, family: str = "scrape_stage_seconds") -> List[str]:
+    """Lignes lisibles « étape : n appels, total, moyenne » pour la console."""
+    metric = snapshot.get(family)
+    if not metric:
+        return []
+    rows = sorted(metric["series"], key=lambda s: -s["sum"])
+    return [f"{s['labels'].get('stage', '?'):<24} {s['count']:6d} x | total {s['sum']:8.2f} s "
+            f"| moy. {s['sum'] / s['count'] * 1000:8.1f} ms" for s in rows if s["count"]]
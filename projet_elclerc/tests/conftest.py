@@ -0,0 +1,143 @@
+"""Fixtures communes : les modules du projet sont importés à plat, comme depuis projet_elclerc/."""
+import functools
+import os
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# `import front` crée l'application par défaut (et migrerait leclerc_deals.db, versionnée) :
+# les tests la pointent vers une base inexistante
+os.environ["LECLERC_DB"] = os.path.join(tempfile.mkdtemp(prefix="leclerc-tests-"), "deals.db")
+
+from utiles import DBManager, LeclercScraper  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DBManager(str(tmp_path / "deals.db"))
+    yield manager
+    manager.close()
+
+
+def make_deal(i: int, **overrides):
+    deal = {
+        "sold_by": "E.Leclerc",
+        "product_name": f"Aspirateur balai n°{i}",
+        "discount_text": "20%",
+        "price_eur": 99.99,
+        "page_url": f"https://www.e.leclerc/fp/produit-{i}",
+        "image_url": f"https://static.e.leclerc/img/{i}.jpg",
+        "description": "Aspirateur sans fil, 40 min d'autonomie.",
+        "features": "Marque: Rowenta | Puissance: 100 W",
+        "category": "Électroménager",
+        "scraped_at": "2026-10-01T10:00:00",
+    }
+    deal.update(overrides)
+    return deal
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def static_server():
+    """URL de base d'un serveur HTTP local qui sert tests/fixtures/."""
+    handler = functools.partial(_QuietHandler, directory=FIXTURES_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:%d/" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def start_scraper(**kwargs):
+    """LeclercScraper headless ; le test est sauté si Chrome ou chromedriver manque."""
+    from utiles import LeclercScraper
+    try:
+        return LeclercScraper(headless=True, **kwargs)
+    except Exception as exc:  # pas de navigateur, ou pas de réseau pour webdriver-manager
+        pytest.skip(f"Chrome indisponible ({exc.__class__.__name__})")
+
+
+@pytest.fixture
+def client(db):
+    import front
+    app = front.create_app(db.db_path, RESPONSE_CACHE_SIZE=0)
+    return app.test_client()
+
+
+DETAILS = {"description": "Fiche chargée.", "features": "Marque: Rowenta",
+           "features_kv": [("Marque", "Rowenta")], "category": "Électroménager"}
+
+
+class ListingSite(LeclercScraper):
+    """Navigateur factice pour app.pipeline / app.staged_pipeline : `pages` pages listing de
+    2 cartes (make_deal(10 * page + i)), fiches servies par `http_fetcher`.
+
+    `fetched` liste les fiches demandées au réseau ; une URL de `crash_on` fait planter le
+    chargement, une URL de `unreachable` n'a jamais de fiche ; `next_fails_on` : numéro de page
+    dont le clic « suivant » lève une erreur.
+    """
+
+    def __init__(self, fetched, pages=4, crash_on=(), unreachable=(), next_fails_on=None,
+                 detail_cache=None, fresh_ttl_hours=24, **kwargs):
+        self.detail_cache, self.fresh_ttl_hours = detail_cache, fresh_ttl_hours
+        self.detail_pool = None
+        self.http_fetcher = self
+        self.driver = SimpleNamespace(current_url="http://fixture/bons-plans")
+        self.fetched, self.pages, self.page = fetched, pages, 1
+        self.crash_on, self.unreachable = set(crash_on), set(unreachable)
+        self.next_fails_on = next_fails_on
+
+    # --- listing ---
+    def open_homepage(self):
+        pass
+
+    def go_to_bons_plans(self):
+        self.page = 1
+
+    def listing_signature(self):
+        return f"page {self.page}"
+
+    def goto_page(self, page_no):
+        if page_no > self.pages:
+            return False
+        self.page = page_no
+        return True
+
+    def go_next_page(self):
+        if self.page == self.next_fails_on:
+            raise TimeoutError(f"pagination bloquée après la page {self.page}")
+        if self.page >= self.pages:
+            return False
+        self.page += 1
+        return True
+
+    def extract_current_page_cards(self):
+        cards = [make_deal(self.page * 10 + i) for i in range(2)]
+        return [{k: v for k, v in c.items() if k not in ("description", "features", "category")}
+                for c in cards]
+
+    # --- fiches ---
+    def fetch_many(self, page_urls):
+        if self.crash_on & set(page_urls):
+            raise RuntimeError("Chrome a planté")
+        self.fetched += page_urls
+        return [None if u in self.unreachable else dict(DETAILS) for u in page_urls]
+
+    def _fetch_details(self, page_url):
+        return None  # secours Selenium : rien de mieux
+
+    def close(self):
+        pass
@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from utiles import api_card_matches, map_api_products
+
+BASE = "https://www.e.leclerc/bons-plans?page=2"
+
+
+def load(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_search_response_maps_to_deal_dicts():
+    deals = map_api_products(load("api_listing_search.json"), BASE)
+
+    # la liste de filtres ({label, values}) précède les produits : elle ne doit pas être prise
+    assert [d["product_name"] for d in deals] == [
+        "Aspirateur balai sans fil Rowenta X-Force Flex 8.60",
+        'Téléviseur LED 55" Samsung UE55DU7175 4K',
+        "Cafetière filtre Moulinex Subito",
+    ]
+    first, tv, coffee = deals
+    assert first["price_eur"] == 229.99
+    assert first["discount_text"] == "-23 %"
+    assert first["sold_by"] == "E.Leclerc"
+    assert first["page_url"] == "https://www.e.leclerc/fp/aspirateur-balai-sans-fil-rowenta-x-force-flex-8-60-3221614005541"
+    assert first["image_url"] == "https://media.e.leclerc/3221614005541_1.jpg"
+    assert tv["discount_text"] is None and tv["image_url"] is None
+    assert coffee["price_eur"] == 1064.08       # "1 064,08 €" (insécables)
+    assert coffee["discount_text"] == "-10 €"
+    assert coffee["image_url"] == "https://www.e.leclerc/media/3045386371294.jpg"
+    assert all(d["description"] is None and d["features"] is None for d in deals)
+
+
+def test_alternate_key_names_and_cents():
+    robot, kettle = map_api_products(load("api_listing_cents.json"), BASE)
+    assert robot["product_name"] == "Robot pâtissier Kenwood Prospero+"
+    assert robot["price_eur"] == 279.99
+    assert robot["page_url"] == "https://www.e.leclerc/fp/robot-kenwood-prospero-5011423200829"
+    # entier nu : centimes ou euros ? le mapper ne peut pas le savoir, le contrôle DOM tranche
+    assert kettle["price_eur"] == 3499.0
+
+
+@pytest.mark.parametrize("dom, expected", [
+    ({"product_name": "Bouilloire  Philips HD9350", "price_eur": 34.99}, False),   # prix en centimes
+    ({"product_name": "Bouilloire Philips HD9350", "price_eur": 3499.0}, True),
+    ({"product_name": "Autre produit", "price_eur": 3499.0}, False),
+    ({"product_name": "Bouilloire Philips HD9350", "price_eur": None}, False),
+])
+def test_first_card_is_checked_against_dom(dom, expected):
+    kettle = map_api_products(load("api_listing_cents.json"), BASE)[1]
+    assert api_card_matches(kettle, dom) is expected
+
+
+def test_payload_without_products_maps_to_nothing():
+    assert map_api_products({"filters": load("api_listing_search.json")["filters"], "items": []}, BASE) == []
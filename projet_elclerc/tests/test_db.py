@@ -0,0 +1,132 @@
+import sqlite3
+import time
+
+from conftest import make_deal
+from utiles import DBManager, SCHEMA_VERSION
+
+
+def _feature_writes(db):
+    """Compteur de lignes écrites dans product_features (trigger temporaire)."""
+    db.con.execute("CREATE TEMP TABLE feature_writes (n INTEGER)")
+    db.con.execute("INSERT INTO feature_writes VALUES (0)")
+    for event in ("INSERT", "DELETE"):
+        db.con.execute(f"""
+            CREATE TEMP TRIGGER count_{event.lower()} AFTER {event} ON main.product_features
+            BEGIN UPDATE feature_writes SET n = n + 1; END;
+        """)
+    return lambda: db.con.execute("SELECT n FROM feature_writes").fetchone()[0]
+
+
+def test_reupsert_unchanged_features_does_not_rewrite_rows(db):
+    deals = [make_deal(i) for i in range(10)]
+    db.save_many(deals)
+    writes = _feature_writes(db)
+
+    db.save_many([dict(d, price_eur=79.99) for d in deals])
+
+    assert writes() == 0
+    assert db.con.execute("SELECT COUNT(*) FROM product_features").fetchone()[0] == 20
+    assert db.con.execute("SELECT COUNT(*) FROM price_observations").fetchone()[0] == 20
+
+
+def test_reupsert_changed_features_replaces_rows_and_facets(db):
+    db.save_many([make_deal(1), make_deal(2)])
+
+    db.save_many([make_deal(1, features="Marque: Dyson | Autonomie: 60 min")])
+
+    rows = db.con.execute("""
+        SELECT key, value FROM product_features f JOIN products p ON p.id = f.product_id
+        WHERE p.page_url = ? ORDER BY key
+    """, (make_deal(1)["page_url"],)).fetchall()
+    assert rows == [("Autonomie", "60 min"), ("Marque", "Dyson")]
+    facets = dict(db.con.execute("SELECT value, n FROM facet_counts WHERE facet = 'feature_key'"))
+    assert facets == {"Marque": 2, "Puissance": 1, "Autonomie": 1}
+
+
+def test_reopen_up_to_date_db_takes_no_write_lock(db):
+    # un autre écrivain tient le verrou : l'ouverture ne doit ni attendre ni recréer la vue
+    writer = sqlite3.connect(db.db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        t0 = time.perf_counter()
+        DBManager(db.db_path).close()
+        assert time.perf_counter() - t0 < 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+def test_legacy_db_is_migrated_once(tmp_path):
+    path = str(tmp_path / "old.db")
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE leclerc_deals (id INTEGER PRIMARY KEY, sold_by TEXT, product_name TEXT, "
+                "discount_text TEXT, price_eur REAL, page_url TEXT, image_url TEXT, description TEXT, "
+                "features TEXT, category TEXT, scraped_at TEXT)")
+    con.execute("INSERT INTO leclerc_deals (product_name, discount_text, price_eur, page_url) "
+                "VALUES ('Cafetière', '20%', 40, 'https://www.e.leclerc/fp/cafetiere')")
+    con.commit()
+    con.close()
+
+    manager = DBManager(path)
+    assert manager.con.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert manager.con.execute("SELECT product_name, discount_pct FROM leclerc_deals").fetchall() == [
+        ("Cafetière", 20.0)]
+    manager.close()
+
+
+def _facets(db, facet):
+    return dict(db.con.execute("SELECT value, n FROM facet_counts WHERE facet = ? AND n != 0", (facet,)))
+
+
+def test_facets_follow_changes_within_and_across_batches(db):
+    # même URL deux fois dans un lot : seul l'état final compte
+    db.save_many([make_deal(1), make_deal(2), make_deal(1, category="Jardin", discount_text="10 €")])
+    assert _facets(db, "category") == {"Électroménager": 1, "Jardin": 1}
+    assert _facets(db, "promo") == {"percent": 1, "euro": 1}
+    assert _facets(db, "feature_key") == {"Marque": 2, "Puissance": 2}
+
+    db.save_many([make_deal(2, category=None, sold_by="Darty Marketplace")])
+    assert _facets(db, "category") == {"Autre": 1, "Jardin": 1}
+    assert _facets(db, "seller") == {"E.Leclerc": 1, "Darty Marketplace": 1}
+
+    # fiche manquante : catégorie et caractéristiques en base conservées
+    db.save_many([make_deal(1, category=None, features=None, details_missing=True)])
+    assert _facets(db, "category") == {"Autre": 1, "Jardin": 1}
+    assert _facets(db, "feature_key") == {"Marque": 2, "Puissance": 2}
+
+
+def test_schema_1_facet_triggers_are_dropped(db):
+    db.save_many([make_deal(1)])
+    db.con.execute("""
+        CREATE TRIGGER facets_features_ai AFTER INSERT ON product_features
+        BEGIN UPDATE facet_counts SET n = n + 1000; END;
+    """)
+    db.con.execute("CREATE INDEX idx_features_key_value ON product_features (key, value);")
+    db.con.execute("PRAGMA user_version = 1;")
+    db.con.commit()
+
+    manager = DBManager(db.db_path)
+    names = {r[0] for r in manager.con.execute("SELECT name FROM sqlite_master WHERE tbl_name = 'product_features'")}
+    assert "facets_features_ai" not in names and "idx_features_key_value" not in names
+    manager.save_many([make_deal(2)])
+    assert _facets(manager, "feature_key") == {"Marque": 2, "Puissance": 2}
+    manager.close()
+
+
+def test_fts_follows_text_changes_without_triggers(db):
+    db.save_many([make_deal(1), make_deal(2), make_deal(2, description="Centrale vapeur 2400 W.")])
+    db.save_many([make_deal(1, description="Robot laveur de vitres."),
+                  make_deal(2, description="Centrale vapeur 2400 W.", price_eur=89.99)])
+    db.save_many([make_deal(2, description=None, features=None, details_missing=True)])
+
+    def hits(word):
+        return [r[0] for r in db.con.execute(
+            "SELECT p.page_url FROM deals_fts JOIN products p ON p.id = deals_fts.rowid "
+            "WHERE deals_fts MATCH ? ORDER BY p.id", (word,))]
+
+    assert hits("vitres") == [make_deal(1)["page_url"]]
+    assert hits("vapeur") == [make_deal(2)["page_url"]]
+    assert hits("autonomie") == []
+    assert not db.con.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger'").fetchone()
+    # contenu externe : l'index doit correspondre exactement aux lignes de products
+    db.con.execute("INSERT INTO deals_fts (deals_fts) VALUES ('integrity-check')")
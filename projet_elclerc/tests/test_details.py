@@ -0,0 +1,105 @@
+import pytest
+
+from utiles import AdaptiveDeadline, LeclercScraper
+
+
+class _SwitchTo:
+    def new_window(self, kind):
+        pass
+
+    def window(self, handle):
+        pass
+
+
+class DetailDriver:
+    """Onglet de fiche produit sans description ni tableau ; `ready_state` fixe l'état du document."""
+
+    current_window_handle = "main"
+
+    def __init__(self, ready_state="complete", url="https://www.e.leclerc/fp/vide-1"):
+        self.ready_state = ready_state
+        self.current_url = url
+        self.switch_to = _SwitchTo()
+
+    def get(self, url):
+        pass
+
+    def find_elements(self, by, xpath):
+        return []
+
+    def find_element(self, by, xpath):
+        from selenium.common.exceptions import NoSuchElementException
+        raise NoSuchElementException(xpath)
+
+    def execute_script(self, script, *args):
+        return self.ready_state
+
+    def close(self):
+        pass
+
+
+def detail_scraper(driver):
+    scraper = LeclercScraper.__new__(LeclercScraper)  # sans navigateur : seul _fetch_details sert
+    scraper.driver = driver
+    scraper.lean = False
+    scraper.detail_deadline = AdaptiveDeadline(minimum=0.2, maximum=0.5)
+    return scraper
+
+
+def test_loaded_page_without_content_is_kept_not_retried():
+    details = detail_scraper(DetailDriver())._fetch_details("https://www.e.leclerc/fp/vide-1")
+    assert details == {"description": None, "features": None, "features_kv": [], "category": None}
+
+
+@pytest.mark.parametrize("driver", [
+    DetailDriver(ready_state="loading"),
+    DetailDriver(url="chrome-error://chromewebdata/"),
+], ids=["not-loaded", "error-page"])
+def test_unloaded_or_error_page_is_retried(driver):
+    assert detail_scraper(driver)._fetch_details("https://www.e.leclerc/fp/vide-1") is None
+
+
+class AttachedDriver:
+    """Driver renvoyé par un webdriver.Chrome factice : accepte le blocage CDP et la fermeture."""
+
+    def __init__(self, options):
+        self.options = options
+
+    def execute_cdp_cmd(self, cmd, params):
+        pass
+
+    def quit(self):
+        pass
+
+    class service:
+        @staticmethod
+        def stop():
+            pass
+
+
+@pytest.mark.parametrize("debugger_address", [None, "127.0.0.1:9222"], ids=["launched", "attached"])
+def test_detail_workers_inherit_the_scraper_settings(monkeypatch, debugger_address):
+    import utiles
+
+    monkeypatch.setattr(utiles, "resolve_driver_path", lambda refresh=False: "/usr/bin/chromedriver")
+    monkeypatch.setattr(utiles.webdriver, "Chrome", lambda service, options: AttachedDriver(options))
+
+    scraper = LeclercScraper(headless=True, detail_workers=2, lean=True, detail_timeout=3,
+                             base_url="http://127.0.0.1:8765/", blocked_urls=["*tracker*"],
+                             debugger_address=debugger_address)
+    workers = scraper.detail_pool.workers
+    try:
+        assert len(workers) == 2
+        for w in workers:
+            assert w.base_url == "http://127.0.0.1:8765/"
+            assert w.detail_deadline.maximum == 3
+            assert w.lean and w.blocked_patterns == scraper.blocked_patterns
+            assert "*tracker*" in w.blocked_patterns
+            assert w.debugger_address == debugger_address
+            opts = w.driver.options
+            if debugger_address:
+                assert opts.experimental_options["debuggerAddress"] == debugger_address
+            else:
+                assert "--headless=new" in opts.arguments
+    finally:
+        scraper.close()
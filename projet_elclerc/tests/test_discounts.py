@@ -0,0 +1,51 @@
+import pytest
+
+from conftest import make_deal
+from utiles import DBManager, parse_discount
+
+
+@pytest.mark.parametrize("text, price, expected", [
+    ("20%", 80.0, {"promo_kind": "percent", "discount_pct": 20.0, "discount_eur": 20.0, "original_price_eur": 100.0}),
+    ("-12,5 %", 70.0, {"promo_kind": "percent", "discount_pct": 12.5, "discount_eur": 10.0, "original_price_eur": 80.0}),
+    ("-10 €", 90.0, {"promo_kind": "euro", "discount_pct": 10.0, "discount_eur": 10.0, "original_price_eur": 100.0}),
+    ("-1 064 €", 936.0, {"promo_kind": "euro", "discount_pct": 53.2, "discount_eur": 1064.0,
+                         "original_price_eur": 2000.0}),
+    ("1\u00a0064,50\u00a0€ de remise", None, {"promo_kind": "euro", "discount_pct": None,
+                                               "discount_eur": 1064.5, "original_price_eur": None}),
+    ("-1\u202f200 €", 800.0, {"promo_kind": "euro", "discount_pct": 60.0, "discount_eur": 1200.0,
+                              "original_price_eur": 2000.0}),
+    ("Offre spéciale", 50.0, {"promo_kind": "other", "discount_pct": None, "discount_eur": None,
+                              "original_price_eur": None}),
+    ("150%", 50.0, {"promo_kind": "percent", "discount_pct": None, "discount_eur": None, "original_price_eur": None}),
+    (None, 50.0, {"promo_kind": "none", "discount_pct": None, "discount_eur": None, "original_price_eur": None}),
+    ("", 50.0, {"promo_kind": "none", "discount_pct": None, "discount_eur": None, "original_price_eur": None}),
+])
+def test_parse_discount(text, price, expected):
+    assert parse_discount(text, price) == expected
+
+
+def test_promo_facets_and_ranking_use_stored_columns(db, client):
+    db.save_many([
+        make_deal(1, discount_text="-1 064 €", price_eur=936.0),
+        make_deal(2, discount_text="20%"),
+        make_deal(3, discount_text="Offre spéciale"),
+    ])
+
+    facets = client.get("/api/facets").get_json()["promo"]
+    assert facets == [{"value": "euro", "count": 1}, {"value": "other", "count": 1},
+                      {"value": "percent", "count": 1}]
+    ranked = client.get("/api/deals?sort=discount").get_json()["items"]
+    assert [(d["discount_text"], d["discount_pct"]) for d in ranked] == [
+        ("-1 064 €", 53.2), ("20%", 20.0), ("Offre spéciale", None)]
+
+
+def test_schema_3_rows_are_reparsed(db):
+    db.save_many([make_deal(1, discount_text="-1 064 €", price_eur=936.0)])
+    # valeurs écrites par l'ancien parseur ("1 064 €" lu 64 €)
+    db.con.execute("UPDATE products SET discount_eur = 64, discount_pct = 6.4, original_price_eur = 1000")
+    db.con.execute("PRAGMA user_version = 3")
+    db.con.commit()
+
+    manager = DBManager(db.db_path)
+    assert manager.con.execute("SELECT discount_eur, discount_pct FROM products").fetchone() == (1064.0, 53.2)
+    manager.close()
@@ -0,0 +1,59 @@
+import json
+
+from conftest import make_deal
+from export import iter_json_array, select_rows
+
+
+def _pool(client):
+    return client.application.extensions["leclerc_read_pool"]
+
+
+def test_ndjson_export_streams_filtered_rows(db, client):
+    db.save_many([make_deal(i, category="Cuisine" if i % 2 else "Jardin") for i in range(1, 8)])
+
+    resp = client.get("/api/deals.ndjson?category=Cuisine")
+
+    assert resp.status_code == 200 and resp.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [r["product_name"] for r in rows] == [f"Aspirateur balai n°{i}" for i in (1, 3, 5, 7)]
+    assert rows[0]["promo_kind"] == "percent" and rows[0]["discount_pct"] == 20
+
+
+def test_json_export_is_a_valid_array_across_batches(db, client):
+    db.save_many([make_deal(i) for i in range(1, 6)])
+
+    assert len(client.get("/api/deals.json").get_json()) == 5
+    assert client.get("/api/deals.json?q=introuvable").get_json() == []
+    for batch_size in (1, 2, 5, 10):  # découpage en morceaux : le tableau reste valide
+        body = b"".join(iter_json_array(select_rows(db.con), batch_size=batch_size))
+        assert [r["id"] for r in json.loads(body)] == [1, 2, 3, 4, 5]
+
+
+def test_export_errors_are_reported_before_streaming(db, client):
+    db.save_many([make_deal(1)])
+    pool = _pool(client)
+
+    assert client.get("/api/deals.ndjson?min_discount=abc").status_code == 400
+
+    pool.timeout = 0.05
+    held = [pool.acquire() for _ in range(pool.size)]
+    resp = client.get("/api/deals.ndjson")
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+    for con in held:
+        pool.release(con)
+
+    db.con.execute("DROP VIEW leclerc_deals")  # la requête d'export échoue à l'exécution
+    resp = client.get("/api/deals.json")
+    assert resp.status_code == 500 and "export impossible" in resp.get_json()["error"]
+    assert pool._idle.qsize() == pool._opened  # connexion rendue malgré l'erreur
+
+
+def test_export_releases_its_connection(db, client):
+    db.save_many([make_deal(i) for i in range(1, 4)])
+    pool = _pool(client)
+
+    assert len(client.get("/api/deals.ndjson").get_data().splitlines()) == 3
+    resp = client.head("/api/deals.json")  # corps jamais parcouru : rendue à la fermeture
+    assert resp.status_code == 200
+    resp.close()
+    assert pool._opened >= 1 and pool._idle.qsize() == pool._opened
@@ -0,0 +1,36 @@
+import pytest
+
+from conftest import start_scraper
+from fixture_site import FixtureSite
+from utiles import XPATH_ALL_PRODUCT_CARDS, LeclercScraper
+
+
+@pytest.mark.parametrize("euros, cents, expected", [
+    ("1 064", ",08 €", 1064.08),
+    ("1\u00a0064", ",08\u00a0€", 1064.08),  # insécable : gardée par innerText, pas par .text
+    ("1\u202f064", ",08 €", 1064.08),        # séparateur de milliers fr-FR (insécable fine)
+    ("29", "", 29.0),
+    ("", ",99 €", None),
+])
+def test_parse_price_ignores_spaces_and_nbsp(euros, cents, expected):
+    assert LeclercScraper._parse_price(None, euros, cents) == expected
+
+
+@pytest.mark.parametrize("spa", [False, True], ids=["html", "spa"])
+def test_batch_extractor_matches_per_element_extractor(spa):
+    with FixtureSite(pages=1, cards_per_page=24, spa=spa) as site:
+        scraper = start_scraper(base_url=site.base_url)
+        try:
+            scraper.open_homepage()
+            scraper.go_to_bons_plans()
+            batch = scraper._extract_cards_batch()
+            cards = scraper.driver.find_elements("xpath", XPATH_ALL_PRODUCT_CARDS)
+            single = [scraper._extract_card_data(card) for card in cards]
+        finally:
+            scraper.close()
+
+    assert len(batch) == 24
+    assert batch == single
+    # la fixture affiche des prix ≥ 1 000 € avec un séparateur insécable : ils doivent être lus
+    assert all(d["price_eur"] is not None for d in batch)
+    assert any(d["price_eur"] >= 1000 for d in batch)
@@ -0,0 +1,213 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from conftest import make_deal
+
+
+def test_cards_search_matches_description_only(db, client):
+    db.save_many([
+        make_deal(1, product_name="Balai vapeur", description="Double aspiration cyclonique."),
+        make_deal(2, product_name="Cafetière", description="Filtre permanent."),
+    ])
+
+    rows = client.get("/api/cards?q=aspiration").get_json()
+    cols = client.get("/api/cards?q=aspiration&layout=columns").get_json()
+
+    assert [it["n"] for it in rows["items"]] == ["Balai vapeur"]
+    assert "description" not in rows["items"][0]  # liste compacte : le texte reste sur le serveur
+    assert cols["cols"]["n"] == ["Balai vapeur"]
+    detail = client.get(f"/api/deals/{rows['items'][0]['i']}").get_json()
+    assert "aspiration" in detail["description"]
+
+
+def test_seller_filter_matches_substring(db, client):
+    db.save_many([
+        make_deal(1, sold_by="Boulanger Pro"),
+        make_deal(2, sold_by="Darty Marketplace"),
+        make_deal(3, sold_by="E.Leclerc"),
+    ])
+
+    def sellers(q):
+        return sorted(d["sold_by"] for d in client.get(f"/api/deals?seller={q}").get_json()["items"])
+
+    assert sellers("pro") == ["Boulanger Pro"]          # milieu / fin du nom, pas seulement le début
+    assert sellers("MARKET") == ["Darty Marketplace"]
+    assert sellers("e") == ["Boulanger Pro", "Darty Marketplace", "E.Leclerc"]
+    assert sellers("%25") == []                          # « % » saisi est littéral
+
+
+def test_feature_filter_matches_the_exact_pair(db, client):
+    db.save_many([
+        make_deal(1),
+        make_deal(2, features="Marque: Dyson | Puissance: 100 W"),
+        make_deal(3, features="Marque: Rowenta Pro | Puissance: 1000 W"),
+    ])
+
+    def names(*features):
+        query = "&".join(f"feature={f}" for f in features)
+        return sorted(d["product_name"] for d in client.get(f"/api/deals?{query}").get_json()["items"])
+
+    assert names("Marque:Rowenta") == ["Aspirateur balai n°1"]   # « Rowenta Pro » : autre valeur
+    assert names("Puissance:100 W") == ["Aspirateur balai n°1", "Aspirateur balai n°2"]
+    assert names("Marque:Dyson", "Puissance:100 W") == ["Aspirateur balai n°2"]
+    assert names("Puissance:100") == []
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node absent")
+def test_local_filter_keeps_server_hits(client):
+    """Le filtre local de la grille ne doit pas écarter un résultat FTS trouvé hors du nom."""
+    html = client.get("/").get_data(as_text=True)
+    script = re.search(r"<script>(.*?)</script>", html, re.S).group(1)
+    grab = lambda name: re.search(r"function " + name + r"\(.*?\n}", script, re.S).group(0)
+    harness = grab("fold") + "\n" + grab("matches") + """
+const filters = q => ({q: fold(q).split(/\\s+/).filter(Boolean), seller: '', promo: '', cat: ''});
+const card = {_blob: fold('Balai vapeur'), _q: ['aspiration'], _seller: '', _cat: 'Autre'};
+console.log(JSON.stringify(['aspiration', 'aspir', 'balai aspiration', 'aspiration robot']
+  .map(q => matches(card, filters(q)))));
+"""
+    out = subprocess.run(["node", "-e", harness], capture_output=True, text=True, check=True).stdout
+    assert json.loads(out) == [True, True, True, False]
+
+
+def test_front_and_scraper_share_the_default_db(monkeypatch, tmp_path):
+    import config
+    import front
+    import thumbs
+    from config import DB_PATH_ENV, resolve_db_path
+
+    assert os.path.isabs(config.DEFAULT_DB_PATH)
+    # create_app migrerait la base versionnée : même logique, sur une copie du défaut
+    monkeypatch.setattr(config, "DEFAULT_DB_PATH", str(tmp_path / "defaut.db"))
+    monkeypatch.delenv(DB_PATH_ENV, raising=False)
+    monkeypatch.chdir(tmp_path)  # le répertoire courant ne doit rien changer
+    default = resolve_db_path()
+    assert front.create_app().config["DB_PATH"] == default
+    assert os.path.isabs(thumbs.DEFAULT_THUMB_DIR)
+
+    monkeypatch.setenv(DB_PATH_ENV, str(tmp_path / "autre.db"))
+    assert resolve_db_path() == front.create_app().config["DB_PATH"] == str(tmp_path / "autre.db")
+
+
+def test_read_pool_times_out_when_exhausted(db):
+    from front import PoolTimeout, ReadPool
+
+    pool = ReadPool(db.db_path, size=1, timeout=0.05)
+    con = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(con)
+    assert pool.acquire() is con  # rendue au pool, pas rouverte
+    pool.close()
+
+
+def test_read_pool_connections_are_read_only(db):
+    import sqlite3
+
+    from front import ReadPool
+
+    con = ReadPool(db.db_path, size=1).acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        con.execute("DELETE FROM products")
+
+
+def test_requests_release_their_connection(db):
+    import front
+
+    db.save_many([make_deal(1)])
+    app = front.create_app(db.db_path, DB_POOL_SIZE=1, DB_POOL_TIMEOUT=0.05, RESPONSE_CACHE_SIZE=0)
+    client = app.test_client()
+    pool = app.extensions["leclerc_read_pool"]
+
+    for _ in range(3):  # une seule connexion : chaque requête doit la rendre au teardown
+        assert client.get("/api/deals").status_code == 200
+    assert pool._opened == 1 and pool._idle.qsize() == 1
+
+    held = pool.acquire()
+    resp = client.get("/api/deals")
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+    pool.release(held)
+    assert client.get("/api/deals").status_code == 200
+
+
+def test_front_does_not_import_the_scraper(tmp_path):
+    # selenium, webdriver_manager, lxml et Pillow absents : front.py doit quand même démarrer
+    code = """
+import sys
+for name in ("selenium", "webdriver_manager", "lxml", "PIL", "utiles", "thumbs"):
+    sys.modules[name] = None
+import front
+front.create_app()
+"""
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, LECLERC_DB=str(tmp_path / "deals.db"))
+    subprocess.run([sys.executable, "-c", code], cwd=here, env=env, check=True)
+
+
+def test_front_migrates_a_legacy_database(tmp_path):
+    import front
+
+    # base d'origine du dépôt : table plate leclerc_deals, user_version 0
+    legacy = str(tmp_path / "legacy.db")
+    shutil.copy(os.path.join(os.path.dirname(front.__file__), "leclerc_deals.db"), legacy)
+
+    client = front.create_app(legacy, RESPONSE_CACHE_SIZE=0).test_client()
+
+    deals = client.get("/api/deals?per_page=5")
+    assert deals.status_code == 200 and deals.get_json()["items"]
+    for url in ("/api/cards", "/api/facets", "/api/categories", "/api/deals.ndjson", "/api/deals.json"):
+        assert client.get(url).status_code == 200, url
+    assert client.get("/api/facets").get_json()["category"]
+
+
+@pytest.fixture
+def cached_client(db):
+    import front
+
+    return front.create_app(db.db_path).test_client()  # cache des réponses actif
+
+
+def test_cached_response_revalidates_on_etag(db, cached_client):
+    db.save_many([make_deal(1)])
+
+    first = cached_client.get("/api/categories")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+    assert "Last-Modified" not in first.headers
+
+    for header in (etag, "W/" + etag, '"autre", ' + etag, "*"):
+        resp = cached_client.get("/api/categories", headers={"If-None-Match": header})
+        assert resp.status_code == 304 and resp.headers["ETag"] == etag
+    assert cached_client.get("/api/categories", headers={"If-None-Match": '"autre"'}).status_code == 200
+    # sans ETag, une date ne suffit jamais à renvoyer 304
+    assert cached_client.get("/api/categories",
+                             headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}).status_code == 200
+
+    db.save_many([make_deal(2, category="Jardin")])  # la base change : le corps et l'ETag aussi
+    resp = cached_client.get("/api/categories", headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
+    assert resp.get_json() == ["Jardin", "Électroménager"]
+
+
+@pytest.mark.parametrize("accept, gzipped", [
+    ("gzip, deflate", True),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("br", False),
+    ("", False),
+])
+def test_cached_response_gzip_negotiation(db, cached_client, accept, gzipped):
+    import gzip
+
+    db.save_many([make_deal(1)])
+    resp = cached_client.get("/api/categories", headers={"Accept-Encoding": accept})
+
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert (resp.headers.get("Content-Encoding") == "gzip") is gzipped
+    body = gzip.decompress(resp.data) if gzipped else resp.data
+    assert json.loads(body) == ["Électroménager"]
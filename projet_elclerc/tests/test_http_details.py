@@ -0,0 +1,41 @@
+import pytest
+
+from fixture_site import FixtureSite, fixture_product
+from utiles import HttpDetailFetcher, format_features
+
+
+@pytest.fixture
+def fetcher():
+    f = HttpDetailFetcher(max_workers=4, timeout=5)
+    yield f
+    f.close()
+
+
+def test_saved_product_page_is_parsed_without_browser(fetcher, static_server):
+    details = fetcher.fetch(static_server + "product_page.html")
+
+    # <br> et blocs -> retours à la ligne, <script> ignoré, &nbsp; -> espace comme WebElement.text
+    assert details["description"] == ("Jusqu'à 45 min d'autonomie.\nTube flexible pour passer sous les meubles.\n"
+                                      "Brosse motorisée\nMini-brosse")
+    assert details["features_kv"][0] == ("Marque", "Rowenta")
+    assert ("Poids", "2,5 kg") in details["features_kv"]
+    assert len(details["features_kv"]) == 14  # table servie sans <tbody> : acceptée quand même
+    assert details["category"] == "Électroménager > Aspirateurs"
+
+
+@pytest.mark.parametrize("path", ["product_page_spa.html", "absente.html"], ids=["spa-shell", "404"])
+def test_page_without_static_content_falls_back_to_selenium(fetcher, static_server, path):
+    assert fetcher.fetch(static_server + path) is None
+
+
+def test_fixture_site_pages_match_their_data(fetcher):
+    with FixtureSite(pages=1, cards_per_page=6) as site:
+        urls = [f"{site.base_url}fp/produit-fixture-{i}-{i}" for i in range(1, 7)]
+        results = fetcher.fetch_many(urls)
+        assert site.hits["detail"] == 6
+
+    for i, details in enumerate(results, start=1):
+        p = fixture_product(i)
+        assert details["description"] == "\n".join(p["description"])
+        assert details["features"] == format_features(p["features"])
+        assert details["category"] == dict(p["features"])["Catégorie"]
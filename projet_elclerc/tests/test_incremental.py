@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from conftest import make_deal
+from utiles import LeclercScraper
+
+
+class CountingFetcher:
+    """Backend HTTP factice : compte les fiches réellement chargées."""
+
+    def __init__(self):
+        self.fetched = []
+
+    def fetch_many(self, page_urls):
+        self.fetched += page_urls
+        return [{"description": "Description rechargée.", "features": "Marque: Rowenta",
+                 "features_kv": [("Marque", "Rowenta")], "category": "Électroménager"} for _ in page_urls]
+
+
+def incremental_scraper(db, ttl_hours=24):
+    scraper = LeclercScraper.__new__(LeclercScraper)  # sans navigateur : seul complete_cards sert
+    scraper.detail_cache = db
+    scraper.fresh_ttl_hours = ttl_hours
+    scraper.http_fetcher = CountingFetcher()
+    scraper.detail_pool = None
+    return scraper
+
+
+def age(db, hours):
+    """Recule toutes les dates de products de `hours` heures (temps écoulé entre deux runs)."""
+    rows = db.con.execute("SELECT id, scraped_at, details_fetched_at FROM products").fetchall()
+    shift = lambda ts: ts and (datetime.fromisoformat(ts) - timedelta(hours=hours)).isoformat()
+    db.con.executemany("UPDATE products SET scraped_at = ?, details_fetched_at = ? WHERE id = ?",
+                       [(shift(s), shift(f), pid) for pid, s, f in rows])
+    db.con.commit()
+
+
+def run(db, scraper):
+    card = {k: v for k, v in make_deal(1).items() if k not in ("description", "features", "category")}
+    db.save_many(scraper.complete_cards([card]))
+
+
+def test_cached_details_expire_across_frequent_runs(db):
+    scraper = incremental_scraper(db)
+    run(db, scraper)                      # t0 : fiche chargée
+    assert len(scraper.http_fetcher.fetched) == 1
+
+    age(db, 20)
+    run(db, scraper)                      # t0 + 20 h : relue depuis la base
+    assert len(scraper.http_fetcher.fetched) == 1
+
+    age(db, 23)
+    run(db, scraper)                      # t0 + 43 h : plus fraîche malgré le passage à t0 + 20 h
+    assert len(scraper.http_fetcher.fetched) == 2
+
+
+def test_missing_details_do_not_refresh_the_cache(db):
+    deal = make_deal(1, scraped_at=datetime.utcnow().isoformat())
+    db.save_many([deal])
+    age(db, 30)
+    db.save_many([dict(deal, description=None, features=None, category=None, details_missing=True)])
+
+    assert db.get_fresh_details([deal["page_url"]], ttl_hours=24) == {}
+    assert db.get_fresh_details([deal["page_url"]], ttl_hours=48)[deal["page_url"]]["description"] == \
+        deal["description"]
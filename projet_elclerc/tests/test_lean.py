@@ -0,0 +1,64 @@
+import json
+import re
+
+import pytest
+
+from fixture_site import APP_CSS, FixtureSite
+from utiles import LEAN_BLOCKED_RESOURCES, LEAN_BLOCKED_URLS, LEAN_RESOURCE_PATTERNS
+
+BASE = "http://127.0.0.1:8765"
+# mêmes motifs que LeclercScraper(lean=True) envoie à Network.setBlockedURLs
+PATTERNS = [p for r in LEAN_BLOCKED_RESOURCES for p in LEAN_RESOURCE_PATTERNS[r]] + LEAN_BLOCKED_URLS
+
+
+def cdp_match(url, pattern):
+    # sémantique CDP : URL entière, requête comprise, '*' seul joker ('?', '[' littéraux)
+    return re.fullmatch(".*".join(map(re.escape, pattern.split("*"))), url) is not None
+
+
+def blocked(url):
+    return any(cdp_match(url, p) for p in PATTERNS)
+
+
+def fixture_asset_urls():
+    """URLs de ressources telles que les pages du site de fixture les référencent."""
+    site = FixtureSite(pages=1, cards_per_page=2)
+    pages = [site.homepage(), site.homepage(listing_page=1), site.product_page(1)]
+    refs = {u for page in pages for u in re.findall(r'(?:src|href)="(/(?:img|static)/[^"]+)"', page.decode())}
+    refs |= set(re.findall(r"url\((/static/[^)]+)\)", APP_CSS.decode()))
+    refs |= {item["images"][0]["url"] for item in json.loads(site.listing_api(1))["results"]["items"]}
+    return sorted(BASE + u for u in refs)
+
+
+def test_fixture_pages_reference_assets_with_query_strings():
+    urls = fixture_asset_urls()
+    assert any(re.search(r"/img/\d+\.gif\?", u) for u in urls)
+    assert any(re.search(r"\.woff2\?", u) for u in urls)
+
+
+@pytest.mark.parametrize("url", [u for u in fixture_asset_urls() if "/app.css" not in u])
+def test_fixture_assets_are_blocked(url):
+    assert blocked(url)
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.googletagmanager.com/gtm.js?id=GTM-XXXX",
+    "https://media.e.leclerc/3221614005541_1.jpg",
+    "https://media.e.leclerc/3221614005541_1.jpg?width=400&height=400",
+    "https://www.e.leclerc/assets/fonts/Roboto.woff2?v=1.2",
+])
+def test_real_assets_are_blocked(url):
+    assert blocked(url)
+
+
+@pytest.mark.parametrize("url", [
+    f"{BASE}/bons-plans?page=2",
+    f"{BASE}/fp/produit-42",
+    f"{BASE}/api/bons-plans?page=2",
+    f"{BASE}/static/app.css?v=3",
+    "https://www.e.leclerc/fp/aspirateur-balai-rowenta-3221614005541",
+    "https://cdn.icons.example/sprite.css",          # « .ico » au milieu d'un nom d'hôte
+    "https://www.e.leclerc/recherche?q=photo.jpgs",  # extension suivie d'autres lettres
+])
+def test_pages_and_api_are_not_blocked(url):
+    assert not blocked(url)
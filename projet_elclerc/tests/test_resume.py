@@ -0,0 +1,61 @@
+import pytest
+
+import app
+from conftest import ListingSite, make_deal
+
+
+def url(product):
+    return make_deal(product)["page_url"]
+
+
+@pytest.fixture
+def run(db, monkeypatch):
+    monkeypatch.setenv("LECLERC_DB", db.db_path)
+    fetched = []
+
+    def run(**kwargs):
+        site = {k: kwargs.pop(k) for k in ("crash_on", "unreachable", "next_fails_on") if k in kwargs}
+        monkeypatch.setattr(app, "LeclercScraper", lambda **kw: ListingSite(fetched, **site, **kw))
+        del fetched[:]
+        app.pipeline(collect_metrics=False, **kwargs)
+        return list(fetched)
+
+    return run
+
+
+def crawl_state(db):
+    return db.con.execute("SELECT status, last_page FROM crawl_runs ORDER BY id DESC").fetchone()
+
+
+def test_resume_continues_after_the_last_checkpoint(db, run):
+    # page 2 : le chargement des fiches plante, ses cartes restent en file
+    assert run(max_pages=4, crash_on=[url(20)]) == [url(10), url(11)]
+    assert crawl_state(db) == ("failed", 2)
+    assert [c["page_url"] for _, c, _ in db.pending_cards(1)] == [url(20), url(21)]
+
+    # reprise : file d'attente, puis pages 3 et 4 ; rien de la page 1 n'est rechargé
+    assert run(max_pages=4, resume=True) == [url(20), url(21), url(30), url(31), url(40), url(41)]
+    assert crawl_state(db) == ("done", 4)
+    assert db.pending_cards(1) == []
+    assert db.con.execute("SELECT COUNT(*) FROM products WHERE description IS NOT NULL").fetchone()[0] == 8
+    assert db.con.execute("SELECT COUNT(*) FROM crawl_runs").fetchone()[0] == 1
+
+
+def test_resume_without_interrupted_crawl_starts_over(db, run):
+    run(max_pages=1)
+    assert crawl_state(db) == ("done", 1)
+    assert run(max_pages=1, resume=True) == [url(10), url(11)]
+    assert db.con.execute("SELECT COUNT(*) FROM crawl_runs").fetchone()[0] == 2
+
+
+def test_unreachable_detail_is_retried_then_written_without_details(db, run):
+    db.save_many([make_deal(11, description="Description connue.")])
+
+    fetched = run(max_pages=1, unreachable=[url(11)], max_detail_attempts=3, retry_base_delay=0)
+
+    assert fetched.count(url(11)) == 3 and fetched.count(url(10)) == 1
+    assert crawl_state(db) == ("done", 1)
+    assert db.pending_cards(1) == []
+    # carte écrite (prix, date) sans effacer la description déjà en base
+    assert db.con.execute("SELECT description FROM products WHERE page_url = ?",
+                          (url(11),)).fetchone()[0] == "Description connue."
@@ -0,0 +1,55 @@
+import pytest
+
+from conftest import make_deal
+
+
+@pytest.fixture
+def catalogue(db):
+    db.save_many([
+        make_deal(1, product_name="Vélo électrique pliant", description="Batterie amovible."),
+        make_deal(2, product_name="Casque audio", description="Idéal pour le vélo électrique."),
+        make_deal(3, product_name="Cafetière filtre", description="Verseuse en verre.",
+                  features="Marque: Moulinex | Capacité: 1,25 L"),
+        make_deal(4, product_name="Trottinette électrique", description="Autonomie 25 km."),
+    ])
+    return db
+
+
+def names(resp):
+    return [r["product_name"] for r in resp.get_json()]
+
+
+def test_search_ignores_accents_and_case_and_matches_prefixes(catalogue, client):
+    assert names(client.get("/api/search?q=velo elec")) == ["Vélo électrique pliant", "Casque audio"]
+    assert names(client.get("/api/search?q=CAFETIERE")) == ["Cafetière filtre"]
+    assert names(client.get("/api/search?q=moulinex")) == ["Cafetière filtre"]  # caractéristiques
+
+
+def test_name_matches_rank_before_description_matches(catalogue, client):
+    results = client.get("/api/search?q=électrique").get_json()
+
+    assert {r["product_name"] for r in results[:2]} == {"Vélo électrique pliant", "Trottinette électrique"}
+    assert results[-1]["product_name"] == "Casque audio"
+    assert [r["score"] for r in results] == sorted(r["score"] for r in results)
+
+
+def test_search_returns_highlighted_snippets(catalogue, client):
+    (hit,) = client.get("/api/search?q=verseuse").get_json()
+    assert "<mark>Verseuse</mark>" in hit["snippet"]
+    assert hit["page_url"] == "https://www.e.leclerc/fp/produit-3"
+
+
+def test_search_pagination_and_bad_input(catalogue, client):
+    everything = names(client.get("/api/search?q=électrique"))
+    page = names(client.get("/api/search?q=électrique&limit=1&offset=1"))
+    assert page == everything[1:2]
+
+    assert client.get("/api/search?q=").get_json() == []
+    assert client.get('/api/search?q="').status_code == 200  # guillemet seul : pas d'erreur FTS
+    assert client.get("/api/search?q=velo&limit=abc").status_code == 400
+
+
+def test_search_follows_updates(catalogue, client):
+    catalogue.save_many([make_deal(4, product_name="Trottinette thermique", description="Autonomie 25 km.")])
+    assert "Trottinette thermique" not in names(client.get("/api/search?q=électrique"))
+    assert names(client.get("/api/search?q=thermique")) == ["Trottinette thermique"]
@@ -0,0 +1,125 @@
+import json
+import multiprocessing
+import queue
+
+import pytest
+
+import app
+import metrics
+
+
+class ListingStub:
+    """Navigateur réduit au listing : `honors_page_param=False` imite un site qui ignore ?page=."""
+
+    def __init__(self, pages=5, honors_page_param=True, **kwargs):
+        self.pages, self.honors = pages, honors_page_param
+        self.page = 1
+
+    def open_homepage(self):
+        pass
+
+    def go_to_bons_plans(self):
+        self.page = 1
+
+    def listing_signature(self):
+        return f"Produit de la page {self.page}"
+
+    def goto_page(self, page_no):
+        if page_no > self.pages:
+            return False  # aucune carte avant le délai
+        if self.honors:
+            self.page = page_no
+        return True
+
+    def scrape_current_page(self):
+        metrics.REGISTRY.inc("scrape_items_total", 2, stage="cards")
+        return [{"page_url": f"https://www.e.leclerc/fp/p{self.page}-{i}"} for i in range(2)]
+
+    def go_next_page(self):
+        if self.page >= self.pages:
+            return False
+        self.page += 1
+        return True
+
+    def close(self):
+        pass
+
+
+def run_shard(monkeypatch, start, end, **site):
+    monkeypatch.setattr(app, "LeclercScraper", lambda **kwargs: ListingStub(**site))
+    out = queue.Queue()
+    app._shard_worker(1, start, end, {}, None, False, out)
+    return [out.get_nowait() for _ in range(out.qsize())]
+
+
+def test_shard_starts_at_its_first_page(monkeypatch):
+    msgs = run_shard(monkeypatch, 3, 4)
+    assert [m[2] for m in msgs if m[0] == "page"] == [3, 4]
+    assert msgs[-1][0] == "done"
+    assert msgs[0][3][0]["page_url"].endswith("/p3-0")
+
+
+@pytest.mark.parametrize("site, reason", [
+    ({"honors_page_param": False}, "ignore ?page="),
+    ({"pages": 2}, "délai dépassé"),
+])
+def test_unverified_jump_fails_instead_of_crawling_page_one(monkeypatch, site, reason):
+    msgs = run_shard(monkeypatch, 3, 4, **site)
+    assert [m[0] for m in msgs] == ["failed"]
+    assert reason in msgs[0][2]
+
+
+def test_shard_forwards_its_metrics(monkeypatch):
+    monkeypatch.setattr(app, "LeclercScraper", lambda **kwargs: ListingStub())
+    out = queue.Queue()
+    app._shard_worker(1, 1, 2, {}, None, False, out, collect_metrics=True)
+    msgs = [out.get_nowait() for _ in range(out.qsize())]
+
+    assert [metrics.counter_total(m[-1], "scrape_items_total", stage="cards") for m in msgs] == [2, 2, 0]
+
+
+class LateQueue:
+    """Le premier get expire alors que le fils a déjà tout posté et s'est terminé avec le code 0."""
+
+    def __init__(self, ctx):
+        self.q, self.late = ctx.Queue(), True
+
+    def put(self, msg):
+        self.q.put(msg)
+
+    def get(self, timeout=None):
+        if self.late:
+            self.late = False
+            for proc in multiprocessing.active_children():
+                proc.join()
+            raise queue.Empty
+        return self.q.get(timeout=timeout)
+
+
+def test_clean_exit_after_get_timeout_is_not_a_crash(monkeypatch, tmp_path):
+    fork = multiprocessing.get_context("fork")
+    launched = []
+
+    class Context:
+        def Queue(self):
+            return LateQueue(fork)
+
+        def Process(self, **kwargs):
+            launched.append(kwargs["name"])
+            return fork.Process(**kwargs)
+
+    monkeypatch.setattr(app, "LeclercScraper", lambda **kwargs: ListingStub())
+    monkeypatch.setattr(app.multiprocessing, "get_context", lambda method: Context())
+    db_path = str(tmp_path / "deals.db")
+
+    result = app.sharded_pipeline(last_page=2, processes=1, shards=1, db_path=db_path)
+
+    assert launched == ["shard-0"]  # pas relancé
+    assert result["pages"] == 2 and result["failed"] == []
+    # mesures des fils enregistrées avec le run du parent
+    from utiles import DBManager
+
+    db = DBManager(db_path)
+    snapshot = json.loads(db.con.execute("SELECT metrics FROM scrape_runs").fetchone()[0])
+    db.close()
+    assert metrics.counter_total(snapshot, "scrape_items_total", stage="cards") == 4
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+import app
+from conftest import ListingSite, make_deal
+from utiles import DBManager
+
+
+def url(product):
+    return make_deal(product)["page_url"]
+
+
+@pytest.fixture
+def staged(db, monkeypatch):
+    """Lance app.staged_pipeline sur ListingSite ; renvoie (fiches demandées, tailles des lots écrits)."""
+    monkeypatch.setenv("LECLERC_DB", db.db_path)
+    batches = []
+    save_many = DBManager.save_many
+
+    def recording_save_many(self, rows):
+        batches.append(len(rows))
+        return save_many(self, rows)
+
+    monkeypatch.setattr(DBManager, "save_many", recording_save_many)
+
+    def run(site=None, **kwargs):
+        fetched = []
+        monkeypatch.setattr(app, "LeclercScraper", lambda **kw: ListingSite(fetched, **(site or {}), **kw))
+        app.staged_pipeline(collect_metrics=False, **kwargs)
+        return fetched, batches
+
+    return run
+
+
+def stored(db):
+    return dict(db.con.execute("SELECT page_url, description FROM products"))
+
+
+def test_every_card_is_written_once_in_bounded_batches(db, staged):
+    # files d'une place : la contre-pression ne doit ni bloquer ni perdre de cartes
+    fetched, batches = staged(max_pages=4, detail_workers=2, queue_size=1, batch_size=3, flush_interval=60)
+
+    expected = {url(10 * p + i) for p in range(1, 5) for i in range(2)}
+    assert sorted(fetched) == sorted(expected)
+    assert stored(db) == {u: "Fiche chargée." for u in expected}
+    assert sum(batches) == 8 and max(batches) <= 3 and len(batches) >= 3
+
+
+def test_cards_emitted_before_a_pagination_error_are_written(db, staged, capsys):
+    staged(site={"next_fails_on": 2}, max_pages=4, detail_workers=2)
+
+    assert set(stored(db)) == {url(10), url(11), url(20), url(21)}
+    assert "[ERROR] listing: TimeoutError" in capsys.readouterr().out
+
+
+def test_failed_detail_keeps_the_stored_description(db, staged):
+    db.save_many([make_deal(21, description="Description connue.")])
+
+    staged(site={"crash_on": [url(21)]}, max_pages=2, detail_workers=2)
+
+    descriptions = stored(db)
+    assert descriptions[url(21)] == "Description connue."
+    assert descriptions[url(20)] == "Fiche chargée."
+
+
+def test_writer_failure_stops_every_stage(db, staged, monkeypatch):
+    def broken_save_many(self, rows):
+        raise RuntimeError("disque plein")
+
+    monkeypatch.setattr(DBManager, "save_many", broken_save_many)
+    done = threading.Event()
+
+    def target():
+        staged(max_pages=4, detail_workers=2, queue_size=1, batch_size=1)
+        done.set()
+
+    threading.Thread(target=target, daemon=True).start()
+    assert done.wait(timeout=10), "étages encore bloqués après l'échec du writer"
@@ -0,0 +1,38 @@
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+
+import utiles
+
+MISMATCH = ("session not created: This version of ChromeDriver only supports Chrome version 114\n"
+            "Current browser version is 128.0.6613.84 with binary path /usr/bin/google-chrome")
+OTHER = ("session not created: Chrome failed to start: exited normally.\n"
+         "  (session not created: DevToolsActivePort file doesn't exist)")
+
+
+class Started(Exception):
+    """Deuxième lancement atteint : le test s'arrête là, sans vrai navigateur."""
+
+
+@pytest.mark.parametrize("message, refreshes", [(MISMATCH, [False, True]), (OTHER, [False])],
+                         ids=["version-mismatch", "other-cause"])
+def test_only_a_version_mismatch_refreshes_the_driver(monkeypatch, message, refreshes):
+    calls = []
+
+    def resolve(refresh=False):
+        calls.append(refresh)
+        return "/usr/bin/chromedriver"
+
+    def chrome(service, options):
+        if len(calls) == 1:
+            raise SessionNotCreatedException(message)
+        raise Started()
+
+    monkeypatch.setattr(utiles, "resolve_driver_path", resolve)
+    monkeypatch.setattr(utiles.webdriver, "Chrome", chrome)
+
+    expected = Started if len(refreshes) == 2 else SessionNotCreatedException
+    with pytest.raises(expected) as exc:
+        utiles.LeclercScraper(headless=True)
+    assert calls == refreshes
+    if expected is SessionNotCreatedException:
+        assert "DevToolsActivePort" in exc.value.msg  # erreur d'origine, intacte
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+from PIL import Image
+
+import thumbs
+from thumbs import THUMB_EXT, THUMB_FORMAT, THUMB_SIZE, ThumbnailCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ThumbnailCache(str(tmp_path / "thumbs"), max_bytes=10 * 1024 * 1024, timeout=5)
+    yield c
+    c.session.close()
+
+
+def test_fetch_resizes_to_card_size_and_caches(cache, static_server):
+    url = static_server + "product.jpg"
+    assert cache.get(url) is None
+
+    path = cache.fetch(url)
+
+    assert path == cache.path_for(url) and path.endswith(THUMB_EXT)
+    with Image.open(path) as img:
+        assert img.format == THUMB_FORMAT
+        assert img.width <= THUMB_SIZE[0] and img.height <= THUMB_SIZE[1]
+        assert img.size == (320, 240)  # 640x480 réduit, proportions gardées
+    assert cache.get(url) == path
+    assert cache._total == os.path.getsize(path)
+
+
+def test_transparent_png_is_stored(cache, static_server):
+    with Image.open(cache.fetch(static_server + "product_alpha.png")) as img:
+        assert img.mode in ("RGB", "RGBA")
+
+
+@pytest.mark.parametrize("name", ["not_an_image.jpg", "absente.jpg"], ids=["unreadable", "404"])
+def test_unreadable_source_gives_none_and_stores_nothing(cache, static_server, name):
+    assert cache.fetch(static_server + name) is None
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_decompression_bomb_gives_none(cache, static_server, monkeypatch):
+    # seuil abaissé : la photo de 640x480 dépasse 2 x MAX_IMAGE_PIXELS -> DecompressionBombError
+    monkeypatch.setattr(thumbs.Image, "MAX_IMAGE_PIXELS", 1000)
+    assert cache.fetch(static_server + "product.jpg") is None
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_eviction_drops_least_recently_served(cache, static_server):
+    urls = [static_server + f"product.jpg?v={i}" for i in range(3)]
+    paths = [cache.fetch(u) for u in urls]
+    size = os.path.getsize(paths[0])
+    for age, path in zip((300, 200, 100), paths):
+        os.utime(path, (0, os.path.getmtime(path) - age))
+    cache.get(urls[0])                  # servie à l'instant : redevient la plus récente
+    cache.max_bytes = int(size * 3.5)   # place pour 3 vignettes, pas 4
+
+    cache.fetch(static_server + "product.jpg?v=3")
+
+    remaining = set(os.listdir(cache.cache_dir))
+    assert os.path.basename(paths[1]) not in remaining   # la moins récemment servie
+    assert {os.path.basename(paths[0]), os.path.basename(paths[2])} <= remaining
+    assert cache._total <= cache.max_bytes
+
+
+def test_prefetch_skips_cached_and_empty_urls(cache, static_server):
+    urls = [static_server + f"product.jpg?p={i}" for i in range(5)]
+    cache.fetch(urls[0])
+    assert cache.prefetch(urls + [None, "", urls[1]], max_workers=2) == 4
+    assert cache.prefetch(urls) == 0
+
+
+def test_oversized_source_is_abandoned(cache, static_server):
+    cache.max_image_bytes = 1000  # product.jpg en fait plusieurs fois plus
+    assert cache.fetch(static_server + "product.jpg") is None
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_img_endpoint_redirects_on_miss_and_fills_in_background(db, static_server, tmp_path):
+    import front
+    from conftest import make_deal
+
+    db.save_many([make_deal(1, image_url=static_server + "product.jpg"),
+                  make_deal(2, image_url=static_server + "not_an_image.jpg")])
+    app = front.create_app(db.db_path, THUMB_DIR=str(tmp_path / "img"))
+    client = app.test_client()
+    ids = dict(db.con.execute("SELECT image_url, id FROM products"))
+    with app.app_context():
+        cache = front.thumbnail_cache()
+
+    for url in (static_server + "product.jpg", static_server + "not_an_image.jpg"):
+        miss = client.get(f"/img/{ids[url]}")
+        assert miss.status_code == 302 and miss.headers["Location"] == url
+        assert miss.headers["Cache-Control"] == "no-store"
+        cache.fetch_in_background(url).result(timeout=10)  # attend la tâche lancée par la requête
+
+    ok = client.get(f"/img/{ids[static_server + 'product.jpg']}")
+    assert ok.status_code == 200
+    assert ok.mimetype == thumbs.THUMB_MIMETYPE
+    assert "immutable" in ok.headers["Cache-Control"]
+
+    broken = client.get(f"/img/{ids[static_server + 'not_an_image.jpg']}")
+    assert broken.status_code == 302
+    assert client.get("/img/999").status_code == 404
@@ -0,0 +1,144 @@
+"""Cache disque des vignettes produit (servies par /img/<id> dans front.py).
+
+Les images distantes sont téléchargées une fois, réduites à la taille d'une
+carte (WebP si Pillow le supporte, JPEG sinon) et stockées sous un nom dérivé
+de leur URL. La taille totale du dossier est plafonnée : au-delà, les fichiers
+les moins récemment servis sont supprimés (LRU sur la date de modification,
+rafraîchie à chaque accès). Chaque source est lue en flux et abandonnée au-delà
+de `max_image_bytes`.
+
+Nécessite Pillow (`pip install pillow`).
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import requests
+from PIL import Image, features
+
+from config import DEFAULT_THUMB_DIR
+
+THUMB_SIZE = (320, 240)  # carte de la grille : 280 px de large, image en 4/3
+THUMB_FORMAT = "WEBP" if features.check("webp") else "JPEG"
+THUMB_EXT = ".webp" if THUMB_FORMAT == "WEBP" else ".jpg"
+THUMB_MIMETYPE = "image/webp" if THUMB_FORMAT == "WEBP" else "image/jpeg"
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # photo produit source ; au-delà, téléchargement abandonné
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir: str = DEFAULT_THUMB_DIR, max_bytes: int = 200 * 1024 * 1024,
+                 timeout: float = 10, session: Optional[requests.Session] = None,
+                 max_image_bytes: int = MAX_IMAGE_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_image_bytes = max_image_bytes
+        self.session = session or requests.Session()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._background: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._total = sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.is_file())
+
+    def path_for(self, image_url: str) -> str:
+        name = hashlib.sha1(image_url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + THUMB_EXT)
+
+    def get(self, image_url: str) -> Optional[str]:
+        """Chemin de la vignette si elle est en cache (et la marque comme récente)."""
+        path = self.path_for(image_url)
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            return None
+
+    def get_or_fetch(self, image_url: str) -> Optional[str]:
+        return self.get(image_url) or self.fetch(image_url)
+
+    def fetch_in_background(self, image_url: str) -> Future:
+        """Lance `fetch` sur un thread (une seule fois par URL en cours) : front.py redirige
+        vers l'original pendant que la vignette se prépare."""
+        with self._lock:
+            future = self._pending.get(image_url)
+            if future is None:
+                if self._background is None:
+                    self._background = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumb")
+                future = self._background.submit(self.fetch, image_url)
+                self._pending[image_url] = future
+                future.add_done_callback(lambda _: self._forget(image_url))
+            return future
+
+    def _forget(self, image_url: str):
+        with self._lock:
+            self._pending.pop(image_url, None)
+
+    def _download(self, image_url: str) -> Optional[bytes]:
+        """Corps de la réponse, lu par morceaux ; None si le statut n'est pas 200 ou si la
+        source dépasse `max_image_bytes` (la lecture s'arrête dès le dépassement)."""
+        with self.session.get(image_url, timeout=self.timeout, stream=True) as resp:
+            if resp.status_code != 200:
+                return None
+            buf = bytearray()
+            for chunk in resp.iter_content(64 * 1024):
+                buf += chunk
+                if len(buf) > self.max_image_bytes:
+                    return None
+            return bytes(buf)
+
+    def fetch(self, image_url: str) -> Optional[str]:
+        """Télécharge, réduit et stocke l'image ; None si elle est inaccessible, trop lourde
+        ou illisible."""
+        try:
+            data = self._download(image_url)
+            if data is None:
+                return None
+            img = Image.open(io.BytesIO(data))
+            img.thumbnail(THUMB_SIZE)
+            if img.mode not in ("RGB", "RGBA") or (THUMB_FORMAT == "JPEG" and img.mode == "RGBA"):
+                img = img.convert("RGB")
+            buf = io.BytesIO()
+            img.save(buf, THUMB_FORMAT, quality=80)
+        except (requests.RequestException, OSError, ValueError, Image.DecompressionBombError):
+            # DecompressionBombError (image aux dimensions démesurées) n'est pas une OSError
+            return None
+
+        path = self.path_for(image_url)
+        # écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(buf.getvalue())
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += buf.tell() - previous
+        self.evict()
+        return path
+
+    def evict(self):
+        """Supprime les vignettes les plus anciennes jusqu'à repasser sous 90 % du plafond."""
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_file() and e.name.endswith(THUMB_EXT)]
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            target = int(self.max_bytes * 0.9)
+            for e in entries:
+                if self._total <= target:
+                    break
+                try:
+                    size = e.stat().st_size
+                    os.remove(e.path)
+                    self._total -= size
+                except FileNotFoundError:
+                    continue
+
+    def prefetch(self, image_urls: Iterable[Optional[str]], max_workers: int = 8) -> int:
+        """Remplit le cache pour les URLs absentes, `max_workers` téléchargements au plus."""
+        todo = [u for u in dict.fromkeys(image_urls) if u and self.get(u) is None]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumb") as pool:
+            return sum(1 for path in pool.map(self.fetch, todo) if path)
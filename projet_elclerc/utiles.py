@@ -1,8 +1,15 @@
+import base64
+import json
+import os
 import sqlite3
 import time
 import re
-from datetime import datetime
-from typing import List, Dict, Optional
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -11,12 +18,86 @@ from selenium.common.exceptions import (
     NoSuchElementException,
     TimeoutException,
     ElementClickInterceptedException,
+    SessionNotCreatedException,
+    StaleElementReferenceException,
     WebDriverException,
 )
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
+import requests
+from requests.adapters import HTTPAdapter
+import lxml.html
+
+from config import DB_PATH_ENV, DEFAULT_DB_PATH, SCHEMA_VERSION, resolve_db_path  # noqa: F401 (réexportés)
+from metrics import REGISTRY
+
+# site cible ; remplacé par l'URL de fixture_site.py pour les benchmarks hors-ligne
+BASE_URL = "https://www.e.leclerc/"
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/128.0.0.0 Safari/537.36")
+
+
+# ---------- DÉMARRAGE ----------
+# chemin du chromedriver résolu par webdriver-manager, réutilisé entre les runs
+DRIVER_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "leclerc_scraper", "chromedriver.json")
+DRIVER_CACHE_MAX_AGE = timedelta(days=7)
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path(refresh: bool = False) -> str:
+    """Chemin du chromedriver : cache JSON tant que le binaire existe et que l'entrée a moins
+    de DRIVER_CACHE_MAX_AGE, sinon résolution (réseau) par webdriver-manager."""
+    with _driver_path_lock:
+        if not refresh:
+            try:
+                with open(DRIVER_CACHE_FILE, encoding="utf-8") as f:
+                    cached = json.load(f)
+                fresh = datetime.utcnow() - datetime.fromisoformat(cached["resolved_at"]) < DRIVER_CACHE_MAX_AGE
+                if fresh and os.access(cached["path"], os.X_OK):
+                    return cached["path"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        path = ChromeDriverManager().install()
+        try:
+            os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+            tmp = DRIVER_CACHE_FILE + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"path": path, "resolved_at": datetime.utcnow().isoformat()}, f)
+            os.replace(tmp, DRIVER_CACHE_FILE)
+        except OSError:
+            pass  # cache best effort : on résoudra de nouveau au prochain run
+        return path
+
+
+# chromedriver face à un Chrome mis à jour : « This version of ChromeDriver only supports
+# Chrome version 114 / Current browser version is 128... ». Seul cas où re-résoudre aide.
+_DRIVER_MISMATCH_RE = re.compile(r"only supports Chrome version|Current browser version is", re.I)
+
+
+def is_driver_version_mismatch(exc: SessionNotCreatedException) -> bool:
+    return bool(_DRIVER_MISMATCH_RE.search(exc.msg or str(exc)))
+
+
+# ---------- MODE LEAN ----------
+# Motifs Network.setBlockedURLs (CDP) par type de ressource ; les images sont aussi coupées
+# par préférence Chrome. Les attributs src/data-src restent lisibles : image_url est inchangé.
+# CDP compare l'URL entière, requête comprise, avec '*' pour seul joker : « *.jpg » seul laisse
+# passer « x.jpg?w=300 ». D'où « *.jpg?* » en plus (et pas « *.jpg* », qui couperait aussi
+# « cdn.icons.com » via « *.ico* »).
+LEAN_RESOURCE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "m3u8", "mp3"),
+}
+LEAN_RESOURCE_PATTERNS = {kind: [p for ext in exts for p in (f"*.{ext}", f"*.{ext}?*")]
+                          for kind, exts in LEAN_RESOURCE_EXTENSIONS.items()}
+LEAN_BLOCKED_RESOURCES = ("image", "font", "media")
+# traceurs / publicité tiers
+LEAN_BLOCKED_URLS = ["*/gtm.js*", "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+                     "*facebook.net*", "*criteo.com*", "*criteo.net*", "*hotjar.com*", "*contentsquare.net*"]
 
 
 # ---------- XPATHS ----------
@@ -37,6 +118,8 @@ XPATH_IMAGE_IN_CARD = ".//app-lazy-image/img"
 XPATH_PAGE_LINK_IN_CARD = ".//a[@href][1]"
 
 XPATH_NEXT_LI = "//li[contains(@class,'pagination-next')]"
+# paramètre de numéro de page de l'URL du listing (accès direct, voir goto_page)
+LISTING_PAGE_PARAM = "page"
 XPATH_NEXT_BUTTON = XPATH_NEXT_LI + "/a"
 
 # Fiche produit
@@ -44,113 +127,1126 @@ XPATH_PRODUCT_DESCRIPTION = "/html/body/main/div/div/div[3]/section[1]/div"
 XPATH_FEATURES_TBODY = "/html/body/main/div/div/div[3]/section[2]/div[1]/table/tbody"
 XPATH_CATEGORY_IN_TABLE = "/html/body/main/div/div/div[3]/section[2]/div[1]/table/tbody/tr[14]/td"  
 
+# Extraction groupée des cartes : arguments[0] = XPath des cartes, arguments[1] = XPaths relatifs.
+# `text()` imite WebElement.text (texte rendu, vide si l'élément n'est pas affiché ; l'atome
+# WebDriver remplace aussi U+00A0 par une espace, innerText non) et src/href renvoient
+# l'URL résolue comme get_attribute(), null si l'attribut est absent.
+JS_EXTRACT_CARDS = """
+const listXPath = arguments[0], rel = arguments[1];
+const first = (xp, ctx) => document.evaluate(xp, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const text = el => el ? (el.getClientRects().length ? el.innerText.replace(/\\u00a0/g, ' ') : '') : null;
+const snap = document.evaluate(listXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const out = [];
+for (let i = 0; i < snap.snapshotLength; i++) {
+  const card = snap.snapshotItem(i);
+  const img = first(rel.img, card), link = first(rel.link, card);
+  out.push({
+    name: text(first(rel.name, card)),
+    sold_by: text(first(rel.sold_by, card)),
+    sold_by_block: text(first(rel.sold_by_block, card)),
+    promo: text(first(rel.promo, card)),
+    price_int: text(first(rel.price_int, card)),
+    price_cents: text(first(rel.price_cents, card)),
+    has_img: !!img,
+    img_data_src: img ? img.getAttribute('data-src') : null,
+    img_src: img && img.hasAttribute('src') ? img.src : null,
+    href: link && link.hasAttribute('href') ? link.href : null,
+  });
+}
+return out;
+"""
+
+
+# ---------- API JSON DU LISTING ----------
+# réponses XHR retenues dans les logs réseau (mode capture_api), filtrées par URL
+LISTING_API_PATTERN = r"/api/[^?]*(bons-plans|search|product|offer)"
+
+_API_NAME_KEYS = ("label", "name", "title", "productName", "product_name")
+_API_PRICE_KEYS = ("price", "sellingPrice", "currentPrice", "finalPrice", "price_eur")
+_API_PROMO_KEYS = ("promotion", "promo", "discount", "discountLabel", "discount_text")
+_API_SELLER_KEYS = ("seller", "sellerName", "soldBy", "vendor", "sold_by")
+_API_URL_KEYS = ("url", "link", "href", "productUrl", "page_url")
+_API_IMAGE_KEYS = ("image", "imageUrl", "images", "media", "picture", "image_url")
+
+
+def _api_first(item: Dict, keys: Tuple[str, ...]):
+    for key in keys:
+        if item.get(key) not in (None, "", [], {}):
+            return item[key]
+    return None
+
+
+def _api_text(value) -> Optional[str]:
+    """Chaîne, ou objet {label|name|text|value|url: ...}, ou première entrée d'une liste."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = _api_first(value, ("label", "name", "text", "value", "url", "src"))
+    if value is None:
+        return None
+    return " ".join(str(value).split()) or None
+
+
+def _api_price(value) -> Optional[float]:
+    """Nombre, "1 064,08 €", ou objet {value|amount|price: ...} ; centimes entiers via `cents`."""
+    if isinstance(value, dict):
+        if isinstance(value.get("cents"), int):
+            return value["cents"] / 100
+        value = _api_first(value, ("value", "amount", "price", "current"))
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    txt = re.sub(r"[^\d,.]", "", str(value))
+    if "," in txt:  # format français : "1.064,08" -> "1064.08"
+        txt = txt.replace(".", "").replace(",", ".")
+    try:
+        return float(txt) if txt else None
+    except ValueError:
+        return None
+
+
+def _api_is_product(item: Dict) -> bool:
+    """Un nom ET un prix ou un lien : écarte les listes de filtres / facettes ({label, count})."""
+    return bool(_api_first(item, _API_NAME_KEYS)
+                and (_api_first(item, _API_PRICE_KEYS) is not None or _api_first(item, _API_URL_KEYS)))
+
+
+def _api_product_list(payload, depth: int = 0) -> Optional[List[Dict]]:
+    """Première liste d'objets produits, où qu'elle soit dans la réponse."""
+    if depth > 4:
+        return None
+    if isinstance(payload, list):
+        if payload and all(isinstance(x, dict) for x in payload) and any(_api_is_product(x) for x in payload):
+            return payload
+        children = payload
+    elif isinstance(payload, dict):
+        children = payload.values()
+    else:
+        return None
+    for child in children:
+        found = _api_product_list(child, depth + 1)
+        if found is not None:
+            return found
+    return None
+
+
+def api_card_matches(api_deal: Dict, dom_deal: Dict) -> bool:
+    """Même carte lue dans le JSON capturé et dans le DOM (nom et prix) : contrôle de la
+    correspondance des clés devinées par `map_api_products` avec l'API réelle."""
+    def name(d):
+        return " ".join((d.get("product_name") or "").split()).casefold()
+
+    api_price, dom_price = api_deal.get("price_eur"), dom_deal.get("price_eur")
+    return (bool(name(api_deal)) and name(api_deal) == name(dom_deal)
+            and api_price is not None and dom_price is not None and abs(api_price - dom_price) < 0.005)
+
+
+def map_api_products(payload, base_url: str) -> List[Dict]:
+    """Réponse JSON du listing -> dicts au format de `_extract_card_data` (clés absentes = None)."""
+    items = _api_product_list(payload) or []
+    deals = []
+    for item in items:
+        url = _api_text(_api_first(item, _API_URL_KEYS))
+        image = _api_text(_api_first(item, _API_IMAGE_KEYS))
+        deals.append({
+            "sold_by": _api_text(_api_first(item, _API_SELLER_KEYS)),
+            "product_name": _api_text(_api_first(item, _API_NAME_KEYS)),
+            "discount_text": _api_text(_api_first(item, _API_PROMO_KEYS)),
+            "price_eur": _api_price(_api_first(item, _API_PRICE_KEYS)),
+            "page_url": urljoin(base_url, url) if url else None,
+            "image_url": urljoin(base_url, image) if image else None,
+            "description": None,
+            "features": None,
+            "category": None,
+        })
+    return deals
+
+
+# ---------- PRIX / PROMOS ----------
+# "1 064 €" : \s couvre aussi les espaces insécables (U+00A0, U+202F) des prix affichés
+_PRICE_NOISE_RE = re.compile(r"[€\s]")
+_PROMO_PCT_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*%")
+# "-1 064 €" : chiffres groupés par milliers (espace, U+00A0 ou U+202F) comme dans _parse_price
+_PROMO_EUR_RE = re.compile(r"(\d{1,3}(?:\s\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?)\s*€")
+
+
+def parse_discount(discount_text: Optional[str], price_eur: Optional[float]) -> Dict[str, Optional[float]]:
+    """Promo texte -> colonnes structurées de products.
+
+    promo_kind : « % » d'abord, puis « € » (mêmes règles que isPercent / isEuro côté front) ;
+    c'est la seule source du type de promo, facettes comprises.
+    `price_eur` est le prix remisé affiché : le prix d'origine et la remise dans
+    l'autre unité en sont déduits (None si la promo n'a pas de montant lisible).
+    """
+    out = {"promo_kind": "none", "discount_pct": None, "discount_eur": None, "original_price_eur": None}
+    if not discount_text:
+        return out
+    pct = _PROMO_PCT_RE.search(discount_text) if "%" in discount_text else None
+    eur = _PROMO_EUR_RE.search(discount_text) if "€" in discount_text and pct is None else None
+    out["promo_kind"] = "percent" if "%" in discount_text else "euro" if "€" in discount_text else "other"
+    if pct:
+        value = float(pct.group(1).replace(",", "."))
+        if not 0 < value < 100:
+            return out
+        out["discount_pct"] = value
+        if price_eur is not None:
+            original = price_eur / (1 - value / 100)
+            out["original_price_eur"] = round(original, 2)
+            out["discount_eur"] = round(original - price_eur, 2)
+    elif eur:
+        value = float(_PRICE_NOISE_RE.sub("", eur.group(1)).replace(",", "."))
+        out["discount_eur"] = value
+        if price_eur is not None and value > 0:
+            original = price_eur + value
+            out["original_price_eur"] = round(original, 2)
+            out["discount_pct"] = round(value / original * 100, 1)
+    return out
+
+
+# ---------- CARACTÉRISTIQUES ----------
+def format_features(pairs: List[Tuple[str, str]]) -> Optional[str]:
+    """Forme texte historique de la colonne `features` : 'Label: Valeur | ...'."""
+    parts = [f"{key}: {val}".strip(": ").strip() for key, val in pairs if key or val]
+    return " | ".join(parts) if parts else None
+
+
+def feature_rows(pairs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Paires stockées dans product_features : libellé non vide, premier libellé gagnant."""
+    seen, rows = set(), []
+    for key, val in pairs:
+        if key and key not in seen:
+            seen.add(key)
+            rows.append((key, val))
+    return rows
+
+
+def split_features(text: Optional[str]) -> List[Tuple[str, str]]:
+    """Inverse de `format_features` (lignes déjà en base ou fiches relues depuis le cache)."""
+    if not text:
+        return []
+    pairs = []
+    for part in text.split(" | "):
+        key, sep, val = part.partition(": ")
+        if sep:
+            pairs.append((key.strip(), val.strip()))
+    return feature_rows(pairs)
+
 
 # ---------- DB ----------
+DEAL_COLUMNS = ("sold_by", "product_name", "discount_text", "price_eur", "page_url", "image_url",
+                "description", "features", "category", "scraped_at")
+
+# products : un produit par page_url, texte statique + dernier prix connu (tri/filtre indexés).
+# price_observations : historique compact, une ligne par passage du scraper.
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        page_url TEXT UNIQUE,
+        sold_by TEXT,
+        product_name TEXT,
+        image_url TEXT,
+        description TEXT,
+        features TEXT,
+        category TEXT,
+        discount_text TEXT,
+        price_eur REAL,
+        first_seen TEXT,
+        scraped_at TEXT,
+        details_fetched_at TEXT,
+        promo_kind TEXT,
+        discount_pct REAL,
+        discount_eur REAL,
+        original_price_eur REAL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS price_observations (
+        id INTEGER PRIMARY KEY,
+        product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        price_eur REAL,
+        discount_text TEXT,
+        observed_at TEXT NOT NULL
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_obs_product_time ON price_observations (product_id, observed_at);",
+    # caractéristiques structurées (une ligne par libellé du tableau de la fiche). Pas d'index
+    # (key, value) : ses insertions dispersées réécrivaient la moitié des pages du WAL à chaque
+    # lot ; le filtre feature= passe par deals_fts puis la clé primaire (cf. front._deal_filters)
+    """
+    CREATE TABLE IF NOT EXISTS product_features (
+        product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+        key TEXT NOT NULL,
+        value TEXT,
+        PRIMARY KEY (product_id, key)
+    ) WITHOUT ROWID;
+    """,
+    # pagination par curseur de /api/deals : une expression = un tri de front.py
+    "CREATE INDEX IF NOT EXISTS idx_products_price ON products (COALESCE(price_eur, 999999), id);",
+    "CREATE INDEX IF NOT EXISTS idx_products_recent ON products (COALESCE(scraped_at, ''), id);",
+    "CREATE INDEX IF NOT EXISTS idx_products_category ON products (category, COALESCE(price_eur, 999999), id);",
+    "CREATE INDEX IF NOT EXISTS idx_products_sold_by ON products (sold_by COLLATE NOCASE);",
+    # sort=discount (meilleures remises d'abord), seul ou avec le filtre promo
+    "CREATE INDEX IF NOT EXISTS idx_products_discount ON products (COALESCE(discount_pct, -1), id);",
+    "CREATE INDEX IF NOT EXISTS idx_products_promo_discount ON products (promo_kind, COALESCE(discount_pct, -1), id);",
+    # un run du scraper : instantané JSON des compteurs / histogrammes de metrics.REGISTRY
+    """
+    CREATE TABLE IF NOT EXISTS scrape_runs (
+        id INTEGER PRIMARY KEY,
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        status TEXT,
+        pages INTEGER,
+        saved INTEGER,
+        rejected INTEGER,
+        metrics TEXT
+    );
+    """,
+    # crawl en cours (reprise avec app.py --resume) : dernière page listing traitée,
+    # signature de cette page (cf. go_next_page) et cartes en attente de leur fiche
+    """
+    CREATE TABLE IF NOT EXISTS crawl_runs (
+        id INTEGER PRIMARY KEY,
+        started_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'running',
+        last_page INTEGER NOT NULL DEFAULT 0,
+        listing_url TEXT,
+        listing_signature TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS crawl_pending (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER NOT NULL REFERENCES crawl_runs(id) ON DELETE CASCADE,
+        page_no INTEGER NOT NULL,
+        page_url TEXT,
+        card TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        not_before TEXT
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_crawl_pending_run ON crawl_pending (run_id, id);",
+    # vue de compatibilité : mêmes colonnes que l'ancienne table (front.py, export.py)
+    """
+    CREATE VIEW IF NOT EXISTS leclerc_deals AS
+    SELECT id, sold_by, product_name, discount_text, price_eur, page_url, image_url,
+           description, features, category, scraped_at,
+           promo_kind, discount_pct, discount_eur, original_price_eur
+    FROM products;
+    """,
+]
+
+SQL_UPSERT_PRODUCT = """
+    INSERT INTO products (page_url, sold_by, product_name, image_url, description, features,
+                          category, discount_text, price_eur, first_seen, scraped_at, details_fetched_at,
+                          promo_kind, discount_pct, discount_eur, original_price_eur)
+    VALUES (:page_url, :sold_by, :product_name, :image_url, :description, :features,
+            :category, :discount_text, :price_eur, :observed_at, :observed_at, :details_fetched_at,
+            :promo_kind, :discount_pct, :discount_eur, :original_price_eur)
+    ON CONFLICT(page_url) DO UPDATE SET
+        sold_by = excluded.sold_by, product_name = excluded.product_name,
+        image_url = excluded.image_url,
+        description = CASE WHEN :details_missing THEN description ELSE excluded.description END,
+        features = CASE WHEN :details_missing THEN features ELSE excluded.features END,
+        category = CASE WHEN :details_missing THEN category ELSE excluded.category END,
+        discount_text = excluded.discount_text, price_eur = excluded.price_eur,
+        scraped_at = excluded.scraped_at,
+        details_fetched_at = COALESCE(excluded.details_fetched_at, details_fetched_at),
+        promo_kind = excluded.promo_kind,
+        discount_pct = excluded.discount_pct, discount_eur = excluded.discount_eur,
+        original_price_eur = excluded.original_price_eur
+"""
+
+SQL_INSERT_FEATURE = "INSERT INTO product_features (product_id, key, value) VALUES (?, ?, ?)"
+SQL_FTS_INSERT = "INSERT INTO deals_fts (rowid, product_name, description, features) VALUES (?, ?, ?, ?)"
+SQL_FTS_DELETE = ("INSERT INTO deals_fts (deals_fts, rowid, product_name, description, features) "
+                  "VALUES ('delete', ?, ?, ?, ?)")
+SQL_FACET_DELTA = ("INSERT INTO facet_counts (facet, value, n) VALUES (?, ?, ?) "
+                   "ON CONFLICT (facet, value) DO UPDATE SET n = n + excluded.n")
+
+# anciens triggers de synchronisation (schéma 1) : une écriture par ligne de product_features
+# et un vidage FTS5 par instruction ; DBManager tient désormais ces tables par lot
+LEGACY_TRIGGERS = ("deals_fts_ai", "deals_fts_ad", "deals_fts_au", "facets_ai", "facets_ad", "facets_au",
+                   "facets_features_ai", "facets_features_ad")
+
+# facette -> expression SQL de la valeur sur une ligne de products (agrégation initiale) ;
+# _product_facets en est l'équivalent Python pour les deltas de save_many
+PRODUCT_FACETS = {
+    "category": "COALESCE(category, 'Autre')",
+    "seller": "COALESCE(sold_by, '')",
+    "promo": "promo_kind",  # calculé à l'écriture par parse_discount
+}
+
+
+def _product_facets(product: Dict) -> List[Tuple[str, str]]:
+    """(facette, valeur) d'un produit, mêmes règles que PRODUCT_FACETS."""
+    category, sold_by = product["category"], product["sold_by"]
+    return [("category", "Autre" if category is None else category),
+            ("seller", "" if sold_by is None else sold_by),
+            ("promo", product["promo_kind"])]
+
+
+SQL_INSERT_OBSERVATION_BY_ID = """
+    INSERT INTO price_observations (product_id, price_eur, discount_text, observed_at)
+    VALUES (:product_id, :price_eur, :discount_text, :observed_at)
+"""
+
+
+STORED_PRODUCT_KEYS = ("id", "product_name", "description", "features", "category", "sold_by", "promo_kind")
+FTS_KEYS = ("product_name", "description", "features")
+
+
+def _product_state(row: Dict, prev: Optional[Dict]) -> Dict:
+    """Produit après l'upsert de `row` sur `prev` (état en base, None si nouveau).
+
+    Fiche manquante : description / caractéristiques / catégorie restent celles de
+    `prev`, comme dans SQL_UPSERT_PRODUCT. "features_from" : deal dont viennent les
+    caractéristiques (None = product_features inchangé).
+    """
+    keep = prev is not None and row["details_missing"]
+    state = {
+        "id": prev["id"] if prev is not None else None,
+        "product_name": row["product_name"], "sold_by": row["sold_by"], "promo_kind": row["promo_kind"],
+        "features_from": prev.get("features_from") if keep else row,
+    }
+    for key in ("description", "features", "category"):
+        state[key] = prev[key] if keep else row[key]
+    return state
+
+
 class DBManager:
-    def __init__(self, db_path: str = "leclerc_deals.db"):
+    """Écrivain SQLite : connexion unique en WAL, upserts par lots.
+
+    En WAL, les lectures de `front.py` ne bloquent pas l'écriture et inversement.
+    La connexion est partagée entre threads et protégée par un verrou.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 500):
+        db_path = resolve_db_path(db_path)
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.rejected = 0        # total des lignes refusées depuis l'ouverture
+        self.last_rejected = 0   # lignes refusées au dernier save_many
+        self._lock = threading.Lock()
+        self.con = sqlite3.connect(db_path, check_same_thread=False)
+        self._configure()
         self._init_db()
 
+    def _configure(self):
+        self.con.execute("PRAGMA journal_mode=WAL;")
+        self.con.execute("PRAGMA synchronous=NORMAL;")   # sûr en WAL, fsync seulement aux checkpoints
+        self.con.execute("PRAGMA busy_timeout=5000;")
+        self.con.execute("PRAGMA temp_store=MEMORY;")
+        self.con.execute("PRAGMA cache_size=-20000;")    # ~20 Mo
+        self.con.execute("PRAGMA foreign_keys=ON;")
+
     def _init_db(self):
-        con = sqlite3.connect(self.db_path)
-        cur = con.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS leclerc_deals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sold_by TEXT,
-                product_name TEXT,
-                discount_text TEXT,
-                price_eur REAL,
-                page_url TEXT,
-                image_url TEXT,
-                description TEXT,
-                features TEXT,
-                category TEXT,
-                scraped_at TEXT
+        # base déjà au schéma courant (shards, lecteurs, réouvertures) : ni verrou
+        # d'écriture ni DDL, les requêtes préparées des autres connexions restent valides
+        if self._schema_version() == SCHEMA_VERSION:
+            return
+        with self.con:
+            self.con.execute("BEGIN IMMEDIATE;")  # DDL + migration atomiques
+            if self._schema_version() == SCHEMA_VERSION:
+                return  # migrée par un autre processus pendant l'attente du verrou
+            legacy = self.con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='leclerc_deals'"
+            ).fetchone()
+            if legacy:
+                self._migrate_from_flat_table()
+            # details_fetched_at NULL pour les lignes existantes : scraped_at a pu avancer sans
+            # nouvelle visite de la fiche, elles seront rechargées une fois
+            self._add_missing_columns("products", {"promo_kind": "TEXT", "discount_pct": "REAL",
+                                                   "discount_eur": "REAL", "original_price_eur": "REAL",
+                                                   "details_fetched_at": "TEXT"})
+            self.con.execute("DROP VIEW IF EXISTS leclerc_deals;")  # recréée avec les colonnes promo
+            for trigger in LEGACY_TRIGGERS:
+                self.con.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+            self.con.execute("DROP INDEX IF EXISTS idx_features_key_value;")
+            for ddl in SCHEMA:
+                self.con.execute(ddl)
+            self._add_missing_columns("crawl_pending", {"attempts": "INTEGER NOT NULL DEFAULT 0",
+                                                        "not_before": "TEXT"})
+            # schéma < 4 : remises en euros groupées par milliers lues à tort ("1 064 €" -> 64)
+            self._backfill_discounts("promo_kind IS NULL OR instr(discount_text, '€') > 0")
+            self._init_fts()
+            self._init_facets()
+            self.con.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+
+    def _schema_version(self) -> int:
+        return self.con.execute("PRAGMA user_version;").fetchone()[0]
+
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """Colonnes ajoutées après la création d'une table (bases existantes)."""
+        present = {row[1] for row in self.con.execute(f"PRAGMA table_info({table})")}
+        if not present:
+            return  # table pas encore créée : le CREATE de SCHEMA a déjà toutes les colonnes
+        for name, decl in columns.items():
+            if name not in present:
+                self.con.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+    def _backfill_discounts(self, where: str = "promo_kind IS NULL"):
+        """Colonnes promo recalculées par parse_discount pour les lignes `where`, en une passe
+        (lignes écrites avant l'ajout des colonnes, migrées, ou lues par un ancien parseur)."""
+        rows = self.con.execute(
+            f"SELECT id, discount_text, price_eur FROM products WHERE {where}").fetchall()
+        if not rows:
+            return
+        self.con.executemany("""
+            UPDATE products SET promo_kind = :promo_kind, discount_pct = :discount_pct,
+                                discount_eur = :discount_eur, original_price_eur = :original_price_eur
+            WHERE id = :id
+        """, ({"id": pid, **parse_discount(text, price)} for pid, text, price in rows))
+
+    def _migrate_from_flat_table(self):
+        """Ancienne table plate leclerc_deals -> products + price_observations.
+
+        Chaque URL garde l'id de sa ligne la plus récente (curseurs et liens
+        existants restent valides) ; toutes les lignes deviennent des observations.
+        """
+        for trigger in LEGACY_TRIGGERS[:3]:
+            self.con.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+        self.con.execute("DROP TABLE IF EXISTS deals_fts;")
+        for ddl in SCHEMA[:2]:
+            self.con.execute(ddl)
+        self.con.execute("""
+            INSERT INTO products (id, page_url, sold_by, product_name, image_url, description, features,
+                                  category, discount_text, price_eur, first_seen, scraped_at)
+            SELECT d.id, d.page_url, d.sold_by, d.product_name, d.image_url, d.description, d.features,
+                   d.category, d.discount_text, d.price_eur, f.first_seen, d.scraped_at
+            FROM leclerc_deals d
+            JOIN (SELECT MAX(id) AS last_id, MIN(scraped_at) AS first_seen
+                  FROM leclerc_deals WHERE page_url IS NOT NULL GROUP BY page_url) f ON d.id = f.last_id
+            UNION ALL
+            SELECT id, page_url, sold_by, product_name, image_url, description, features,
+                   category, discount_text, price_eur, scraped_at, scraped_at
+            FROM leclerc_deals WHERE page_url IS NULL;
+        """)
+        self.con.execute("""
+            INSERT INTO price_observations (product_id, price_eur, discount_text, observed_at)
+            SELECT COALESCE(p.id, d.id), d.price_eur, d.discount_text, COALESCE(d.scraped_at, '')
+            FROM leclerc_deals d LEFT JOIN products p ON p.page_url = d.page_url
+            ORDER BY d.id;
+        """)
+        self.con.execute("DROP TABLE leclerc_deals;")
+
+    def _init_fts(self):
+        """Index plein texte (FTS5) sur nom / description / caractéristiques.
+
+        Table à contenu externe tenue à jour par `_write_rows`, par lot ;
+        `remove_diacritics 2` rend la recherche insensible aux accents (é/è/ç).
+        """
+        exists = self.con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='deals_fts'"
+        ).fetchone()
+        if exists:
+            return
+        self.con.execute("""
+            CREATE VIRTUAL TABLE deals_fts USING fts5(
+                product_name, description, features,
+                content='products', content_rowid='id',
+                tokenize="unicode61 remove_diacritics 2"
             );
         """)
-        con.commit()
-        con.close()
+        # lignes déjà présentes
+        self.con.execute("INSERT INTO deals_fts (deals_fts) VALUES ('rebuild');")
+
+    def _init_facets(self):
+        """Compteurs de facettes (catégorie, vendeur, type de promo, libellés de caractéristiques).
+
+        Construits ici par agrégation (création, ou passage du schéma 1 dont les triggers
+        viennent d'être supprimés), puis tenus à jour par `_write_rows` dans la transaction
+        de chaque lot : /api/facets ne ré-agrège jamais la base.
+        """
+        # produits antérieurs à product_features : paires relues depuis le texte
+        if not self.con.execute("SELECT 1 FROM product_features LIMIT 1").fetchone():
+            for product_id, features in self.con.execute(
+                "SELECT id, features FROM products WHERE features IS NOT NULL"
+            ).fetchall():
+                self.con.executemany(
+                    SQL_INSERT_FEATURE, [(product_id, k, v) for k, v in split_features(features)])
+
+        self.con.execute("DROP TABLE IF EXISTS facet_counts;")
+        self.con.execute("""
+            CREATE TABLE facet_counts (
+                facet TEXT NOT NULL,
+                value TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (facet, value)
+            ) WITHOUT ROWID;
+        """)
+        for facet, expr in PRODUCT_FACETS.items():
+            self.con.execute(f"""
+                INSERT INTO facet_counts (facet, value, n)
+                SELECT '{facet}', {expr}, COUNT(*) FROM products GROUP BY 2;
+            """)
+        self.con.execute("""
+            INSERT INTO facet_counts (facet, value, n)
+            SELECT 'feature_key', key, COUNT(*) FROM product_features GROUP BY key;
+        """)
+
+    def get_fresh_details(self, page_urls: List[str], ttl_hours: float) -> Dict[str, Dict[str, Optional[str]]]:
+        """Détails stockés des URLs dont la fiche a été chargée il y a moins de `ttl_hours`.
+
+        L'âge est celui de details_fetched_at, que les réécritures depuis ce cache ne
+        rajeunissent pas (scraped_at, lui, avance à chaque passage). Une ligne sans
+        aucun détail (fiche en échec la dernière fois) n'est pas considérée comme fraîche.
+        """
+        urls = list({u for u in page_urls if u})
+        if not urls:
+            return {}
+        cutoff = (datetime.utcnow() - timedelta(hours=ttl_hours)).isoformat()
+        found = {}
+        with self._lock:
+            for i in range(0, len(urls), 900):  # limite des paramètres SQLite
+                chunk = urls[i:i + 900]
+                marks = ",".join("?" * len(chunk))
+                rows = self.con.execute(f"""
+                    SELECT page_url, description, features, category
+                    FROM products
+                    WHERE page_url IN ({marks}) AND details_fetched_at >= ?
+                """, (*chunk, cutoff)).fetchall()
+                for url, description, features, category in rows:
+                    if description is None and features is None and category is None:
+                        continue
+                    found[url] = {"description": description, "features": features, "category": category}
+        return found
+
+    def save_many(self, deals: List[Dict]) -> int:
+        """Upsert des produits + une observation de prix par deal, par lots de `batch_size`.
 
-    def save_many(self, deals: List[Dict]):
-        con = sqlite3.connect(self.db_path)
-        cur = con.cursor()
+        Une transaction par lot. Retourne le nombre de deals écrits ; ceux refusés
+        par SQLite sont comptés dans `last_rejected` / `rejected` au lieu d'être
+        ignorés en silence.
+        """
+        now = datetime.utcnow().isoformat()
+        rows = []
         for d in deals:
-            try:
-                cur.execute("""
-                    INSERT INTO leclerc_deals
-                    (sold_by, product_name, discount_text, price_eur, page_url, image_url,
-                     description, features, category, scraped_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    d.get("sold_by"),
-                    d.get("product_name"),
-                    d.get("discount_text"),
-                    d.get("price_eur"),
-                    d.get("page_url"),
-                    d.get("image_url"),
-                    d.get("description"),
-                    d.get("features"),
-                    d.get("category"),
-                    d.get("scraped_at"),
-                ))
-            except sqlite3.DatabaseError:
-                continue
-        con.commit()
-        con.close()
+            row = {c: d.get(c) for c in DEAL_COLUMNS}
+            row["observed_at"] = row["scraped_at"] or now
+            row.update(parse_discount(row["discount_text"], row["price_eur"]))
+            # fiche non chargée (échec définitif) : prix et listing à jour, détails conservés
+            row["details_missing"] = bool(d.get("details_missing"))
+            # détails relus depuis la base (crawl incrémental) : leur date de chargement reste
+            fetched = not (row["details_missing"] or d.get("details_cached"))
+            row["details_fetched_at"] = row["observed_at"] if fetched else None
+            row["features_kv"] = d.get("features_kv")  # None : relues depuis le texte si besoin
+            rows.append(row)
+        saved = rejected = 0
+        with self._lock, REGISTRY.timer("scrape_stage_seconds", stage="save_many"):
+            for i in range(0, len(rows), self.batch_size):
+                batch = rows[i:i + self.batch_size]
+                try:
+                    with self.con:
+                        self._write_rows(batch)
+                    saved += len(batch)
+                except sqlite3.DatabaseError:
+                    # lot annulé : on rejoue ligne par ligne pour isoler les fautives
+                    ok, ko = self._save_rows_one_by_one(batch)
+                    saved += ok
+                    rejected += ko
+        self.last_rejected = rejected
+        self.rejected += rejected
+        REGISTRY.inc("scrape_items_total", saved, stage="rows_saved")
+        REGISTRY.inc("scrape_items_total", rejected, stage="rows_rejected")
+        return saved
+
+    def _stored_products(self, page_urls: List[str]) -> Dict[str, Dict]:
+        """État en base (id, texte indexé, facettes) des URLs d'un lot ; absentes = produits nouveaux."""
+        stored = {}
+        for i in range(0, len(page_urls), 900):  # limite des paramètres SQLite
+            chunk = page_urls[i:i + 900]
+            marks = ",".join("?" * len(chunk))
+            for row in self.con.execute(f"""
+                SELECT page_url, id, product_name, description, features, category, sold_by, promo_kind
+                FROM products WHERE page_url IN ({marks})
+            """, chunk):
+                stored[row[0]] = dict(zip(STORED_PRODUCT_KEYS, row[1:]))
+        return stored
+
+    def _write_rows(self, rows: List[Dict]):
+        """Un lot : upserts + observations, puis FTS, product_features et facet_counts.
+
+        Les tables dérivées sont tenues ici plutôt que par triggers : l'état avant / après
+        du lot est calculé en Python et chacune reçoit un seul executemany. Seuls les
+        produits nouveaux ou dont le texte a changé touchent FTS et product_features.
+        """
+        with_url = [r for r in rows if r["page_url"]]
+        stored = self._stored_products(list({r["page_url"] for r in with_url}))
+        # état final de chaque URL, même règle que SQL_UPSERT_PRODUCT (une URL peut revenir
+        # plusieurs fois dans un lot) ; "kv" : paires à écrire si les caractéristiques changent
+        after = {}
+        for r in with_url:
+            prev = after.get(r["page_url"]) or stored.get(r["page_url"])
+            after[r["page_url"]] = _product_state(r, prev)
+        self.con.executemany(SQL_UPSERT_PRODUCT, with_url)
+        new_urls = [url for url in after if url not in stored]
+        for url, product_id in self._product_ids(new_urls):
+            after[url]["id"] = product_id
+        self.con.executemany(SQL_INSERT_OBSERVATION_BY_ID,
+                             [{**r, "product_id": after[r["page_url"]]["id"]} for r in with_url])
+        changes = [(stored.get(url), p) for url, p in after.items()]
+        # sans URL, pas de clé de rapprochement : un produit par deal
+        for r in rows:
+            if not r["page_url"]:
+                cur = self.con.execute(SQL_UPSERT_PRODUCT, r)
+                self.con.execute(SQL_INSERT_OBSERVATION_BY_ID, {**r, "product_id": cur.lastrowid})
+                changes.append((None, {**_product_state(r, None), "id": cur.lastrowid}))
+        self._write_derived(changes)
+
+    def _product_ids(self, page_urls: List[str]) -> List[Tuple[str, int]]:
+        ids = []
+        for i in range(0, len(page_urls), 900):  # limite des paramètres SQLite
+            chunk = page_urls[i:i + 900]
+            marks = ",".join("?" * len(chunk))
+            ids += self.con.execute(f"SELECT page_url, id FROM products WHERE page_url IN ({marks})", chunk)
+        return ids
+
+    def _write_derived(self, changes: List[Tuple[Optional[Dict], Dict]]):
+        """(avant, après) par produit -> deals_fts, product_features et facet_counts."""
+        fts_delete, fts_insert, features, replaced = [], [], [], []
+        facets: Dict[Tuple[str, str], int] = {}
+        for old, new in changes:
+            if old is None or any(old[k] != new[k] for k in FTS_KEYS):
+                if old is not None:
+                    fts_delete.append((old["id"], *(old[k] for k in FTS_KEYS)))
+                fts_insert.append((new["id"], *(new[k] for k in FTS_KEYS)))
+            source = new["features_from"]
+            if source is not None and (old is None or old["features"] != new["features"]):
+                if old is not None:
+                    replaced.append(new["id"])
+                # paires du deal si l'extracteur les fournit, sinon relues depuis le texte
+                kv = source["features_kv"]
+                pairs = feature_rows(kv) if kv is not None else split_features(source["features"])
+                features += [(new["id"], k, v) for k, v in pairs]
+                for k, _ in pairs:
+                    facets[("feature_key", k)] = facets.get(("feature_key", k), 0) + 1
+            old_facets = _product_facets(old) if old is not None else []
+            new_facets = _product_facets(new)
+            if old_facets != new_facets:
+                for key in old_facets:
+                    facets[key] = facets.get(key, 0) - 1
+                for key in new_facets:
+                    facets[key] = facets.get(key, 0) + 1
+        for i in range(0, len(replaced), 900):  # limite des paramètres SQLite
+            chunk = replaced[i:i + 900]
+            marks = ",".join("?" * len(chunk))
+            for (key,) in self.con.execute(
+                    f"SELECT key FROM product_features WHERE product_id IN ({marks})", chunk):
+                facets[("feature_key", key)] = facets.get(("feature_key", key), 0) - 1
+            self.con.execute(f"DELETE FROM product_features WHERE product_id IN ({marks})", chunk)
+        self.con.executemany(SQL_FTS_DELETE, fts_delete)
+        self.con.executemany(SQL_FTS_INSERT, fts_insert)
+        self.con.executemany(SQL_INSERT_FEATURE, features)
+        self.con.executemany(SQL_FACET_DELTA, [(f, v, n) for (f, v), n in facets.items() if n])
+
+    def _save_rows_one_by_one(self, rows: List[Dict]):
+        ok = ko = 0
+        with self.con:
+            for row in rows:
+                self.con.execute("SAVEPOINT deal;")
+                try:
+                    self._write_rows([row])
+                    ok += 1
+                except sqlite3.DatabaseError:
+                    self.con.execute("ROLLBACK TO deal;")
+                    ko += 1
+                self.con.execute("RELEASE deal;")
+        return ok, ko
+
+    def record_run(self, started_at: str, status: str, pages: int, saved: int, metrics: Dict) -> int:
+        """Trace un run dans scrape_runs (lu par /metrics de front.py) ; retourne son id."""
+        with self._lock, self.con:
+            cur = self.con.execute("""
+                INSERT INTO scrape_runs (started_at, finished_at, status, pages, saved, rejected, metrics)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (started_at, datetime.utcnow().isoformat(), status, pages, saved, self.rejected,
+                  json.dumps(metrics)))
+            return cur.lastrowid
+
+    # --- état de crawl (reprise) ---
+    def start_crawl(self, listing_url: Optional[str] = None) -> int:
+        """Ouvre un crawl ; les crawls inachevés précédents sont abandonnés (file vidée)."""
+        now = datetime.utcnow().isoformat()
+        with self._lock, self.con:
+            stale = "SELECT id FROM crawl_runs WHERE status != 'done'"
+            self.con.execute(f"DELETE FROM crawl_pending WHERE run_id IN ({stale})")
+            self.con.execute("UPDATE crawl_runs SET status = 'abandoned', updated_at = ? WHERE status != 'done'",
+                             (now,))
+            cur = self.con.execute(
+                "INSERT INTO crawl_runs (started_at, updated_at, listing_url) VALUES (?, ?, ?)",
+                (now, now, listing_url))
+            return cur.lastrowid
+
+    def unfinished_crawl(self) -> Optional[Dict]:
+        """Dernier crawl interrompu (statut running / failed), ou None."""
+        with self._lock:
+            row = self.con.execute("""
+                SELECT id, started_at, last_page, listing_url, listing_signature,
+                       (SELECT COUNT(*) FROM crawl_pending p WHERE p.run_id = r.id)
+                FROM crawl_runs r
+                WHERE status IN ('running', 'failed')
+                ORDER BY id DESC LIMIT 1
+            """).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "started_at", "last_page", "listing_url", "listing_signature", "pending")
+        return dict(zip(keys, row))
+
+    def checkpoint_page(self, run_id: int, page_no: int, cards: List[Dict],
+                        signature: Optional[str], listing_url: Optional[str]):
+        """Page listing `page_no` traitée : ses cartes passent dans la file d'attente des
+        fiches et la page devient le point de reprise, dans la même transaction."""
+        with self._lock, self.con:
+            self.con.executemany(
+                "INSERT INTO crawl_pending (run_id, page_no, page_url, card) VALUES (?, ?, ?, ?)",
+                [(run_id, page_no, c.get("page_url"), json.dumps(c)) for c in cards])
+            self.con.execute("""
+                UPDATE crawl_runs SET last_page = ?, listing_signature = ?, listing_url = ?, updated_at = ?
+                WHERE id = ?
+            """, (page_no, signature, listing_url, datetime.utcnow().isoformat(), run_id))
+
+    def pending_cards(self, run_id: int, due_only: bool = False) -> List[Tuple[int, Dict, int]]:
+        """(id, carte, tentatives) en attente de fiche, dans l'ordre d'arrivée.
+
+        `due_only` : seulement les cartes dont le délai de relance est écoulé.
+        """
+        sql = "SELECT id, card, attempts FROM crawl_pending WHERE run_id = ?"
+        params: tuple = (run_id,)
+        if due_only:
+            sql += " AND (not_before IS NULL OR not_before <= ?)"
+            params += (datetime.utcnow().isoformat(),)
+        with self._lock:
+            rows = self.con.execute(sql + " ORDER BY id", params).fetchall()
+        return [(pid, json.loads(card), attempts) for pid, card, attempts in rows]
+
+    def dequeue_pending(self, ids: List[int]):
+        with self._lock, self.con:
+            self.con.executemany("DELETE FROM crawl_pending WHERE id = ?", [(i,) for i in ids])
+
+    def defer_pending(self, retries: List[Tuple[int, int, float]]):
+        """(id, tentatives, délai en s) : la carte reste en file, relancée après le délai."""
+        now = datetime.utcnow()
+        with self._lock, self.con:
+            self.con.executemany(
+                "UPDATE crawl_pending SET attempts = ?, not_before = ? WHERE id = ?",
+                [(attempts, (now + timedelta(seconds=delay)).isoformat(), pid) for pid, attempts, delay in retries])
+
+    def next_retry_at(self, run_id: int) -> Optional[datetime]:
+        """Échéance de relance la plus proche parmi les cartes en file, None si la file est vide."""
+        with self._lock:
+            row = self.con.execute(
+                "SELECT COUNT(*), MIN(COALESCE(not_before, '')) FROM crawl_pending WHERE run_id = ?",
+                (run_id,)).fetchone()
+        if not row[0]:
+            return None
+        return datetime.fromisoformat(row[1]) if row[1] else datetime.utcnow()
+
+    def finish_crawl(self, run_id: int, status: str):
+        """status : 'done' (terminé) ou 'failed' (reprenable avec --resume)."""
+        with self._lock, self.con:
+            self.con.execute("UPDATE crawl_runs SET status = ?, updated_at = ? WHERE id = ?",
+                             (status, datetime.utcnow().isoformat(), run_id))
+
+    def price_history(self, page_url: str) -> List[tuple]:
+        """(observed_at, price_eur, discount_text) d'un produit, du plus ancien au plus récent."""
+        with self._lock:
+            return self.con.execute("""
+                SELECT o.observed_at, o.price_eur, o.discount_text
+                FROM products p JOIN price_observations o ON o.product_id = p.id
+                WHERE p.page_url = ?
+                ORDER BY o.observed_at
+            """, (page_url,)).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.con.close()
+
+
+# ---------- ATTENTES ADAPTATIVES (fiches produit) ----------
+DETAIL_SETTLE_SECONDS = 0.3  # page complète : délai de grâce pour un bloc inséré en JS
+
+
+class AdaptiveDeadline:
+    """Délai d'attente calé sur les latences observées, comme le RTO de TCP :
+    moyenne mobile exponentielle + 4 x écart moyen, borné à [minimum, maximum].
+
+    Sans mesure, on attend `maximum` (ancien délai fixe).
+    """
+
+    def __init__(self, minimum: float = 1.5, maximum: float = 10.0, alpha: float = 0.125, beta: float = 0.25):
+        self.minimum, self.maximum = minimum, maximum
+        self.alpha, self.beta = alpha, beta
+        self.mean: Optional[float] = None
+        self.dev = 0.0
+
+    def timeout(self) -> float:
+        if self.mean is None:
+            return self.maximum
+        return min(self.maximum, max(self.minimum, self.mean + 4 * self.dev))
+
+    def observe(self, seconds: float):
+        if self.mean is None:
+            self.mean, self.dev = seconds, seconds / 2
+        else:
+            self.dev += self.beta * (abs(seconds - self.mean) - self.dev)
+            self.mean += self.alpha * (seconds - self.mean)
+
+
+class _DetailContentReady:
+    """Condition unique pour la fiche : description ET tableau présents, ou document
+    complet depuis `settle` s (bloc absent, p. ex. fiche marketplace sans description).
+
+    `ready_at` : instant où la page a été jugée prête (avant le délai de grâce).
+    """
+
+    def __init__(self, settle: float = DETAIL_SETTLE_SECONDS):
+        self.settle = settle
+        self.ready_at: Optional[float] = None
+        self.complete_at: Optional[float] = None
+
+    def __call__(self, driver) -> bool:
+        if driver.find_elements(By.XPATH, XPATH_PRODUCT_DESCRIPTION) \
+                and driver.find_elements(By.XPATH, XPATH_FEATURES_TBODY):
+            self.ready_at = self.complete_at or time.perf_counter()
+            return True
+        if self.complete_at is None:
+            if driver.execute_script("return document.readyState") != "complete":
+                return False
+            self.complete_at = time.perf_counter()
+        if time.perf_counter() - self.complete_at >= self.settle:
+            self.ready_at = self.complete_at
+            return True
+        return False
 
 
 # ---------- SCRAPER ----------
 class LeclercScraper:
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, detail_workers: int = 0,
+                 detail_backend: str = "selenium", http_workers: int = 8,
+                 batch_cards: bool = False, detail_cache: Optional[DBManager] = None,
+                 fresh_ttl_hours: float = 24, base_url: str = BASE_URL, lean: bool = False,
+                 blocked_resources=LEAN_BLOCKED_RESOURCES, blocked_urls: Optional[List[str]] = None,
+                 user_data_dir: Optional[str] = None, debugger_address: Optional[str] = None,
+                 cookie_timeout: Optional[float] = None, capture_api: bool = False,
+                 api_url_pattern: str = LISTING_API_PATTERN, detail_timeout: float = 10):
+        self.base_url = base_url
+        # attente des fiches : `detail_timeout` tant qu'aucune latence n'a été mesurée
+        self.detail_deadline = AdaptiveDeadline(maximum=detail_timeout)
+        # capture des réponses JSON du listing dans les logs "performance" de Chrome
+        self.capture_api = capture_api
+        self.api_url_pattern = re.compile(api_url_pattern)
+        self.lean = lean
+        self.debugger_address = debugger_address
+        # profil déjà consenti : la bannière ne viendra sans doute pas, inutile de l'attendre 10 s
+        warm = bool(user_data_dir or debugger_address)
+        self.cookie_timeout = cookie_timeout if cookie_timeout is not None else (2 if warm else 10)
         opts = Options()
-        if headless:
-            opts.add_argument("--headless=new")
-        opts.add_argument("--no-sandbox")
-        opts.add_argument("--disable-dev-shm-usage")
-        opts.add_argument("--start-maximized")
-        opts.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) "
-                          "Chrome/128.0.0.0 Safari/537.36")
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=opts)
+        if debugger_address:
+            # Chrome déjà lancé avec --remote-debugging-port : on s'y attache, il survit à close()
+            opts.add_experimental_option("debuggerAddress", debugger_address)
+        else:
+            if headless:
+                opts.add_argument("--headless=new")
+            opts.add_argument("--no-sandbox")
+            opts.add_argument("--disable-dev-shm-usage")
+            opts.add_argument("--start-maximized")
+            opts.add_argument(f"--user-agent={USER_AGENT}")
+            if user_data_dir:
+                # profil persistant : cookies (dont le consentement) et cache HTTP conservés
+                opts.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+            if lean and "image" in blocked_resources:
+                opts.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        if lean:
+            # rend la main dès DOMContentLoaded ; les attentes explicites couvrent le reste
+            opts.page_load_strategy = "eager"
+        if capture_api:
+            opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        with REGISTRY.timer("scrape_stage_seconds", stage="driver_startup"):
+            try:
+                self.driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=opts)
+            except SessionNotCreatedException as e:
+                # Chrome mis à jour depuis la mise en cache : driver incompatible, on re-résout.
+                # Autre cause (profil verrouillé, Chrome introuvable...) : erreur d'origine
+                if not is_driver_version_mismatch(e):
+                    raise
+                self.driver = webdriver.Chrome(service=Service(resolve_driver_path(refresh=True)), options=opts)
+        self.blocked_patterns = [p for r in blocked_resources for p in LEAN_RESOURCE_PATTERNS.get(r, [])]
+        self.blocked_patterns += LEAN_BLOCKED_URLS if blocked_urls is None else blocked_urls
+        self._apply_lean_blocking()
         self.wait = WebDriverWait(self.driver, 10)
+        self.batch_cards = batch_cards
+
+        # crawl incrémental : fiches encore fraîches en base réutilisées telles quelles
+        self.detail_cache = detail_cache
+        self.fresh_ttl_hours = fresh_ttl_hours
+
+        # pool de navigateurs dédiés aux fiches produit (0 = séquentiel dans l'onglet courant)
+        # mêmes réglages que ce scraper, sauf user_data_dir : un profil ne s'ouvre que dans un Chrome
+        self.detail_pool = (DetailWorkerPool(detail_workers, headless=headless, lean=lean,
+                                             blocked_resources=blocked_resources, blocked_urls=blocked_urls,
+                                             base_url=base_url, debugger_address=debugger_address,
+                                             detail_timeout=detail_timeout)
+                            if detail_workers > 0 else None)
+
+        # "http" : fiches produit en HTTP brut, Selenium seulement en secours
+        if detail_backend not in ("selenium", "http"):
+            raise ValueError(f"detail_backend inconnu: {detail_backend!r}")
+        self.http_fetcher = HttpDetailFetcher(max_workers=http_workers) if detail_backend == "http" else None
+
+    def _apply_lean_blocking(self):
+        """Le blocage CDP vaut pour l'onglet courant : à rappeler sur chaque nouvel onglet."""
+        if self.lean:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_patterns})
 
     # --- navigation ---
     def open_homepage(self):
-        self.driver.get("https://www.e.leclerc/")
-        self._accept_cookies_if_present()
-        self.wait.until(EC.presence_of_element_located((By.XPATH, XPATH_MENU_BUTTON)))
+        with REGISTRY.timer("scrape_stage_seconds", stage="open_homepage"):
+            self.driver.get(self.base_url)
+            self._accept_cookies_if_present()
+            self.wait.until(EC.presence_of_element_located((By.XPATH, XPATH_MENU_BUTTON)))
 
     def _accept_cookies_if_present(self):
         try:
-            btn = self.wait.until(EC.element_to_be_clickable((By.XPATH, XPATH_COOKIES_ACCEPT)))
+            btn = WebDriverWait(self.driver, self.cookie_timeout).until(
+                EC.element_to_be_clickable((By.XPATH, XPATH_COOKIES_ACCEPT)))
             btn.click()
-            time.sleep(0.5)
+            if self.lean:
+                # bannière fermée (retirée du DOM ou masquée) plutôt qu'un délai fixe
+                WebDriverWait(self.driver, 2).until(EC.invisibility_of_element(btn))
+            else:
+                time.sleep(0.5)
         except (TimeoutException, NoSuchElementException, ElementClickInterceptedException):
             pass
 
     def go_to_bons_plans(self):
-        self.driver.find_element(By.XPATH, XPATH_MENU_BUTTON).click()
-        self.wait.until(EC.element_to_be_clickable((By.XPATH, XPATH_BONS_PLANS_BUTTON))).click()
-        self.wait.until(EC.presence_of_element_located((By.XPATH, XPATH_ALL_PRODUCT_LIST)))
-        self.wait.until(EC.presence_of_all_elements_located((By.XPATH, XPATH_ALL_PRODUCT_CARDS)))
+        with REGISTRY.timer("scrape_stage_seconds", stage="go_to_bons_plans"):
+            self.driver.find_element(By.XPATH, XPATH_MENU_BUTTON).click()
+            self.wait.until(EC.element_to_be_clickable((By.XPATH, XPATH_BONS_PLANS_BUTTON))).click()
+            self.wait.until(EC.presence_of_element_located((By.XPATH, XPATH_ALL_PRODUCT_LIST)))
+            self.wait.until(EC.presence_of_all_elements_located((By.XPATH, XPATH_ALL_PRODUCT_CARDS)))
 
     # --- page listing ---
     def scrape_current_page(self) -> List[Dict]:
+        return self.complete_cards(self.extract_current_page_cards())
+
+    def complete_cards(self, deals: List[Dict]) -> List[Dict]:
+        """Ajoute fiche produit + scraped_at à des cartes déjà extraites (modifiées sur place).
+
+        Fiche en échec : `details_missing=True` ; save_many garde alors les détails
+        déjà connus, et app.pipeline remet la carte en file de relance.
+        """
+        details = self._fetch_details_many([d.get("page_url") for d in deals])
+        for data, det in zip(deals, details):
+            data.pop("details_cached", None)
+            if det is None:
+                data.update(description=None, features=None, category=None, details_missing=True)
+            else:
+                data.update(det)
+                data.pop("details_missing", None)
+            data["scraped_at"] = datetime.utcnow().isoformat()
+        return deals
+
+    def listing_signature(self) -> str:
+        """Début du texte de la première carte : change quand la page listing change."""
+        try:
+            return self.driver.find_element(By.XPATH, XPATH_ALL_PRODUCT_CARDS + "[1]").text[:60]
+        except NoSuchElementException:
+            return ""
+
+    def extract_current_page_cards(self) -> List[Dict]:
+        """Extrait les cartes de la page listing courante, sans visiter les fiches produit."""
+        if self.capture_api:
+            try:
+                with REGISTRY.timer("scrape_stage_seconds", stage="extract_cards_api"):
+                    deals = self._extract_cards_from_api()
+            except (WebDriverException, ValueError, KeyError, TypeError):
+                deals = None
+            # contrôles bon marché : autant de produits que de cartes affichées, et la première
+            # carte identique (nom, prix) dans le JSON et dans le DOM
+            cards = self.driver.find_elements(By.XPATH, XPATH_ALL_PRODUCT_CARDS)
+            if deals and len(deals) == len(cards):
+                try:
+                    agree = api_card_matches(deals[0], self._extract_card_data(cards[0]))
+                except WebDriverException:
+                    agree = False
+                if agree:
+                    REGISTRY.inc("scrape_items_total", len(deals), stage="cards_api")
+                    REGISTRY.inc("scrape_items_total", len(deals), stage="cards")
+                    return deals
+                REGISTRY.inc("scrape_items_total", stage="api_capture_mismatch")
+            REGISTRY.inc("scrape_items_total", stage="api_capture_fallback")
+        if self.batch_cards:
+            try:
+                with REGISTRY.timer("scrape_stage_seconds", stage="extract_cards_batch"):
+                    deals = self._extract_cards_batch()
+                REGISTRY.inc("scrape_items_total", len(deals), stage="cards")
+                return deals
+            except WebDriverException:
+                pass  # repli sur l'extraction élément par élément
         cards = self.driver.find_elements(By.XPATH, XPATH_ALL_PRODUCT_CARDS)
         deals = []
         for card in cards:
             try:
-                data = self._extract_card_data(card)
-                details = self._fetch_details(data.get("page_url"))
-                data.update(details)
-                data["scraped_at"] = datetime.utcnow().isoformat()
-                deals.append(data)
+                with REGISTRY.timer("scrape_stage_seconds", stage="extract_card_data"):
+                    deals.append(self._extract_card_data(card))
             except Exception:
                 continue
+        REGISTRY.inc("scrape_items_total", len(deals), stage="cards")
         return deals
 
+    def _fetch_details_many(self, page_urls: List[Optional[str]]) -> List[Optional[Dict[str, Optional[str]]]]:
+        """Détails pour une liste d'URLs, dans le même ordre (None : fiche en échec).
+
+        Ordre de résolution : base (si fraîche), HTTP, puis pool/onglet Selenium.
+        """
+        fresh = self.lookup_cached_details(page_urls)
+        results = [fresh.get(u) if u else None for u in page_urls]
+        todo = [i for i, r in enumerate(results) if r is None]
+        if todo:
+            fetched = self.fetch_remote_details([page_urls[i] for i in todo])
+            for i, det in zip(todo, fetched):
+                results[i] = det
+        return results
+
+    def lookup_cached_details(self, page_urls: List[Optional[str]]) -> Dict[str, Dict[str, Optional[str]]]:
+        """Fiches encore fraîches en base (crawl incrémental), {} sinon."""
+        if self.detail_cache is None:
+            return {}
+        fresh = self.detail_cache.get_fresh_details([u for u in page_urls if u], self.fresh_ttl_hours)
+        return {u: dict(det, details_cached=True) for u, det in fresh.items()}
+
+    def fetch_remote_details(self, page_urls: List[Optional[str]]) -> List[Optional[Dict[str, Optional[str]]]]:
+        """Charge les fiches sur le réseau : HTTP si configuré, puis pool/onglet Selenium en secours.
+
+        None pour une fiche que même Selenium n'a pas pu charger (à relancer plus tard).
+        """
+        results: List[Optional[Dict[str, Optional[str]]]] = [None] * len(page_urls)
+        if self.http_fetcher is not None:
+            results = self.http_fetcher.fetch_many(page_urls)
+
+        # secours Selenium : URLs dont le HTML statique ne contenait rien d'exploitable
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            urls = [page_urls[i] for i in missing]
+            if self.detail_pool is not None:
+                fetched = self.detail_pool.fetch_many(urls)
+            else:
+                fetched = [self._safe_fetch_details(u) for u in urls]
+            for i, det in zip(missing, fetched):
+                results[i] = det
+        return results
+
+    def _safe_fetch_details(self, page_url: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+        try:
+            return self._fetch_details(page_url)
+        except Exception:
+            REGISTRY.inc("scrape_items_total", stage="details_failed")
+            return None
+
     # --- extract helpers ---
     def _clean_sold_by(self, txt: str) -> Optional[str]:
         if not txt:
@@ -174,6 +1270,11 @@ class LeclercScraper:
         except NoSuchElementException:
             return None
 
+    def _clean_page_url(self, href: Optional[str]) -> Optional[str]:
+        if href and not href.strip().lower().startswith("javascript"):
+            return href
+        return None
+
     def _extract_card_data(self, card) -> Dict:
         try:
             product_name = card.find_element(By.XPATH, XPATH_PRODUCT_NAME_IN_CARD).text.strip()
@@ -190,12 +1291,9 @@ class LeclercScraper:
         except NoSuchElementException:
             image_url = None
 
-        page_url = None
         try:
             a = card.find_element(By.XPATH, XPATH_PAGE_LINK_IN_CARD)
-            href = a.get_attribute("href")
-            if href and not href.strip().lower().startswith("javascript"):
-                page_url = href
+            page_url = self._clean_page_url(a.get_attribute("href"))
         except NoSuchElementException:
             page_url = None
 
@@ -213,12 +1311,14 @@ class LeclercScraper:
 
     def _extract_promo(self, card) -> Optional[str]:
         try:
-            raw = card.find_element(By.XPATH, XPATH_PROMO_BLOCK_IN_CARD).text.strip()
-            cleaned = " ".join(raw.split())
-            return cleaned or None
+            return self._clean_promo(card.find_element(By.XPATH, XPATH_PROMO_BLOCK_IN_CARD).text)
         except NoSuchElementException:
             return None
 
+    def _clean_promo(self, txt: str) -> Optional[str]:
+        cleaned = " ".join(txt.strip().split())
+        return cleaned or None
+
     def _extract_price(self, card) -> Optional[float]:
         try:
             euros_txt = card.find_element(By.XPATH, XPATH_PRICE_INTEGER_PART).text.strip()
@@ -228,8 +1328,11 @@ class LeclercScraper:
             cents_txt = card.find_element(By.XPATH, XPATH_PRICE_CENTS_PART).text.strip()
         except NoSuchElementException:
             cents_txt = ""
-        euros_txt = euros_txt.replace("€", "").replace(" ", "")
-        cents_txt = cents_txt.replace("€", "").replace(" ", "")
+        return self._parse_price(euros_txt, cents_txt)
+
+    def _parse_price(self, euros_txt: str, cents_txt: str) -> Optional[float]:
+        euros_txt = _PRICE_NOISE_RE.sub("", euros_txt)
+        cents_txt = _PRICE_NOISE_RE.sub("", cents_txt)
         if cents_txt.startswith(","): cents_txt = cents_txt[1:]
         if cents_txt == "": cents_txt = "00"
         if euros_txt == "": return None
@@ -238,33 +1341,128 @@ class LeclercScraper:
         except ValueError:
             return None
 
+    # --- extraction groupée (un seul execute_script par page) ---
+    def _extract_cards_batch(self) -> List[Dict]:
+        """Évalue tous les XPaths de carte côté navigateur en un aller-retour WebDriver.
+
+        Les champs bruts renvoyés par le JS passent ensuite par les mêmes
+        nettoyages Python que `_extract_card_data`.
+        """
+        raws = self.driver.execute_script(JS_EXTRACT_CARDS, XPATH_ALL_PRODUCT_CARDS, {
+            "name": XPATH_PRODUCT_NAME_IN_CARD,
+            "sold_by": XPATH_SOLD_BY_IN_CARD,
+            "sold_by_block": XPATH_SOLD_BY_BLOCK_IN_CARD,
+            "promo": XPATH_PROMO_BLOCK_IN_CARD,
+            "price_int": XPATH_PRICE_INTEGER_PART,
+            "price_cents": XPATH_PRICE_CENTS_PART,
+            "img": XPATH_IMAGE_IN_CARD,
+            "link": XPATH_PAGE_LINK_IN_CARD,
+        })
+        return [self._card_from_raw(raw) for raw in (raws or [])]
+
+    def _extract_cards_from_api(self) -> Optional[List[Dict]]:
+        """Dernière réponse JSON du listing vue dans les logs réseau, convertie en deals.
+
+        `get_log` vide le tampon : seules les requêtes depuis l'appel précédent
+        (donc la page courante) sont examinées. None si aucune n'a été capturée.
+        """
+        request_id = None
+        for entry in self.driver.get_log("performance"):
+            msg = json.loads(entry["message"]).get("message", {})
+            if msg.get("method") != "Network.responseReceived":
+                continue
+            resp = msg["params"]["response"]
+            if "json" in resp.get("mimeType", "") and self.api_url_pattern.search(resp.get("url", "")):
+                request_id = msg["params"]["requestId"]
+        if request_id is None:
+            return None
+        body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        text = base64.b64decode(body["body"]).decode("utf-8") if body.get("base64Encoded") else body["body"]
+        return map_api_products(json.loads(text), self.driver.current_url)
+
+    def _card_from_raw(self, raw: Dict) -> Dict:
+        name = raw.get("name")
+        sold_by = self._clean_sold_by(raw.get("sold_by"))
+        if not sold_by and raw.get("sold_by_block") is not None:
+            sold_by = self._clean_sold_by(raw.get("sold_by_block"))
+        promo = raw.get("promo")
+        return {
+            "sold_by": sold_by,
+            "product_name": name.strip() if name is not None else None,
+            "discount_text": self._clean_promo(promo) if promo is not None else None,
+            "price_eur": self._parse_price((raw.get("price_int") or "").strip(),
+                                           (raw.get("price_cents") or "").strip()),
+            "page_url": self._clean_page_url(raw.get("href")),
+            "image_url": (raw.get("img_data_src") or raw.get("img_src")) if raw.get("has_img") else None,
+            "description": None,
+            "features": None,
+            "category": None,
+        }
+
+    def compare_card_extractors(self) -> List[int]:
+        """Indices des cartes où l'extraction groupée diffère de l'extraction élément par élément."""
+        batch = self._extract_cards_batch()
+        cards = self.driver.find_elements(By.XPATH, XPATH_ALL_PRODUCT_CARDS)
+        single = [self._extract_card_data(c) for c in cards]
+        if len(batch) != len(single):
+            return list(range(max(len(batch), len(single))))
+        return [i for i, (a, b) in enumerate(zip(batch, single)) if a != b]
+
     # --- fiche produit ---
-    def _fetch_details(self, page_url: Optional[str]) -> Dict[str, Optional[str]]:
+    def _fetch_details(self, page_url: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+        """Fiche produit dans un nouvel onglet ; None si la page n'a pas pu être chargée
+        (erreur WebDriver, page d'erreur du navigateur, ou document incomplet au bout du
+        délai sans description ni tableau). Une page chargée mais vide donne des champs nuls."""
         if not page_url:
             return {"description": None, "features": None, "category": None}
 
         main = self.driver.current_window_handle
         try:
-            self.driver.switch_to.new_window('tab')
-            self.driver.get(page_url)
+            t0 = time.perf_counter()
+            with REGISTRY.timer("scrape_stage_seconds", stage="detail_page_load"):
+                self.driver.switch_to.new_window('tab')
+                self._apply_lean_blocking()
+                self.driver.get(page_url)
 
-            # description
-            description = None
-            try:
-                self.wait.until(EC.presence_of_element_located((By.XPATH, XPATH_PRODUCT_DESCRIPTION)))
-                description = self.driver.find_element(By.XPATH, XPATH_PRODUCT_DESCRIPTION).text.strip() or None
-            except TimeoutException:
-                description = None
+            # description et tableau attendus ensemble, délai calé sur les fiches précédentes
+            ready = _DetailContentReady()
+            timeout = self.detail_deadline.timeout()
+            t_wait = time.perf_counter()
+            with REGISTRY.timer("scrape_stage_seconds", stage="detail_content_wait"):
+                try:
+                    WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(ready)
+                except TimeoutException:
+                    pass
+            waited = time.perf_counter() - t_wait
+            # délai dépassé : mesure tronquée, mais elle fait remonter le délai suivant
+            self.detail_deadline.observe((ready.ready_at or time.perf_counter()) - t0)
+            desc_nodes = self.driver.find_elements(By.XPATH, XPATH_PRODUCT_DESCRIPTION)
+            if not desc_nodes and not self.driver.find_elements(By.XPATH, XPATH_FEATURES_TBODY):
+                loaded = ready.complete_at is not None and not self.driver.current_url.startswith("chrome-error:")
+                if not loaded:
+                    REGISTRY.inc("scrape_items_total", stage="details_failed")
+                    return None
+                # fiche complète sans aucun des deux blocs : écrite telle quelle, pas relancée
+                REGISTRY.inc("scrape_items_total", stage="details_empty")
+            description = (desc_nodes[0].text.strip() or None) if desc_nodes else None
+            if not desc_nodes:
+                # l'ancienne attente fixe allait jusqu'au bout du délai sur ces fiches
+                REGISTRY.inc("scrape_seconds_saved_total", max(0.0, self.detail_deadline.maximum - waited),
+                             stage="detail_wait")
 
-            # caractéristiques (table <tbody> ; concat "Label: valeur")
-            features = self._extract_features_table()
+            with REGISTRY.timer("scrape_stage_seconds", stage="detail_table_parse"):
+                # caractéristiques (table <tbody> ; concat "Label: valeur" + paires pour product_features)
+                pairs = self._extract_feature_pairs()
 
-            # catégorie (cellule précise fournie) + fallback par libellé "Catégorie"
-            category = self._extract_category_from_table_specific() or self._extract_category_from_table_by_label()
+                # catégorie (cellule précise fournie) + fallback par libellé "Catégorie"
+                category = self._extract_category_from_table_specific() or self._extract_category_from_table_by_label()
+            REGISTRY.inc("scrape_items_total", stage="details_selenium")
 
-            return {"description": description, "features": features, "category": category}
+            return {"description": description, "features": format_features(pairs),
+                    "features_kv": feature_rows(pairs), "category": category}
         except WebDriverException:
-            return {"description": None, "features": None, "category": None}
+            REGISTRY.inc("scrape_items_total", stage="details_failed")
+            return None
         finally:
             try:
                 self.driver.close()
@@ -274,6 +1472,10 @@ class LeclercScraper:
 
     def _extract_features_table(self) -> Optional[str]:
         """Parcourt le tbody et retourne 'Label: Valeur' séparés par ' | '."""
+        return format_features(self._extract_feature_pairs())
+
+    def _extract_feature_pairs(self) -> List[Tuple[str, str]]:
+        """Lignes (libellé, valeur) du tbody des caractéristiques, dans l'ordre de la page."""
         try:
             tbody = self.driver.find_element(By.XPATH, XPATH_FEATURES_TBODY)
             rows = tbody.find_elements(By.XPATH, "./tr")
@@ -283,12 +1485,12 @@ class LeclercScraper:
                     key = tr.find_element(By.XPATH, "./th").text.strip()
                     val = tr.find_element(By.XPATH, "./td").text.strip()
                     if key or val:
-                        pairs.append(f"{key}: {val}".strip(": ").strip())
+                        pairs.append((key, val))
                 except NoSuchElementException:
                     continue
-            return " | ".join(pairs) if pairs else None
+            return pairs
         except NoSuchElementException:
-            return None
+            return []
 
     def _extract_category_from_table_specific(self) -> Optional[str]:
         """Catégorie via la cellule exacte transmise (/tr[14]/td)."""
@@ -317,18 +1519,36 @@ class LeclercScraper:
             return None
 
     # --- pagination ---
+    def goto_page(self, page_no: int) -> bool:
+        """Ouvre directement la page `page_no` du listing courant en réécrivant le paramètre
+        `page` de l'URL, sans cliquer « suivant » depuis la page 1."""
+        with REGISTRY.timer("scrape_stage_seconds", stage="goto_page"):
+            parts = urlsplit(self.driver.current_url)
+            query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != LISTING_PAGE_PARAM]
+            query.append((LISTING_PAGE_PARAM, str(page_no)))
+            self.driver.get(parts._replace(query=urlencode(query)).geturl())
+            try:
+                self.wait.until(EC.presence_of_all_elements_located((By.XPATH, XPATH_ALL_PRODUCT_CARDS)))
+                return True
+            except TimeoutException:
+                return False
+
     def go_next_page(self) -> bool:
-        try:
-            first_before = self.driver.find_element(By.XPATH, XPATH_ALL_PRODUCT_CARDS + "[1]").text[:60]
-        except NoSuchElementException:
-            first_before = ""
+        with REGISTRY.timer("scrape_stage_seconds", stage="go_next_page"):
+            return self._go_next_page()
 
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(0.5)
+    def _go_next_page(self) -> bool:
+        first_before = self.listing_signature()
 
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
         try:
-            next_li = self.driver.find_element(By.XPATH, XPATH_NEXT_LI)
-        except NoSuchElementException:
+            if self.lean:
+                next_li = WebDriverWait(self.driver, 3).until(
+                    EC.presence_of_element_located((By.XPATH, XPATH_NEXT_LI)))
+            else:
+                time.sleep(0.5)
+                next_li = self.driver.find_element(By.XPATH, XPATH_NEXT_LI)
+        except (NoSuchElementException, TimeoutException):
             return False
 
         li_class = (next_li.get_attribute("class") or "").lower()
@@ -341,11 +1561,19 @@ class LeclercScraper:
             return False
 
         self.driver.execute_script("arguments[0].scrollIntoView()", next_a)
-        time.sleep(0.2)
+        if self.lean:
+            try:
+                WebDriverWait(self.driver, 3).until(EC.element_to_be_clickable(next_a))
+            except TimeoutException:
+                return False
+        else:
+            time.sleep(0.2)
         self.driver.execute_script("arguments[0].click()", next_a)
 
         try:
-            WebDriverWait(self.driver, 12).until(
+            # l'ancienne liste peut disparaître entre find_element et .text (rechargement complet)
+            WebDriverWait(self.driver, 12, ignored_exceptions=(NoSuchElementException,
+                                                               StaleElementReferenceException)).until(
                 lambda d: d.find_element(By.XPATH, XPATH_ALL_PRODUCT_CARDS + "[1]").text[:60] != first_before
             )
         except TimeoutException:
@@ -359,4 +1587,177 @@ class LeclercScraper:
         return True
 
     def close(self):
-        self.driver.quit()
+        if self.http_fetcher is not None:
+            self.http_fetcher.close()
+        if self.detail_pool is not None:
+            self.detail_pool.close()
+        if self.debugger_address:
+            # navigateur attaché : on arrête seulement chromedriver, la session reste chaude
+            self.driver.service.stop()
+        else:
+            self.driver.quit()
+
+
+# ---------- POOL FICHES PRODUIT ----------
+class DetailWorkerPool:
+    """Pool de sessions Chrome indépendantes pour charger les fiches produit en parallèle.
+
+    Chaque worker est un `LeclercScraper` complet (un driver = un thread à la fois) :
+    on réutilise donc tel quel `_fetch_details` et ses helpers. `scraper_kwargs` (délai des
+    fiches, site, blocage lean, Chrome attaché...) est passé à chacun.
+    """
+
+    def __init__(self, size: int, **scraper_kwargs):
+        self.size = size
+        self.workers: List[LeclercScraper] = []
+        try:
+            for _ in range(size):
+                self.workers.append(LeclercScraper(**scraper_kwargs))
+        except Exception:
+            self.close()
+            raise
+        self._idle: "queue.Queue[LeclercScraper]" = queue.Queue()
+        for w in self.workers:
+            self._idle.put(w)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="detail")
+
+    def _run(self, page_url: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+        worker = self._idle.get()
+        try:
+            return worker._safe_fetch_details(page_url)
+        finally:
+            self._idle.put(worker)
+
+    def fetch_many(self, page_urls: List[Optional[str]]) -> List[Optional[Dict[str, Optional[str]]]]:
+        """Résultats dans l'ordre des URLs passées (executor.map conserve l'ordre)."""
+        return list(self._executor.map(self._run, page_urls))
+
+    def close(self):
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for w in self.workers:
+            try:
+                w.close()
+            except Exception:
+                pass
+        self.workers = []
+
+
+
+# ---------- FICHES PRODUIT EN HTTP ----------
+_BLOCK_TAGS = {"p", "div", "br", "li", "ul", "ol", "tr", "table", "section",
+               "h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+def _node_text(el) -> str:
+    """Texte d'un noeud lxml, proche de `WebElement.text` (retours à la ligne sur les blocs)."""
+    parts: List[str] = []
+
+    def walk(node):
+        if not isinstance(node.tag, str) or node.tag in ("script", "style"):
+            return
+        if node.tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if node.tag in _BLOCK_TAGS:
+            parts.append("\n")
+
+    walk(el)
+    lines = (" ".join(line.split()) for line in "".join(parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def parse_product_html(html: str) -> Dict[str, Optional[str]]:
+    """Description / caractéristiques / catégorie depuis le HTML brut d'une fiche produit.
+
+    Mêmes XPaths que la version Selenium. Un HTML servi sans <tbody> (ajouté
+    normalement par le navigateur) est aussi accepté.
+    """
+    doc = lxml.html.document_fromstring(html)
+
+    description = None
+    nodes = doc.xpath(XPATH_PRODUCT_DESCRIPTION)
+    if nodes:
+        description = _node_text(nodes[0]) or None
+
+    rows = doc.xpath(XPATH_FEATURES_TBODY + "/tr")
+    if not rows:
+        rows = doc.xpath(XPATH_FEATURES_TBODY[:-len("/tbody")] + "/tr")
+
+    pairs = []
+    category_by_label = None
+    for tr in rows:
+        th, td = tr.xpath("./th"), tr.xpath("./td")
+        if not th or not td:
+            continue
+        key, val = _node_text(th[0]), _node_text(td[0])
+        if key or val:
+            pairs.append((key, val))
+        if category_by_label is None and "catégori" in key.lower() and val:
+            category_by_label = val
+
+    # même priorité que _fetch_details : cellule /tr[14]/td puis libellé "Catégorie"
+    category = None
+    if len(rows) >= 14:
+        td = rows[13].xpath("./td")
+        category = (_node_text(td[0]) if td else "") or None
+    category = category or category_by_label
+
+    return {"description": description, "features": format_features(pairs),
+            "features_kv": feature_rows(pairs), "category": category}
+
+
+class HttpDetailFetcher:
+    """Charge les fiches produit via une session HTTP partagée (pool de connexions).
+
+    `fetch` renvoie None quand la page n'est pas exploitable sans navigateur
+    (erreur réseau, statut HTTP, ni description ni tableau dans le HTML statique) :
+    l'appelant retombe alors sur Selenium.
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float = 10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "fr-FR,fr;q=0.9",
+        })
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-detail")
+
+    def fetch(self, page_url: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+        if not page_url:
+            return {"description": None, "features": None, "category": None}
+        try:
+            with REGISTRY.timer("scrape_stage_seconds", stage="detail_http"):
+                resp = self.session.get(page_url, timeout=self.timeout)
+            if resp.status_code != 200:
+                return None
+            if "charset" not in resp.headers.get("Content-Type", "").lower():
+                resp.encoding = "utf-8"
+            with REGISTRY.timer("scrape_stage_seconds", stage="detail_http_parse"):
+                details = parse_product_html(resp.text)
+        except (requests.RequestException, ValueError):
+            return None
+        if details["description"] is None and details["features"] is None:
+            REGISTRY.inc("scrape_items_total", stage="details_http_fallback")
+            return None
+        REGISTRY.inc("scrape_items_total", stage="details_http")
+        return details
+
+    def fetch_many(self, page_urls: List[Optional[str]]) -> List[Optional[Dict[str, Optional[str]]]]:
+        """Au plus `max_workers` requêtes simultanées ; résultats dans l'ordre des URLs."""
+        return list(self._executor.map(self.fetch, page_urls))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()